@@ -0,0 +1,217 @@
+"""
+Benchmark script untuk PoseMatcher
+Membandingkan biaya matching per frame dengan library referensi sintetis
+(tidak perlu webcam, MediaPipe, atau gambar referensi)
+"""
+
+import argparse
+import tempfile
+import time
+import numpy as np
+import kernels
+from pose_matcher import PoseMatcher, POSE_LANDMARK_COUNT
+from reference_store import ReferenceStore, VECTOR_DIM
+
+KERNEL_TOLERANCE = 1e-12  # Selisih maksimum skor kernel Numba vs NumPy (pembulatan saja)
+
+
+def make_library(count: int, rng) -> dict:
+    """Buat library referensi sintetis {nama_pose: landmarks}"""
+    return {
+        f"pose_{i}": {
+            'pose_landmarks': [tuple(lm) for lm in rng.random((POSE_LANDMARK_COUNT, 3))],
+            'hand_landmarks': []
+        }
+        for i in range(count)
+    }
+
+
+def time_per_call(fn, queries, repeat: int) -> float:
+    """Rata-rata waktu satu panggilan fn(query) dalam milidetik"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            fn(query)
+    return (time.perf_counter() - start) * 1000 / (repeat * len(queries))
+
+
+def bench_loop(matcher: PoseMatcher, queries, repeat: int) -> float:
+    """Path lama: calculate_similarity per referensi dalam loop Python"""
+    def run(query):
+        for ref in matcher.reference_poses.values():
+            matcher.calculate_similarity(query, ref)
+    return time_per_call(run, queries, repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PoseMatcher")
+    parser.add_argument('--sizes', default='10,100,1000,10000',
+                        help="Jumlah referensi, dipisah koma")
+    parser.add_argument('--store-sizes', default='100000,1000000',
+                        help="Jumlah referensi untuk benchmark ReferenceStore, dipisah koma")
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--batch-frames', type=int, default=2000,
+                        help="Jumlah frame untuk benchmark match_batch")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    queries = [[tuple(lm) for lm in rng.random((POSE_LANDMARK_COUNT, 3))]
+               for _ in range(args.queries)]
+
+    print("=" * 72)
+    print("BENCHMARK POSE MATCHER (ms per frame)")
+    print("=" * 72)
+    print(f"{'refs':>8} {'loop cosine':>14} {'batch cosine':>14} {'procrustes':>14} {'procr/cos':>10}")
+
+    for size in [int(s) for s in args.sizes.split(',')]:
+        library = make_library(size, rng)
+        cosine = PoseMatcher(library, mode='cosine')
+        procrustes = PoseMatcher(library, mode='procrustes')
+
+        # Path lama sangat lambat untuk library besar, cukup beberapa query
+        loop_ms = bench_loop(cosine, queries[:max(1, 2000 // size)], 1)
+        cosine_ms = time_per_call(cosine.find_best_match, queries, args.repeat)
+        procrustes_ms = time_per_call(procrustes.find_best_match, queries, args.repeat)
+
+        print(f"{size:>8} {loop_ms:>14.3f} {cosine_ms:>14.3f} {procrustes_ms:>14.3f} "
+              f"{procrustes_ms / cosine_ms:>9.2f}x")
+
+    bench_hold(args, rng)
+    bench_kernels(args, rng, queries)
+    bench_batch(args, rng)
+    bench_store(args, rng)
+
+
+def bench_hold(args, rng):
+    """Benchmark fase hold: pose diam dengan jitter landmark kecil (temporal cache)"""
+    print()
+    print(f"{'refs':>8} {'no cache':>14} {'cache':>14} {'hit rate':>10} {'max err':>10} {'bound':>10}")
+
+    base = rng.random((POSE_LANDMARK_COUNT, 3))
+    hold = [[tuple(lm) for lm in base + 0.002 * rng.standard_normal(base.shape)]
+            for _ in range(args.queries * args.repeat)]
+
+    for size in [int(s) for s in args.sizes.split(',')]:
+        library = make_library(size, rng)
+        fresh = PoseMatcher(library)
+        fresh.cache_tolerance = 0
+        cached = PoseMatcher(library)
+
+        fresh_ms = time_per_call(fresh.find_best_match, hold, 1)
+        cached_ms = time_per_call(cached.find_best_match, hold, 1)
+
+        # Error aktual vs batas yang dijamin
+        cached.reset_cache()
+        max_err = max_bound = 0.0
+        for query in hold:
+            _, score = cached.find_best_match(query)
+            max_err = max(max_err, abs(score - fresh.find_best_match(query)[1]))
+            max_bound = max(max_bound, cached.last_error_bound)
+        hit_rate = cached.cache_hits / (cached.cache_hits + cached.cache_misses)
+
+        print(f"{size:>8} {fresh_ms:>14.3f} {cached_ms:>14.3f} {hit_rate:>10.0%} "
+              f"{max_err:>10.5f} {max_bound:>10.5f}")
+
+
+def bench_kernels(args, rng, queries):
+    """Benchmark kernel Numba vs path NumPy (hasil harus sama)"""
+    print()
+    if not kernels.NUMBA_AVAILABLE:
+        print("Numba tidak terinstall, benchmark kernel dilewati (pip install numba)")
+        return
+    print(f"{'refs':>8} {'path':>8} {'pair':>10} {'normalize':>10} {'best match':>11} {'max diff':>10} "
+          f"{'argmax':>8}")
+
+    for size in [int(s) for s in args.sizes.split(',')]:
+        library = make_library(size, rng)
+        pair_ref = next(iter(library.values()))
+        results = {}
+        for path, use_kernels in [('numpy', False), ('numba', True)]:
+            matcher = PoseMatcher(library)
+            matcher.use_kernels = use_kernels
+            matcher.cache_tolerance = 0
+
+            pair_ms = time_per_call(lambda q: matcher.calculate_similarity(q, pair_ref), queries, args.repeat)
+            unit_ms = time_per_call(matcher._live_unit, queries, args.repeat)
+            best_ms = time_per_call(matcher.find_best_match, queries, args.repeat)
+            results[path] = (
+                [matcher.calculate_similarity(q, pair_ref) for q in queries],
+                [matcher.score_all(q) for q in queries]
+            )
+            diff = 0.0
+            same_best = len(queries)
+            if path == 'numba':
+                base_pairs, base_scores = results['numpy']
+                diff = max(
+                    max(abs(a - b) for a, b in zip(base_pairs, results[path][0])),
+                    max(float(np.abs(a - b).max()) for a, b in zip(base_scores, results[path][1]))
+                )
+                same_best = sum(int(np.argmax(a)) == int(np.argmax(b))
+                                for a, b in zip(base_scores, results[path][1]))
+            print(f"{size:>8} {path:>8} {pair_ms:>10.4f} {unit_ms:>10.4f} {best_ms:>11.4f} "
+                  f"{diff:>10.1e} {same_best:>4}/{len(queries):<3}")
+            if diff > KERNEL_TOLERANCE or same_best != len(queries):
+                print(f"Warning: Kernel Numba berbeda dari path NumPy "
+                      f"(max diff {diff:.1e}, argmax sama {same_best}/{len(queries)})")
+
+
+def bench_batch(args, rng):
+    """Benchmark match_batch vs find_best_match per frame (footage rekaman)"""
+    print()
+    print(f"{'refs':>8} {'frames':>8} {'loop ms':>10} {'batch ms':>10} {'speedup':>8} {'max diff':>10}")
+
+    poses = rng.random((args.batch_frames, POSE_LANDMARK_COUNT, 3))
+    frames = [[tuple(lm) for lm in pose] for pose in poses]
+
+    for size in [int(s) for s in args.sizes.split(',')]:
+        matcher = PoseMatcher(make_library(size, rng))
+        matcher.cache_tolerance = 0
+
+        start = time.perf_counter()
+        loop_scores = [matcher.find_best_match(frame)[1] for frame in frames]
+        loop_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        result = matcher.match_batch(poses)
+        batch_ms = (time.perf_counter() - start) * 1000
+
+        diff = float(np.abs(result['scores'] - np.asarray(loop_scores)).max())
+        print(f"{size:>8} {len(frames):>8} {loop_ms:>10.1f} {batch_ms:>10.1f} "
+              f"{loop_ms / batch_ms:>7.1f}x {diff:>10.1e}")
+
+
+def bench_store(args, rng):
+    """Benchmark ReferenceStore (int8/float16, mmap) untuk library besar"""
+    print()
+    print(f"{'refs':>8} {'dtype':>8} {'size MB':>10} {'load ms':>10} {'top-1 ms':>10} {'recall':>8}")
+
+    for size in [int(s) for s in args.store_sizes.split(',')]:
+        vectors = rng.standard_normal((size, VECTOR_DIM)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        names = [f"pose_{i}" for i in range(size)]
+
+        # Query = referensi acak + noise, jawaban benar = index referensi tersebut
+        targets = rng.integers(0, size, args.queries)
+        queries = vectors[targets] + 0.05 * rng.standard_normal((args.queries, VECTOR_DIM)).astype(np.float32)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+        for dtype in ['int8', 'float16']:
+            with tempfile.TemporaryDirectory() as tmp:
+                ReferenceStore.from_vectors(names, vectors, dtype).save(tmp)
+
+                start = time.perf_counter()
+                store = ReferenceStore.load(tmp)
+                load_ms = (time.perf_counter() - start) * 1000
+
+                start = time.perf_counter()
+                hits = sum(int(store.top_k(q, k=1)[0][0]) == t for q, t in zip(queries, targets))
+                query_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+                print(f"{size:>8} {dtype:>8} {store.nbytes() / 1e6:>10.1f} {load_ms:>10.2f} "
+                      f"{query_ms:>10.2f} {hits / len(queries):>8.0%}")
+                del store
+
+
+if __name__ == "__main__":
+    main()
@@ -4,14 +4,96 @@
 CAMERA_WIDTH = 640
 CAMERA_HEIGHT = 480
 CAMERA_INDEX = 0
+CAPTURE_THREAD = True  # Grab kamera di thread sendiri, selalu proses frame terbaru
+SHM_FRAME_NAME = "gesture_frames"  # Nama shared memory ring untuk source shm (lihat shm_producer.py)
+SHM_FRAME_SLOTS = 4  # Jumlah slot frame di ring (harus sama di producer dan consumer)
+SHM_FRAME_TIMEOUT = 2.0  # Berhenti jika producer tidak mengirim frame selama N detik
 
 # MediaPipe settings
 MIN_DETECTION_CONFIDENCE = 0.5
 MIN_TRACKING_CONFIDENCE = 0.5
+AUTO_SELECT_MODELS = True  # Jalankan hanya Pose/Hands yang dipakai library referensi
 
 # Pose matching settings
 SIMILARITY_THRESHOLD = 0.85  # Threshold untuk menganggap pose cocok (0-1)
 MATCH_DISPLAY_TIME = 3  # Waktu display hasil match (detik)
+MATCHING_MODE = "cosine"  # "cosine" atau "procrustes" (align rotasi sebelum scoring)
+PROCRUSTES_MAX_ANGLE = 30  # Rotasi maksimum yang dikompensasi mode procrustes (derajat)
+MATCH_CACHE_TOLERANCE = 0.01  # Error similarity maksimum saat skor frame sebelumnya dipakai ulang, 0 = nonaktif
+POSE_WEIGHT = 1.0  # Bobot similarity pose tubuh
+HAND_WEIGHT = 0.0  # Bobot similarity bentuk tangan (naikkan, misalnya 0.5, untuk gesture jari)
+USE_NUMBA = True  # Pakai kernel Numba (kernels.py) jika numba terinstall, fallback NumPy
+MATCH_BATCH_ELEMENTS = 4_000_000  # Elemen skor maksimum (baris x referensi) per chunk match_batch
+
+# Gesture smoothing settings (smooth_gesture di main.py, tuning dengan sweep_params.py)
+HISTORY_SIZE = 8  # Jumlah frame terakhir untuk voting gesture
+MIN_HOLD_FRAMES = 10  # Perlu hold N frame sebelum gesture dianggap stabil
+STABLE_VOTE_RATIO = 0.6  # Gesture dihitung hold jika muncul di > rasio ini dari history
+CLEAR_VOTE_RATIO = 0.7  # Gesture stabil dihapus jika None di > rasio ini dari history
+
+# Reference loading settings (lihat reference_loader.py)
+REFERENCE_REDUCED_DECODE = True  # Decode gambar besar di 1/2, 1/4 atau 1/8 resolusi (minimal CAMERA_WIDTH x CAMERA_HEIGHT)
+
+# Reference store settings (library besar, lihat reference_store.py)
+REFERENCE_STORE_PATH = None  # Folder store packed, None = pakai reference_images saja
+STORE_CHUNK_ROWS = 65536  # Baris per chunk saat scoring store
+STORE_RESCORE_CANDIDATES = 32  # Kandidat teratas yang di-rescore float32
+
+# Reference lint settings (lihat lint_references.py)
+LINT_BLOCK_ELEMENTS = 4_000_000  # Elemen float maksimum per blok matrix similarity
+
+# Parameter sweep settings (lihat sweep_params.py)
+SWEEP_BLOCK_ELEMENTS = 4_000_000  # Elemen maksimum (konfigurasi x frame) per blok simulasi
+SWEEP_WORKERS = 0  # Jumlah process sweep, 0 = jumlah core
+
+# Matcher process settings
+MATCHER_PROCESS = False  # Jalankan PoseMatcher di process terpisah (shared memory)
+MATCHER_RING_SLOTS = 4  # Jumlah slot ring buffer landmark/score
+MATCHER_RESULT_TIMEOUT = 0.0  # Tunggu hasil frame saat ini (detik), 0 = pakai hasil terbaru
+MATCHER_SHARDS = 0  # Bagi library ke N process matcher (sharded_matcher.py), 0 = nonaktif
+SHARD_TOP_K = 5  # Kandidat teratas yang dibalas setiap shard
+SHARD_DEADLINE = 0.03  # Batas waktu per frame menunggu shard (detik), shard terlambat dilewati
+
+# Dynamic gesture settings (DTW)
+DTW_SIMILARITY_THRESHOLD = 0.9  # Rata-rata similarity minimum sepanjang gesture (0-1)
+DTW_FRAME_MAX_DISTANCE = 0.4  # Jarak (1 - cos) maksimum per pasangan frame
+DTW_MAX_REFERENCE_LENGTH = 32  # Panjang maksimum sequence referensi (frame)
+DTW_HOLD_SECONDS = 1.5  # Lama gesture dinamis ditampilkan sebagai stable_gesture setelah match
+
+# Gesture event settings (lihat gesture_events.py)
+EVENT_HOLD_SECONDS = 1.0  # Kirim gesture_held setelah gesture bertahan N detik
+EVENT_PERSON_LOST_FRAMES = 15  # Kirim person_lost setelah N frame tanpa landmark
+
+# Idle mode settings (tidak ada orang di frame)
+IDLE_AFTER_FRAMES = 90  # Masuk idle setelah N frame kosong berturut-turut, 0 = nonaktif
+IDLE_CHECK_INTERVAL = 0.05  # Interval presence check saat idle (detik), ~1.5 frame @ 30 fps
+IDLE_FRAME_WIDTH = 160  # Lebar frame untuk presence check (pose lite saja)
+
+# Metrics settings (lihat metrics.py)
+METRICS_ENABLED = False  # Aktifkan metrics (endpoint Prometheus + log)
+METRICS_HOST = "127.0.0.1"  # Host endpoint /metrics
+METRICS_PORT = 9108  # Port endpoint /metrics, 0 = tanpa HTTP server
+METRICS_LOG_PATH = "output/metrics.jsonl"  # Log snapshot (.jsonl atau .csv), None = tanpa log
+METRICS_LOG_INTERVAL = 10  # Interval snapshot ke log (detik)
+METRICS_LOG_MAX_BYTES = 5 * 1024 * 1024  # Ukuran maksimum log sebelum rotasi
+METRICS_LOG_BACKUPS = 3  # Jumlah file log lama yang disimpan
+METRICS_MAX_LABELS = 1000  # Jumlah maksimum label referensi (sisanya masuk "_other")
+
+# Memory monitor settings (lihat memory_monitor.py)
+MEMORY_MONITOR = False  # Aktifkan memory monitor (tracemalloc menambah overhead alokasi)
+MEMORY_SAMPLE_INTERVAL = 60  # Interval sampling RSS + allocator teratas (detik)
+MEMORY_TOP_ALLOCATORS = 10  # Jumlah allocator teratas di log dan dump
+MEMORY_GROWTH_DUMP_MB = 50  # Dump diff snapshot otomatis setiap RSS naik N MB, 0 = manual saja
+MEMORY_TRACE_FRAMES = 5  # Kedalaman traceback tracemalloc
+MEMORY_LOG_PATH = "output/memory.jsonl"  # Log sample JSONL, None = tanpa log
+
+# Stack profiler settings (lihat stack_profiler.py)
+PROFILER_ENABLED = False  # Pasang hook profiler sejak start (SIGUSR2); tombol 'p' tetap bisa dipakai
+PROFILE_ON_START = False  # Langsung capture sekali saat aplikasi mulai
+PROFILE_DURATION = 10  # Lama satu capture (detik)
+PROFILE_INTERVAL = 0.005  # Interval sampling stack (detik)
+PROFILE_MAX_DEPTH = 64  # Kedalaman stack maksimum per sample
+PROFILE_SWITCH_INTERVAL = 0.0001  # sys.setswitchinterval selama capture (mengurangi bias GIL)
 
 # Colors (BGR format)
 COLOR_GREEN = (0, 255, 0)
@@ -27,4 +109,5 @@ FONT_THICKNESS = 2
 
 # Paths
 REFERENCE_IMAGES_PATH = "reference_images"
+REFERENCE_GESTURES_PATH = "reference_gestures"  # Video clip / recorded session (.npz)
 OUTPUT_PATH = "output"
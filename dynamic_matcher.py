@@ -0,0 +1,316 @@
+"""
+Dynamic Matcher Module
+Mencocokkan gesture dinamis (urutan pose, misalnya wave atau meme dance)
+dengan live stream menggunakan incremental dynamic time warping (DTW)
+"""
+
+import cv2
+import numpy as np
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from landmark_session import load_session
+import config
+
+VIDEO_EXTENSIONS = ['.mp4', '.avi', '.mov', '.mkv']
+SESSION_EXTENSIONS = ['.npz']
+
+
+def pose_feature(pose) -> Optional[np.ndarray]:
+    """
+    Ubah pose landmarks menjadi feature vector unit-length
+
+    Normalisasi sama dengan PoseMatcher._normalize_pose (center dan scale),
+    lalu dibagi norm-nya sehingga dot product = cosine similarity.
+
+    Args:
+        pose: List atau array (33, 3) landmarks (x, y, visibility)
+
+    Returns:
+        Vector (66,) float32, atau None jika pose tidak valid
+    """
+    if pose is None:
+        return None
+    coords = np.asarray(pose, dtype=np.float32)[:, :2]
+    if np.isnan(coords).any():
+        return None
+
+    centered = coords - coords.mean(axis=0)
+    vec = centered.reshape(-1)
+    norm = np.linalg.norm(vec)
+    if norm == 0:
+        return None
+    return vec / norm
+
+
+def resample_sequence(features: np.ndarray, max_length: int) -> np.ndarray:
+    """
+    Kurangi panjang sequence dengan sampling index yang merata
+
+    Args:
+        features: Array (T, D)
+        max_length: Panjang maksimum
+
+    Returns:
+        Array (min(T, max_length), D)
+    """
+    if len(features) <= max_length:
+        return features
+    idx = np.linspace(0, len(features) - 1, max_length).round().astype(int)
+    return features[idx]
+
+
+class DynamicMatcher:
+    """
+    Class untuk mencocokkan gesture dinamis dengan streaming subsequence DTW
+
+    Semua referensi disimpan dalam satu tensor (K, L_max, 66) sehingga satu
+    update per frame adalah operasi NumPy vektor atas semua referensi aktif.
+    Setiap frame live dipasangkan dengan tepat satu elemen referensi; langkah
+    yang diperbolehkan adalah tetap (live lebih lambat), maju satu, atau
+    lompat satu elemen (live sampai 2x lebih cepat). Karena setiap cell hanya
+    bergantung pada kolom sebelumnya, update adalah O(panjang referensi).
+
+    Matching memakai DTW dengan batas jarak lokal: setiap pasangan frame live
+    dan elemen referensi harus punya jarak (1 - cos) <= DTW_FRAME_MAX_DISTANCE,
+    dan rata-rata jarak sepanjang referensi harus memenuhi threshold.
+
+    Pre-filter lower bound: untuk vector unit, 1 - cos = ||a - b||^2 / 2, jadi
+    jarak frame live ke bounding box (envelope) semua elemen referensi adalah
+    lower bound jarak ke elemen mana pun. Referensi yang envelope-nya terlalu
+    jauh dilewati tanpa menghitung kolom DTW, dan referensi tanpa path hidup
+    hanya mengecek elemen pertamanya. Cell dengan cost di atas budget total
+    juga dibuang karena cost tidak pernah turun sepanjang path. Dengan begitu
+    biaya per frame tetap terbatas walaupun jumlah gesture dinamis bertambah.
+    """
+
+    def __init__(self, sequences: Dict[str, np.ndarray], threshold: Optional[float] = None,
+                 frame_max_distance: Optional[float] = None):
+        """
+        Inisialisasi DynamicMatcher
+
+        Args:
+            sequences: Dictionary {nama_gesture: array feature (T, 66)}
+            threshold: Similarity minimum (0-1) untuk dianggap match
+                       (default: config.DTW_SIMILARITY_THRESHOLD)
+            frame_max_distance: Jarak lokal maksimum per pasangan frame
+                                (default: config.DTW_FRAME_MAX_DISTANCE)
+        """
+        self.threshold = config.DTW_SIMILARITY_THRESHOLD if threshold is None else threshold
+        self.frame_max_distance = (config.DTW_FRAME_MAX_DISTANCE
+                                   if frame_max_distance is None else frame_max_distance)
+        self.names = [name for name, seq in sequences.items() if seq is not None and len(seq) > 0]
+
+        count = len(self.names)
+        self.lengths = np.array([len(sequences[name]) for name in self.names], dtype=np.int64)
+        max_len = int(self.lengths.max()) if count else 0
+        dim = sequences[self.names[0]].shape[1] if count else 0
+
+        self.features = np.zeros((count, max_len, dim), dtype=np.float32)
+        self.valid = np.zeros((count, max_len), dtype=bool)
+        self.lower = np.zeros((count, dim), dtype=np.float32)
+        self.upper = np.zeros((count, dim), dtype=np.float32)
+        for i, name in enumerate(self.names):
+            seq = sequences[name]
+            self.features[i, :len(seq)] = seq
+            self.valid[i, :len(seq)] = True
+            self.lower[i] = seq.min(axis=0)
+            self.upper[i] = seq.max(axis=0)
+        self.starts = np.ascontiguousarray(self.features[:, 0, :])
+
+        # Budget cost total per referensi: rata-rata jarak maksimum x panjang
+        self.max_distance = 2.0 * (1.0 - self.threshold)
+        self.budgets = (self.max_distance * self.lengths).astype(np.float32)
+
+        self.cost = np.full((count, max_len), np.inf, dtype=np.float32)
+        self.alive = np.zeros(count, dtype=bool)
+        self.last_active_count = 0
+
+    def __len__(self):
+        return len(self.names)
+
+    def reset(self):
+        """Hapus semua path DTW yang sedang berjalan"""
+        self.cost.fill(np.inf)
+        self.alive.fill(False)
+
+    def update(self, current_landmarks) -> Tuple[Optional[str], float]:
+        """
+        Update DTW dengan satu frame live dan cek apakah ada gesture yang selesai
+
+        Args:
+            current_landmarks: Dict atau List landmarks dari frame saat ini
+
+        Returns:
+            Tuple berisi:
+            - Nama gesture dinamis yang match (atau None)
+            - Similarity score gesture terbaik
+        """
+        self.last_active_count = 0
+        if len(self.names) == 0 or current_landmarks is None:
+            return None, 0.0
+
+        pose = current_landmarks.get('pose_landmarks') if isinstance(current_landmarks, dict) \
+            else current_landmarks
+        feature = pose_feature(pose)
+        if feature is None:
+            return None, 0.0
+
+        cap = self.frame_max_distance
+
+        # Pre-filter 1: lower bound jarak ke envelope referensi
+        outside = feature - np.clip(feature, self.lower, self.upper)
+        envelope_bound = 0.5 * np.einsum('kd,kd->k', outside, outside)
+        reachable = envelope_bound <= cap
+
+        dead = self.alive & ~reachable
+        if dead.any():
+            self.cost[dead] = np.inf
+            self.alive[dead] = False
+
+        # Pre-filter 2: path baru hanya bisa mulai jika elemen pertama cukup dekat
+        can_start = np.zeros(len(self.names), dtype=bool)
+        candidates = np.flatnonzero(reachable)
+        if len(candidates):
+            can_start[candidates] = 1.0 - self.starts[candidates] @ feature <= cap
+
+        active = np.flatnonzero(self.alive | can_start)
+        self.last_active_count = len(active)
+        if len(active) == 0:
+            return None, 0.0
+
+        # Jarak frame live ke semua elemen referensi aktif: (A, L_max)
+        dist = 1.0 - self.features[active] @ feature
+        dist[(dist > cap) | ~self.valid[active]] = np.inf
+
+        # Langkah: tetap (j), maju satu (j-1), lompat satu (j-2)
+        prev = self.cost[active]
+        start = np.where(can_start[active], 0.0, np.inf).astype(np.float32)[:, None]
+        step = np.concatenate([start, prev[:, :-1]], axis=1)
+        skip = np.full_like(prev, np.inf)
+        skip[:, 2:] = prev[:, :-2]
+
+        new_cost = dist + np.minimum(np.minimum(prev, step), skip)
+
+        # Pruning: cell di atas budget tidak akan pernah match
+        new_cost[new_cost > self.budgets[active, None]] = np.inf
+        self.cost[active] = new_cost
+        self.alive[active] = np.isfinite(new_cost).any(axis=1)
+
+        # Path yang sudah mencapai elemen terakhir referensi
+        end_cost = new_cost[np.arange(len(active)), self.lengths[active] - 1]
+        similarities = np.where(np.isfinite(end_cost),
+                                1.0 - end_cost / (2.0 * self.lengths[active]), 0.0)
+
+        best = int(np.argmax(similarities))
+        best_score = float(similarities[best])
+        if best_score >= self.threshold:
+            return self.names[active[best]], best_score
+        return None, best_score
+
+
+def sequence_from_video(detector, video_path: str, max_length: int) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """
+    Ekstrak sequence feature pose dari video clip
+
+    Args:
+        detector: GestureDetector untuk deteksi pose
+        video_path: Path ke file video
+        max_length: Panjang sequence maksimum
+
+    Returns:
+        Tuple berisi:
+        - Array feature (T, 66) (atau None jika tidak ada pose)
+        - Frame tengah (di antara frame yang berisi pose) untuk display (atau None)
+    """
+    cap = cv2.VideoCapture(video_path)
+    features = []
+    pose_frames = []  # Index frame video yang berisi pose
+    thumbnail = None
+    try:
+        index = -1
+        frame = None
+        while True:
+            ret, frame = cap.read(frame)
+            if not ret:
+                break
+            index += 1
+            _, landmarks = detector.process_frame(frame)
+            if landmarks is None:
+                continue
+            feature = pose_feature(landmarks.get('pose_landmarks'))
+            if feature is not None:
+                features.append(feature)
+                pose_frames.append(index)
+
+        # process_frame menggambar skeleton in-place: baca ulang frame tengah
+        # untuk thumbnail daripada menyalin setiap frame
+        if features and cap.set(cv2.CAP_PROP_POS_FRAMES, pose_frames[len(pose_frames) // 2]):
+            ret, frame = cap.read()
+            thumbnail = frame if ret else None
+    finally:
+        cap.release()
+
+    if not features:
+        return None, None
+    return resample_sequence(np.stack(features), max_length), thumbnail
+
+
+def sequence_from_session(session_path: str, max_length: int) -> Optional[np.ndarray]:
+    """
+    Ekstrak sequence feature pose dari recorded session (.npz)
+
+    Args:
+        session_path: Path ke file session
+        max_length: Panjang sequence maksimum
+
+    Returns:
+        Array feature (T, 66) (atau None jika tidak ada pose)
+    """
+    session = load_session(session_path)
+    features = [f for f in (pose_feature(p) for p in session['pose']) if f is not None]
+    if not features:
+        return None
+    return resample_sequence(np.stack(features), max_length)
+
+
+def load_dynamic_gestures(detector, path: Optional[str] = None) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    """
+    Load semua gesture dinamis dari folder (video clip dan recorded session)
+
+    Args:
+        detector: GestureDetector untuk deteksi pose di video
+        path: Folder gesture (default: config.REFERENCE_GESTURES_PATH)
+
+    Returns:
+        Tuple berisi:
+        - Dictionary {nama_gesture: array feature (T, 66)}
+        - Dictionary {nama_gesture: thumbnail} untuk gesture dari video
+    """
+    gesture_path = Path(path or config.REFERENCE_GESTURES_PATH)
+    sequences = {}
+    thumbnails = {}
+    if not gesture_path.exists():
+        return sequences, thumbnails
+
+    max_length = config.DTW_MAX_REFERENCE_LENGTH
+    for file_path in sorted(gesture_path.iterdir()):
+        ext = file_path.suffix.lower()
+        name = file_path.stem
+        if ext in VIDEO_EXTENSIONS:
+            print(f"  Processing gesture: {file_path.name}...")
+            seq, thumbnail = sequence_from_video(detector, str(file_path), max_length)
+            if thumbnail is not None:
+                thumbnails[name] = thumbnail
+        elif ext in SESSION_EXTENSIONS:
+            print(f"  Processing gesture: {file_path.name}...")
+            seq = sequence_from_session(str(file_path), max_length)
+        else:
+            continue
+
+        if seq is not None and len(seq) >= 2:
+            sequences[name] = seq
+            print(f"    ✓ Gesture dinamis '{name}' berhasil dimuat ({len(seq)} frame)")
+        else:
+            print(f"    ✗ Gagal mendeteksi pose di '{name}'")
+
+    return sequences, thumbnails
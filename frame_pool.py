@@ -0,0 +1,56 @@
+"""
+Frame Pool Module
+Pool buffer frame yang dialokasikan sekali dan dipakai ulang setiap frame
+"""
+
+import numpy as np
+from typing import Tuple
+
+
+class BufferPool:
+    """
+    Pool buffer numpy per nama, dipakai bergiliran (round-robin)
+
+    Setiap nama punya `depth` buffer sehingga buffer frame sebelumnya masih
+    utuh saat frame berikutnya ditulis. Buffer hanya dialokasikan ulang jika
+    shape atau dtype berubah, jadi di steady state tidak ada alokasi baru.
+    """
+
+    def __init__(self, depth: int = 2):
+        """
+        Args:
+            depth: Jumlah buffer per nama
+        """
+        self.depth = depth
+        self.allocations = 0
+        self._buffers = {}
+        self._index = {}
+
+    def get(self, key: str, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        """
+        Ambil buffer berikutnya untuk nama tertentu
+
+        Args:
+            key: Nama buffer (misalnya 'rgb', 'mirror')
+            shape: Shape buffer
+            dtype: Dtype buffer
+
+        Returns:
+            Array yang isinya tidak terdefinisi (harus ditulis penuh oleh caller)
+        """
+        shape = tuple(shape)
+        dtype = np.dtype(dtype)
+        ring = self._buffers.get(key)
+        if ring is None or ring[0].shape != shape or ring[0].dtype != dtype:
+            ring = [np.empty(shape, dtype=dtype) for _ in range(self.depth)]
+            self._buffers[key] = ring
+            self._index[key] = 0
+            self.allocations += self.depth
+
+        i = self._index[key]
+        self._index[key] = (i + 1) % self.depth
+        return ring[i]
+
+    def nbytes(self) -> int:
+        """Total memory semua buffer di pool (bytes)"""
+        return sum(buf.nbytes for ring in self._buffers.values() for buf in ring)
@@ -7,56 +7,111 @@ import cv2
 import mediapipe as mp
 import numpy as np
 from typing import Optional, List, Tuple, Dict
+from frame_pool import BufferPool
+from skeleton_renderer import SkeletonRenderer
 import config
 
+# Index pose landmark setelah di-mirror: kiri <-> kanan (nose tetap)
+POSE_MIRROR_INDEX = [0, 4, 5, 6, 1, 2, 3, 8, 7, 10, 9, 12, 11, 14, 13, 16, 15,
+                     18, 17, 20, 19, 22, 21, 24, 23, 26, 25, 28, 27, 30, 29, 32, 31]
+
 
 class GestureDetector:
     """Class untuk mendeteksi pose dan hand tracking menggunakan MediaPipe"""
     
-    def __init__(self):
-        """Inisialisasi MediaPipe Pose dan Hands"""
+    def __init__(self, use_pose: bool = True, use_hands: bool = True):
+        """
+        Inisialisasi MediaPipe Pose dan Hands
+        
+        Args:
+            use_pose: Jalankan graph Pose
+            use_hands: Jalankan graph Hands
+        """
         self.mp_pose = mp.solutions.pose
         self.mp_hands = mp.solutions.hands
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.mp_drawing_styles = mp.solutions.drawing_styles
+        self.renderer = SkeletonRenderer()  # Pengganti mp_drawing, style disiapkan sekali
+        
+        self.pose = None
+        self.hands = None
+        self.set_models(use_pose, use_hands)
+        
+        # Buffer RGB dan mirror dipakai ulang setiap frame
+        self.pool = BufferPool()
+        
+        # Model pose ringan untuk presence check saat idle (dibuat saat pertama dipakai)
+        self.presence_pose = None
+        
+    def set_models(self, use_pose: bool, use_hands: bool):
+        """
+        Pilih graph MediaPipe yang dijalankan; graph yang tidak dipakai ditutup
         
-        self.pose = self.mp_pose.Pose(
-            min_detection_confidence=config.MIN_DETECTION_CONFIDENCE,
-            min_tracking_confidence=config.MIN_TRACKING_CONFIDENCE
-        )
+        Args:
+            use_pose: Jalankan graph Pose
+            use_hands: Jalankan graph Hands
+        """
+        if use_pose and self.pose is None:
+            self.pose = self.mp_pose.Pose(
+                min_detection_confidence=config.MIN_DETECTION_CONFIDENCE,
+                min_tracking_confidence=config.MIN_TRACKING_CONFIDENCE
+            )
+        elif not use_pose and self.pose is not None:
+            self.pose.close()
+            self.pose = None
         
         # Inisialisasi hand tracking
-        self.hands = self.mp_hands.Hands(
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.7,
-            max_num_hands=2
-        )
+        if use_hands and self.hands is None:
+            self.hands = self.mp_hands.Hands(
+                min_detection_confidence=0.7,
+                min_tracking_confidence=0.7,
+                max_num_hands=2
+            )
+        elif not use_hands and self.hands is not None:
+            self.hands.close()
+            self.hands = None
+    
+    def select_models(self, required: set):
+        """
+        Jalankan hanya graph yang dibutuhkan matching
         
-    def process_frame(self, frame: np.ndarray) -> Tuple[np.ndarray, Optional[Dict]]:
+        Args:
+            required: Set berisi 'pose' dan/atau 'hands' (misalnya dari
+                      PoseMatcher.required_landmarks()); set kosong = keduanya
+        """
+        if not required:
+            required = {'pose', 'hands'}
+        self.set_models('pose' in required, 'hands' in required)
+        active = [name for name, model in (('Pose', self.pose), ('Hands', self.hands)) if model is not None]
+        print(f"Model MediaPipe aktif: {' + '.join(active)}")
+    
+    def process_frame(self, frame: np.ndarray, mirror: bool = False) -> Tuple[np.ndarray, Optional[Dict]]:
         """
         Proses frame untuk mendeteksi pose dan hands
         
+        Skeleton digambar langsung (in-place) di `frame`. Jika mirror=True,
+        inference tetap berjalan di frame asli; koordinat landmark yang di-mirror
+        (x -> 1 - x, index kiri/kanan pose ditukar) dan pixel hanya di-flip sekali
+        ke buffer display yang dipakai ulang.
+        
         Args:
-            frame: Frame dari webcam (BGR format)
+            frame: Frame dari webcam (BGR format), akan digambar skeleton
+            mirror: Return display dan landmarks dalam versi mirror
             
         Returns:
             Tuple berisi:
             - Frame yang sudah digambar skeleton pose dan hands
             - Dict dengan 'pose_landmarks' dan 'hand_landmarks' (atau None jika tidak terdeteksi)
         """
-        # Convert BGR to RGB
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        # Convert BGR to RGB ke buffer yang dipakai ulang
+        frame_rgb = self.pool.get('rgb', frame.shape)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame_rgb)
         frame_rgb.flags.writeable = False
         
-        # Process pose dengan MediaPipe
-        pose_results = self.pose.process(frame_rgb)
-        
-        # Process hands dengan MediaPipe
-        hands_results = self.hands.process(frame_rgb)
+        # Process pose dan hands dengan MediaPipe (hanya graph yang aktif)
+        pose_results = self.pose.process(frame_rgb) if self.pose is not None else None
+        hands_results = self.hands.process(frame_rgb) if self.hands is not None else None
         
-        # Convert back to BGR
         frame_rgb.flags.writeable = True
-        frame_bgr = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR)
+        frame_bgr = frame
         
         landmarks_data = {
             'pose_landmarks': None,
@@ -64,60 +119,101 @@ class GestureDetector:
         }
         
         # Gambar pose landmarks jika terdeteksi
-        if pose_results.pose_landmarks:
-            self.mp_drawing.draw_landmarks(
-                frame_bgr,
-                pose_results.pose_landmarks,
-                self.mp_pose.POSE_CONNECTIONS,
-                landmark_drawing_spec=self.mp_drawing_styles.get_default_pose_landmarks_style()
-            )
+        if pose_results is not None and pose_results.pose_landmarks:
+            pose = self._landmark_array(pose_results.pose_landmarks)
+            self.renderer.draw(frame_bgr, pose, self.renderer.pose)
             
             # Extract pose landmarks
-            landmarks_data['pose_landmarks'] = self._extract_landmarks(pose_results.pose_landmarks)
+            landmarks_data['pose_landmarks'] = self._extract_landmarks(pose, mirror, POSE_MIRROR_INDEX)
         
         # Gambar hand landmarks jika terdeteksi
-        if hands_results.multi_hand_landmarks:
+        if hands_results is not None and hands_results.multi_hand_landmarks:
             for hand_landmarks in hands_results.multi_hand_landmarks:
                 # Gambar hand skeleton dengan warna berbeda
-                self.mp_drawing.draw_landmarks(
-                    frame_bgr,
-                    hand_landmarks,
-                    self.mp_hands.HAND_CONNECTIONS,
-                    self.mp_drawing_styles.get_default_hand_landmarks_style(),
-                    self.mp_drawing_styles.get_default_hand_connections_style()
-                )
+                hand = self._landmark_array(hand_landmarks)
+                self.renderer.draw(frame_bgr, hand, self.renderer.hand)
                 
                 # Extract hand landmarks
-                hand_lm = self._extract_landmarks(hand_landmarks)
+                hand_lm = self._extract_landmarks(hand, mirror)
                 landmarks_data['hand_landmarks'].append(hand_lm)
         
+        if mirror:
+            frame_bgr = cv2.flip(frame, 1, dst=self.pool.get('mirror', frame.shape))
+        
         # Return frame dan landmarks (atau None jika tidak ada yang terdeteksi)
         if landmarks_data['pose_landmarks'] is not None or len(landmarks_data['hand_landmarks']) > 0:
             return frame_bgr, landmarks_data
         
         return frame_bgr, None
     
-    def _extract_landmarks(self, pose_landmarks) -> List[Tuple[float, float, float]]:
+    def detect_presence(self, frame: np.ndarray) -> bool:
+        """
+        Presence check murah untuk idle mode: pose saja (model lite),
+        di frame yang diperkecil ke config.IDLE_FRAME_WIDTH, tanpa menggambar
+        
+        Args:
+            frame: Frame dari webcam (BGR format)
+            
+        Returns:
+            True jika ada orang (pose) di frame
+        """
+        if self.presence_pose is None:
+            self.presence_pose = self.mp_pose.Pose(
+                model_complexity=0,
+                min_detection_confidence=config.MIN_DETECTION_CONFIDENCE,
+                min_tracking_confidence=config.MIN_TRACKING_CONFIDENCE
+            )
+        
+        height, width = frame.shape[:2]
+        small_width = min(width, config.IDLE_FRAME_WIDTH)
+        small_height = max(1, height * small_width // width)
+        small = self.pool.get('presence', (small_height, small_width) + frame.shape[2:])
+        cv2.resize(frame, (small_width, small_height), dst=small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=small)
+        small.flags.writeable = False
+        results = self.presence_pose.process(small)
+        small.flags.writeable = True
+        return results.pose_landmarks is not None
+    
+    @staticmethod
+    def _landmark_array(landmark_list) -> np.ndarray:
+        """
+        MediaPipe landmark list sebagai array (N, 3) berisi (x, y, visibility)
+        
+        Dibaca sekali per frame, dipakai untuk menggambar skeleton dan extract.
+        """
+        return np.array([(landmark.x, landmark.y, landmark.visibility)
+                         for landmark in landmark_list.landmark], dtype=np.float64)
+    
+    def _extract_landmarks(self, landmarks: np.ndarray, mirror: bool = False,
+                           mirror_index: Optional[List[int]] = None) -> List[Tuple[float, float, float]]:
         """
-        Extract pose landmarks sebagai list koordinat
+        Extract landmarks sebagai list koordinat
         
         Args:
-            pose_landmarks: MediaPipe pose landmarks object
+            landmarks: Array (N, 3) dari _landmark_array
+            mirror: Mirror koordinat x (x -> 1 - x)
+            mirror_index: Urutan index setelah mirror (untuk tukar kiri/kanan)
             
         Returns:
             List of tuples (x, y, visibility)
         """
-        landmarks = []
-        for landmark in pose_landmarks.landmark:
-            landmarks.append((landmark.x, landmark.y, landmark.visibility))
-        return landmarks
+        if mirror:
+            landmarks = landmarks.copy()
+            landmarks[:, 0] = 1.0 - landmarks[:, 0]
+            if mirror_index is not None:
+                landmarks = landmarks[mirror_index]
+        return [tuple(row) for row in landmarks.tolist()]
     
-    def process_image(self, image_path: str) -> Tuple[Optional[np.ndarray], Optional[Dict]]:
+    def process_image(self, image_path: str,
+                      image: Optional[np.ndarray] = None) -> Tuple[Optional[np.ndarray], Optional[Dict]]:
         """
         Proses gambar untuk mendeteksi pose dan hands
         
         Args:
             image_path: Path ke file gambar
+            image: Gambar BGR yang sudah di-decode (opsional, file tidak dibaca
+                   ulang; tidak diubah)
             
         Returns:
             Tuple berisi:
@@ -125,7 +221,8 @@ class GestureDetector:
             - Dict landmarks pose dan hands (atau None)
         """
         try:
-            image = cv2.imread(image_path)
+            if image is None:
+                image = cv2.imread(image_path)
             if image is None:
                 print(f"Error: Tidak bisa membaca gambar {image_path}")
                 return None, None
@@ -134,11 +231,9 @@ class GestureDetector:
             image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
             image_rgb.flags.writeable = False
             
-            # Process pose dengan MediaPipe
-            pose_results = self.pose.process(image_rgb)
-            
-            # Process hands dengan MediaPipe
-            hands_results = self.hands.process(image_rgb)
+            # Process pose dan hands dengan MediaPipe (hanya graph yang aktif)
+            pose_results = self.pose.process(image_rgb) if self.pose is not None else None
+            hands_results = self.hands.process(image_rgb) if self.hands is not None else None
             
             # Convert back to BGR
             image_rgb.flags.writeable = True
@@ -149,29 +244,20 @@ class GestureDetector:
                 'hand_landmarks': []
             }
             
-            if pose_results.pose_landmarks:
+            if pose_results is not None and pose_results.pose_landmarks:
                 # Gambar pose landmarks
-                self.mp_drawing.draw_landmarks(
-                    image_bgr,
-                    pose_results.pose_landmarks,
-                    self.mp_pose.POSE_CONNECTIONS,
-                    landmark_drawing_spec=self.mp_drawing_styles.get_default_pose_landmarks_style()
-                )
+                pose = self._landmark_array(pose_results.pose_landmarks)
+                self.renderer.draw(image_bgr, pose, self.renderer.pose)
                 
-                landmarks_data['pose_landmarks'] = self._extract_landmarks(pose_results.pose_landmarks)
+                landmarks_data['pose_landmarks'] = self._extract_landmarks(pose)
             
             # Gambar hand landmarks jika terdeteksi
-            if hands_results.multi_hand_landmarks:
+            if hands_results is not None and hands_results.multi_hand_landmarks:
                 for hand_landmarks in hands_results.multi_hand_landmarks:
-                    self.mp_drawing.draw_landmarks(
-                        image_bgr,
-                        hand_landmarks,
-                        self.mp_hands.HAND_CONNECTIONS,
-                        self.mp_drawing_styles.get_default_hand_landmarks_style(),
-                        self.mp_drawing_styles.get_default_hand_connections_style()
-                    )
+                    hand = self._landmark_array(hand_landmarks)
+                    self.renderer.draw(image_bgr, hand, self.renderer.hand)
                     
-                    hand_lm = self._extract_landmarks(hand_landmarks)
+                    hand_lm = self._extract_landmarks(hand)
                     landmarks_data['hand_landmarks'].append(hand_lm)
             
             if landmarks_data['pose_landmarks'] is not None or len(landmarks_data['hand_landmarks']) > 0:
@@ -186,5 +272,6 @@ class GestureDetector:
     
     def close(self):
         """Tutup MediaPipe Pose dan Hands"""
-        self.pose.close()
-        self.hands.close()
+        self.set_models(False, False)
+        if self.presence_pose is not None:
+            self.presence_pose.close()
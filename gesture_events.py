@@ -0,0 +1,246 @@
+"""
+Gesture Events Module
+Stream event gesture yang hanya dikirim saat ada perubahan (gesture masuk,
+di-hold, keluar, orang muncul/hilang), sebagai callback atau async iterator
+asyncio. Consumer tidak perlu polling state per frame.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from pipeline import FrameResult, FrameSink
+import config
+
+GESTURE_ENTERED = 'gesture_entered'
+GESTURE_HELD = 'gesture_held'
+GESTURE_LEFT = 'gesture_left'
+PERSON_APPEARED = 'person_appeared'
+PERSON_LOST = 'person_lost'
+
+EVENT_TYPES = (GESTURE_ENTERED, GESTURE_HELD, GESTURE_LEFT, PERSON_APPEARED, PERSON_LOST)
+
+
+class GestureEvent:
+    """Satu transisi state gesture atau kehadiran orang"""
+
+    def __init__(self, event_type: str, frame_index: int, gesture: Optional[str] = None,
+                 similarity: float = 0.0, duration: float = 0.0):
+        self.type = event_type          # Salah satu EVENT_TYPES
+        self.timestamp = time.time()    # Wall clock saat event dibuat
+        self.frame_index = frame_index  # FrameResult.index yang memicu event
+        self.gesture = gesture          # Nama gesture (None untuk event orang)
+        self.similarity = similarity    # Similarity terakhir gesture (0 untuk event orang)
+        self.duration = duration        # Detik sejak gesture masuk / orang muncul
+
+    def to_dict(self) -> Dict:
+        """Event sebagai dictionary (untuk JSON / log)"""
+        return {
+            'type': self.type,
+            'timestamp': self.timestamp,
+            'frame_index': self.frame_index,
+            'gesture': self.gesture,
+            'similarity': round(float(self.similarity), 4),
+            'duration': round(self.duration, 3)
+        }
+
+    def __repr__(self):
+        target = f" {self.gesture}" if self.gesture else ""
+        return f"GestureEvent({self.type}{target}, sim={self.similarity:.2f}, {self.duration:.2f}s)"
+
+
+class GestureEventStream(FrameSink):
+    """
+    Sink pipeline yang mengubah hasil per frame menjadi event transisi
+
+    - gesture_entered: stable_gesture berubah menjadi gesture baru
+    - gesture_held: gesture yang sama bertahan EVENT_HOLD_SECONDS (sekali per hold)
+    - gesture_left: stable_gesture berubah dari gesture ini
+    - person_appeared / person_lost: ada/tidak ada landmark, person_lost
+      baru dikirim setelah EVENT_PERSON_LOST_FRAMES frame kosong berturut-turut
+
+    Callback dipanggil di thread pipeline. Async iterator (events()) boleh
+    dipakai dari event loop asyncio lain; event dikirim thread-safe.
+    """
+
+    def __init__(self, hold_seconds: Optional[float] = None,
+                 person_lost_frames: Optional[int] = None):
+        """
+        Args:
+            hold_seconds: Lama hold sebelum gesture_held (default: config.EVENT_HOLD_SECONDS)
+            person_lost_frames: Frame kosong sebelum person_lost
+                (default: config.EVENT_PERSON_LOST_FRAMES)
+        """
+        self.hold_seconds = config.EVENT_HOLD_SECONDS if hold_seconds is None else hold_seconds
+        self.person_lost_frames = (config.EVENT_PERSON_LOST_FRAMES
+                                   if person_lost_frames is None else person_lost_frames)
+        self._lock = threading.Lock()
+        self._callbacks: List[Tuple[Callable, Optional[set]]] = []
+        self._queues: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self._closed = False
+        self.event_count = 0
+        self.reset()
+
+    def reset(self):
+        """Kembali ke state awal (tidak ada gesture, tidak ada orang)"""
+        self.gesture = None
+        self.similarity = 0.0
+        self._gesture_since = 0.0
+        self._held_sent = False
+        self.person_present = False
+        self._person_since = 0.0
+        self._empty_frames = 0
+
+    def subscribe(self, callback: Callable[[GestureEvent], None],
+                  types: Optional[Iterable[str]] = None) -> Callable[[], None]:
+        """
+        Daftarkan callback event
+
+        Args:
+            callback: Fungsi (event), dipanggil di thread pipeline
+            types: Tipe event yang diterima (default: semua)
+
+        Returns:
+            Fungsi untuk berhenti berlangganan
+        """
+        entry = (callback, set(types) if types is not None else None)
+        with self._lock:
+            self._callbacks.append(entry)
+
+        def unsubscribe():
+            with self._lock:
+                if entry in self._callbacks:
+                    self._callbacks.remove(entry)
+        return unsubscribe
+
+    def events(self):
+        """
+        Async iterator event untuk asyncio (harus dipanggil di dalam event loop)
+
+        Iterator selesai saat stream ditutup (pipeline berhenti).
+
+        Contoh:
+            async for event in stream.events():
+                print(event.type, event.gesture)
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        entry = (loop, queue)
+        with self._lock:
+            if self._closed:
+                queue.put_nowait(None)
+            else:
+                self._queues.append(entry)
+        return self._iterate(entry)
+
+    async def _iterate(self, entry: Tuple[asyncio.AbstractEventLoop, asyncio.Queue]):
+        """Ambil event dari queue sampai sentinel None"""
+        try:
+            while True:
+                event = await entry[1].get()
+                if event is None:
+                    return
+                yield event
+        finally:
+            with self._lock:
+                if entry in self._queues:
+                    self._queues.remove(entry)
+
+    def _emit(self, event: GestureEvent):
+        """Kirim event ke semua callback dan async iterator"""
+        self.event_count += 1
+        with self._lock:
+            callbacks = list(self._callbacks)
+            queues = list(self._queues)
+
+        for callback, types in callbacks:
+            if types is not None and event.type not in types:
+                continue
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Warning: Callback event {event.type} error: {e}")
+
+        for loop, queue in queues:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                pass  # Event loop consumer sudah ditutup
+
+    def update(self, result: FrameResult) -> List[GestureEvent]:
+        """
+        Proses satu hasil frame dan kirim event untuk setiap transisi
+
+        Args:
+            result: FrameResult dari pipeline
+
+        Returns:
+            List event yang dikirim (kosong jika tidak ada perubahan)
+        """
+        now = time.perf_counter()
+        events = []
+        landmarks = result.landmarks or {}
+        present = bool(landmarks.get('pose_landmarks') or landmarks.get('hand_landmarks'))
+
+        # Kehadiran orang (person_lost di-debounce supaya tidak berkedip)
+        if present:
+            self._empty_frames = 0
+            if not self.person_present:
+                self.person_present = True
+                self._person_since = now
+                events.append(GestureEvent(PERSON_APPEARED, result.index))
+        elif self.person_present:
+            self._empty_frames += 1
+            if self._empty_frames >= self.person_lost_frames:
+                self.person_present = False
+                events.append(GestureEvent(PERSON_LOST, result.index,
+                                           duration=now - self._person_since))
+
+        # Similarity terakhir yang benar-benar milik gesture aktif
+        gesture = result.stable_gesture
+        if gesture is not None and result.match_name == gesture:
+            similarity = result.similarity
+        else:
+            similarity = self.similarity if gesture == self.gesture else 0.0
+
+        if gesture != self.gesture:
+            if self.gesture is not None:
+                events.append(GestureEvent(GESTURE_LEFT, result.index, self.gesture,
+                                           self.similarity, now - self._gesture_since))
+            self.gesture = gesture
+            self.similarity = similarity
+            self._gesture_since = now
+            self._held_sent = False
+            if gesture is not None:
+                events.append(GestureEvent(GESTURE_ENTERED, result.index, gesture, similarity))
+        elif gesture is not None:
+            self.similarity = similarity
+            if not self._held_sent and now - self._gesture_since >= self.hold_seconds:
+                self._held_sent = True
+                events.append(GestureEvent(GESTURE_HELD, result.index, gesture, similarity,
+                                           now - self._gesture_since))
+
+        for event in events:
+            self._emit(event)
+        return events
+
+    def open(self):
+        with self._lock:
+            self._closed = False
+        self.reset()
+
+    def write(self, result: FrameResult) -> bool:
+        self.update(result)
+        return True
+
+    def close(self):
+        """Akhiri semua async iterator (callback tetap terdaftar)"""
+        with self._lock:
+            queues = list(self._queues)
+            self._queues.clear()
+            self._closed = True
+        for loop, queue in queues:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+            except RuntimeError:
+                pass
@@ -0,0 +1,132 @@
+"""
+Kernels Module
+Kernel normalisasi + similarity pose yang di-compile dengan Numba (opsional).
+Untuk vector 66 elemen, overhead dispatch NumPy (mean, std, flatten, dot,
+norm) lebih besar dari aritmetikanya; kernel di sini melakukan semuanya dalam
+satu loop. Jika Numba tidak terinstall (atau USE_NUMBA = False), PoseMatcher
+memakai path NumPy biasa. Selisih hasil kedua path hanya pembulatan float64
+(~1e-16, dicek di benchmark_matcher.py).
+"""
+
+import numpy as np
+from typing import Tuple
+import config
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+ENABLED = NUMBA_AVAILABLE and config.USE_NUMBA
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True)
+    def unit_vector(coords: np.ndarray) -> Tuple[np.ndarray, bool]:
+        """
+        Center koordinat lalu normalisasi ke vector unit-length
+
+        Hasil sama dengan _normalize_pose + flatten + bagi norm (skala std
+        hilang saat dibagi norm).
+
+        Args:
+            coords: Array koordinat (P, 2) float64
+
+        Returns:
+            Tuple berisi:
+            - Vector unit (2P,)
+            - False jika pose degenerate (norm nol)
+        """
+        count = coords.shape[0]
+        mean_x = 0.0
+        mean_y = 0.0
+        for i in range(count):
+            mean_x += coords[i, 0]
+            mean_y += coords[i, 1]
+        mean_x /= count
+        mean_y /= count
+
+        out = np.empty(count * 2)
+        total = 0.0
+        for i in range(count):
+            dx = coords[i, 0] - mean_x
+            dy = coords[i, 1] - mean_y
+            out[2 * i] = dx
+            out[2 * i + 1] = dy
+            total += dx * dx + dy * dy
+
+        norm = np.sqrt(total)
+        if norm == 0.0:
+            return out, False
+        for j in range(count * 2):
+            out[j] /= norm
+        return out, True
+
+    @njit(cache=True)
+    def pair_similarity(coords1: np.ndarray, coords2: np.ndarray) -> float:
+        """
+        Similarity (0-1) dua pose: normalisasi + cosine dalam satu kernel
+
+        Args:
+            coords1: Array koordinat (P, 2) float64
+            coords2: Array koordinat (P, 2) float64
+
+        Returns:
+            Similarity 0-1 (0 jika salah satu pose degenerate)
+        """
+        vec1, ok1 = unit_vector(coords1)
+        vec2, ok2 = unit_vector(coords2)
+        if not ok1 or not ok2:
+            return 0.0
+        dot = 0.0
+        for j in range(vec1.shape[0]):
+            dot += vec1[j] * vec2[j]
+        return (dot + 1.0) / 2.0
+
+    @njit(cache=True)
+    def cosine_similarities(unit: np.ndarray, ref_vectors: np.ndarray,
+                            ref_norms: np.ndarray, ref_valid: np.ndarray) -> np.ndarray:
+        """
+        Similarity (0-1) vector unit live terhadap semua referensi
+
+        Dot product, bagi norm referensi, konversi ke 0-1 dan masking
+        referensi tidak valid digabung dalam satu loop (tanpa array sementara).
+        Tanpa fastmath: urutan penjumlahan dan semantik NaN/inf tetap IEEE,
+        sehingga skor sama dengan path NumPy sampai pembulatan dot product.
+
+        Args:
+            unit: Vector unit pose live (66,)
+            ref_vectors: Matrix referensi (N, 66)
+            ref_norms: Norm referensi (N,)
+            ref_valid: Array bool (N,) referensi valid
+
+        Returns:
+            Array similarity (N,)
+        """
+        count, dim = ref_vectors.shape
+        scores = np.zeros(count)
+        for k in range(count):
+            if not ref_valid[k]:
+                continue
+            dot = 0.0
+            for j in range(dim):
+                dot += ref_vectors[k, j] * unit[j]
+            scores[k] = (dot / (ref_norms[k] + 1e-12) + 1.0) / 2.0
+        return scores
+
+
+_warmed_up = False
+
+
+def warmup():
+    """Compile (atau load dari cache) semua kernel supaya frame pertama tidak tersendat"""
+    global _warmed_up
+    if not NUMBA_AVAILABLE or _warmed_up:
+        return
+    coords = np.random.default_rng(0).random((4, 2))
+    unit, _ = unit_vector(coords)
+    pair_similarity(coords, coords)
+    cosine_similarities(unit, unit[None, :], np.ones(1), np.ones(1, dtype=np.bool_))
+    _warmed_up = True
@@ -0,0 +1,127 @@
+"""
+Landmark Session Module
+Rekam dan baca landmark per frame ke/dari file .npz (recorded session)
+"""
+
+import time
+import numpy as np
+from pathlib import Path
+from typing import Optional, Dict
+
+POSE_LANDMARK_COUNT = 33
+HAND_LANDMARK_COUNT = 21
+MAX_HANDS = 2
+
+
+def landmarks_to_arrays(landmarks: Optional[Dict], pose_out: np.ndarray, hands_out: np.ndarray):
+    """
+    Salin landmarks dict dari GestureDetector ke array dengan shape tetap
+
+    Args:
+        landmarks: Dict dengan 'pose_landmarks' dan 'hand_landmarks' (atau None)
+        pose_out: Array (33, 3) tujuan, diisi NaN jika pose tidak terdeteksi
+        hands_out: Array (2, 21, 3) tujuan, diisi NaN untuk tangan yang tidak ada
+    """
+    pose_out.fill(np.nan)
+    hands_out.fill(np.nan)
+    if landmarks is None:
+        return
+
+    pose = landmarks.get('pose_landmarks')
+    if pose is not None and len(pose) == POSE_LANDMARK_COUNT:
+        pose_out[:] = pose
+
+    for i, hand in enumerate(landmarks.get('hand_landmarks', [])[:MAX_HANDS]):
+        if len(hand) == HAND_LANDMARK_COUNT:
+            hands_out[i] = hand
+
+
+def arrays_to_landmarks(pose: np.ndarray, hands: np.ndarray) -> Optional[Dict]:
+    """
+    Landmarks dict dari array shape tetap (kebalikan landmarks_to_arrays)
+
+    Args:
+        pose: Array (33, 3), NaN jika pose tidak terdeteksi
+        hands: Array (2, 21, 3), NaN untuk tangan yang tidak ada
+
+    Returns:
+        Dict landmarks, atau None jika tidak ada pose maupun tangan
+    """
+    landmarks = {
+        'pose_landmarks': None if np.isnan(pose[0, 0]) else pose,
+        'hand_landmarks': [hand for hand in hands if not np.isnan(hand[0, 0])]
+    }
+    if landmarks['pose_landmarks'] is None and not landmarks['hand_landmarks']:
+        return None
+    return landmarks
+
+
+class LandmarkRecorder:
+    """Class untuk merekam landmark per frame selama aplikasi berjalan"""
+
+    def __init__(self):
+        """Inisialisasi recorder kosong"""
+        self.poses = []
+        self.hands = []
+        self.timestamps = []
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def add(self, landmarks: Optional[Dict], timestamp: Optional[float] = None):
+        """
+        Tambahkan landmark satu frame
+
+        Args:
+            landmarks: Dict landmarks dari GestureDetector (atau None)
+            timestamp: Waktu frame (default: time.time())
+        """
+        pose = np.empty((POSE_LANDMARK_COUNT, 3), dtype=np.float32)
+        hands = np.empty((MAX_HANDS, HAND_LANDMARK_COUNT, 3), dtype=np.float32)
+        landmarks_to_arrays(landmarks, pose, hands)
+        self.poses.append(pose)
+        self.hands.append(hands)
+        self.timestamps.append(time.time() if timestamp is None else timestamp)
+
+    def save(self, path) -> Path:
+        """
+        Simpan session ke file .npz
+
+        Args:
+            path: Path file tujuan
+
+        Returns:
+            Path file yang disimpan
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            pose=np.stack(self.poses) if self.poses else
+            np.empty((0, POSE_LANDMARK_COUNT, 3), dtype=np.float32),
+            hands=np.stack(self.hands) if self.hands else
+            np.empty((0, MAX_HANDS, HAND_LANDMARK_COUNT, 3), dtype=np.float32),
+            timestamps=np.asarray(self.timestamps, dtype=np.float64)
+        )
+        return path
+
+
+def load_session(path) -> Dict[str, np.ndarray]:
+    """
+    Baca recorded session dari file .npz
+
+    Args:
+        path: Path file session
+
+    Returns:
+        Dict dengan 'pose' (T, 33, 3), 'hands' (T, 2, 21, 3) dan 'timestamps' (T,).
+        Frame tanpa deteksi berisi NaN.
+    """
+    with np.load(str(path)) as data:
+        pose = data['pose'].astype(np.float32)
+        frames = len(pose)
+        hands = data['hands'].astype(np.float32) if 'hands' in data else \
+            np.full((frames, MAX_HANDS, HAND_LANDMARK_COUNT, 3), np.nan, dtype=np.float32)
+        timestamps = data['timestamps'] if 'timestamps' in data else \
+            np.arange(frames, dtype=np.float64)
+    return {'pose': pose, 'hands': hands, 'timestamps': timestamps}
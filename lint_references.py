@@ -0,0 +1,202 @@
+"""
+Reference Lint Tool
+Cek library referensi sebelum dipakai live: matrix similarity N x N (dihitung
+per blok), cluster referensi yang saling tertukar, margin terhadap
+SIMILARITY_THRESHOLD, dan gambar yang gagal dideteksi. Hasil ditulis sebagai
+laporan JSON.
+"""
+
+import argparse
+import heapq
+import json
+import time
+import numpy as np
+from pathlib import Path
+from typing import Dict, Optional
+from pose_matcher import PoseMatcher
+import config
+
+
+class UnionFind:
+    """Disjoint set sederhana untuk mengelompokkan referensi yang saling mirip"""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+def block_rows(count: int, uses_hands: bool, max_elements: Optional[int] = None) -> int:
+    """
+    Jumlah baris per blok supaya memory sementara tetap terbatas
+
+    Args:
+        count: Jumlah referensi (kolom matrix)
+        uses_hands: Matcher memakai skor tangan (butuh 4x memory per elemen)
+        max_elements: Elemen float maksimum per blok (default: config.LINT_BLOCK_ELEMENTS)
+
+    Returns:
+        Jumlah baris per blok (minimal 1)
+    """
+    max_elements = max_elements or config.LINT_BLOCK_ELEMENTS
+    per_row = max(count, 1) * (4 if uses_hands else 1)
+    return max(1, max_elements // per_row)
+
+
+def lint_library(matcher: PoseMatcher, threshold: Optional[float] = None,
+                 max_pairs: int = 100, max_elements: Optional[int] = None) -> Dict:
+    """
+    Hitung matrix similarity referensi per blok dan ringkas hasilnya
+
+    Baris i kolom j = similarity yang dilaporkan find_best_match untuk
+    referensi j jika pose live persis sama dengan referensi i. Matrix tidak
+    pernah disimpan penuh; setiap blok langsung diringkas.
+
+    Args:
+        matcher: PoseMatcher berisi library referensi
+        threshold: Threshold match (default: config.SIMILARITY_THRESHOLD)
+        max_pairs: Jumlah maksimum pasangan paling mirip di laporan
+        max_elements: Elemen float maksimum per blok
+
+    Returns:
+        Dictionary laporan (references, clusters, pairs, summary)
+    """
+    threshold = config.SIMILARITY_THRESHOLD if threshold is None else threshold
+    names = matcher.names
+    count = len(names)
+    rows = block_rows(count, matcher.uses_hands, max_elements)
+
+    nearest = np.full(count, -1, dtype=np.int64)
+    nearest_score = np.zeros(count)
+    self_score = np.zeros(count)
+    above = np.zeros(count, dtype=np.int64)  # Referensi lain yang juga lolos threshold
+    groups = UnionFind(count)
+    top_pairs = []  # Min-heap (similarity, i, j)
+
+    for start in range(0, count, rows):
+        end = min(start + rows, count)
+        block = matcher.reference_similarity(start, end)
+        local = np.arange(end - start)
+        self_score[start:end] = block[local, local + start]
+        block[local, local + start] = -1.0  # Abaikan diagonal
+
+        nearest[start:end] = block.argmax(axis=1)
+        nearest_score[start:end] = block[local, nearest[start:end]]
+        confusable = block >= threshold
+        above[start:end] = confusable.sum(axis=1)
+
+        for i, j in zip(*np.nonzero(confusable)):
+            groups.union(start + int(i), int(j))
+            item = (float(block[i, j]), start + int(i), int(j))
+            if len(top_pairs) < max_pairs:
+                heapq.heappush(top_pairs, item)
+            elif item > top_pairs[0]:
+                heapq.heapreplace(top_pairs, item)
+
+    members = {}
+    for i in range(count):
+        members.setdefault(groups.find(i), []).append(i)
+    clusters = [
+        {'size': len(idx), 'references': [names[i] for i in idx]}
+        for idx in members.values() if len(idx) > 1
+    ]
+    clusters.sort(key=lambda c: -c['size'])
+
+    references = []
+    for i, name in enumerate(names):
+        has_nearest = count > 1
+        references.append({
+            'name': name,
+            'self_similarity': round(float(self_score[i]), 4),
+            'nearest': names[nearest[i]] if has_nearest else None,
+            'nearest_similarity': round(float(nearest_score[i]), 4) if has_nearest else None,
+            # Positif = aman: referensi terdekat masih di bawah threshold
+            'margin': round(float(threshold - nearest_score[i]), 4) if has_nearest else None,
+            'confusable_count': int(above[i]),
+            'matchable': bool(self_score[i] >= threshold)
+        })
+
+    pairs = [{'live': names[i], 'reference': names[j], 'similarity': round(sim, 4)}
+             for sim, i, j in sorted(top_pairs, reverse=True)]
+
+    return {
+        'threshold': threshold,
+        'mode': matcher.mode,
+        'references': references,
+        'clusters': clusters,
+        'pairs': pairs,
+        'summary': {
+            'references': count,
+            'confusable_references': int((above > 0).sum()),
+            'clusters': len(clusters),
+            'unmatchable': int((self_score < threshold).sum()),
+            'min_margin': round(float((threshold - nearest_score).min()), 4) if count > 1 else None,
+            'block_rows': rows
+        }
+    }
+
+
+def print_summary(report: Dict):
+    """Tampilkan ringkasan laporan di console"""
+    summary = report['summary']
+    print(f"\n{summary['references']} referensi, threshold {report['threshold']:.2f} ({report['mode']})")
+    print(f"  Referensi yang bisa tertukar : {summary['confusable_references']}")
+    print(f"  Cluster                      : {summary['clusters']}")
+    print(f"  Tidak bisa match (self < thr): {summary['unmatchable']}")
+    print(f"  Gagal dideteksi              : {len(report.get('failed', {}))}")
+    if summary['min_margin'] is not None:
+        print(f"  Margin terkecil              : {summary['min_margin']:+.4f}")
+
+    for cluster in report['clusters'][:10]:
+        print(f"  ✗ Cluster {cluster['size']}: {', '.join(cluster['references'][:8])}"
+              f"{' ...' if cluster['size'] > 8 else ''}")
+    for name, reason in list(report.get('failed', {}).items())[:10]:
+        print(f"  ✗ {name}: {reason}")
+
+
+def main():
+    """Lint folder gambar referensi dan tulis laporan JSON"""
+    parser = argparse.ArgumentParser(description="Lint library gambar referensi")
+    parser.add_argument('--images', default=config.REFERENCE_IMAGES_PATH,
+                        help="Folder gambar referensi")
+    parser.add_argument('--out', default=str(Path(config.OUTPUT_PATH) / 'reference_lint.json'),
+                        help="File laporan JSON")
+    parser.add_argument('--threshold', type=float, default=None,
+                        help="Threshold match (default: config.SIMILARITY_THRESHOLD)")
+    parser.add_argument('--max-pairs', type=int, default=100,
+                        help="Jumlah pasangan paling mirip di laporan")
+    args = parser.parse_args()
+
+    from gesture_detector import GestureDetector
+    from reference_loader import load_reference_images
+
+    failed = {}
+    detector = GestureDetector()
+    try:
+        reference_poses, _ = load_reference_images(detector, args.images, failures=failed)
+    finally:
+        detector.close()
+
+    start = time.perf_counter()
+    report = lint_library(PoseMatcher(reference_poses), args.threshold, args.max_pairs)
+    report['failed'] = failed
+    report['summary']['elapsed'] = round(time.perf_counter() - start, 3)
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print_summary(report)
+    print(f"\n✓ Laporan disimpan di {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,24 @@ Deteksi pose dari webcam dan cocokkan dengan gambar referensi
 """
 
 import cv2
-import os
-import sys
+import argparse
 from pathlib import Path
 import time
 import numpy as np
 from gesture_detector import GestureDetector
 from pose_matcher import PoseMatcher
+from reference_store import ReferenceStore
+from matcher_worker import MatcherProcess
+from sharded_matcher import ShardedMatcher
+from dynamic_matcher import DynamicMatcher, load_dynamic_gestures
+from landmark_session import LandmarkRecorder
+from reference_loader import load_reference_images
+from pipeline import (Pipeline, CallbackSink, add_pipeline_arguments, build_source,
+                      build_sinks, format_stats)
+from metrics import start_metrics
+from memory_monitor import MemoryMonitor
+from stack_profiler import StackProfiler
+from gesture_events import GestureEventStream
 import config
 
 
@@ -23,68 +34,80 @@ class GestureMatchingApp:
         self.reference_poses = {}
         self.reference_images = {}  # Menyimpan gambar referensi asli
         self.matcher = None
+        self.dynamic_matcher = None
+        self.recorder = None  # LandmarkRecorder aktif saat merekam session
+        self.gesture_views = {}  # Cache window Detected Gesture per (gesture, ukuran)
         self.last_match_time = 0
         self.last_match_name = None
         
         # Gesture smoothing (dari repository referensi)
         self.gesture_history = []
-        self.HISTORY_SIZE = 8
+        self.HISTORY_SIZE = config.HISTORY_SIZE
         self.last_stable_gesture = None
         self.gesture_hold_frames = 0
-        self.MIN_HOLD_FRAMES = 10  # Perlu hold 10 frames untuk stabilitas
+        self.MIN_HOLD_FRAMES = config.MIN_HOLD_FRAMES  # Perlu hold N frames untuk stabilitas
+        
+        # Event transisi gesture/orang (callback atau async iterator, lihat gesture_events.py)
+        self.events = GestureEventStream()
+        self.memory = None  # MemoryMonitor saat run(memory=True)
+        self.pipeline = None  # Pipeline saat run() berjalan
+        self.ready = False  # Referensi sudah dimuat (setup() berhasil)
+        self.profiler = None  # StackProfiler, dipasang saat PROFILER_ENABLED, --profile, atau tombol 'p'
         
     def load_reference_images(self):
         """Load semua gambar referensi dari folder reference_images"""
-        ref_path = Path(config.REFERENCE_IMAGES_PATH)
-        
-        if not ref_path.exists():
-            print(f"Folder {config.REFERENCE_IMAGES_PATH} tidak ditemukan!")
-            print("Membuat folder...")
-            ref_path.mkdir(parents=True, exist_ok=True)
-            print(f"Silakan tambahkan gambar referensi ke folder {config.REFERENCE_IMAGES_PATH}")
-            return False
-        
-        # Cari semua file gambar
-        image_extensions = ['.jpg', '.jpeg', '.png', '.bmp']
-        image_files = []
-        for ext in image_extensions:
-            image_files.extend(ref_path.glob(f'*{ext}'))
-            image_files.extend(ref_path.glob(f'*{ext.upper()}'))
-        
-        if len(image_files) == 0:
-            print(f"Tidak ada gambar referensi di folder {config.REFERENCE_IMAGES_PATH}!")
-            print("Silakan tambahkan gambar referensi dengan format: .jpg, .jpeg, .png, atau .bmp")
-            return False
-        
-        print(f"\nMemuat {len(image_files)} gambar referensi...")
-        
-        for img_path in image_files:
-            pose_name = img_path.stem  # Nama file tanpa ekstensi
-            print(f"  Processing: {img_path.name}...")
-            
-            # Load gambar asli untuk display
-            original_img = cv2.imread(str(img_path))
-            
-            _, landmarks = self.detector.process_image(str(img_path))
-            
-            if landmarks is not None:
-                self.reference_poses[pose_name] = landmarks
-                self.reference_images[pose_name] = original_img  # Simpan gambar asli
-                print(f"    ✓ Pose '{pose_name}' berhasil dimuat")
-            else:
-                print(f"    ✗ Gagal mendeteksi pose di '{pose_name}'")
-        
+        self.reference_poses, self.reference_images = load_reference_images(self.detector)
         if len(self.reference_poses) == 0:
-            print("\nTidak ada pose yang berhasil dimuat!")
-            print("Pastikan gambar referensi menunjukkan pose tubuh yang jelas.")
             return False
         
-        print(f"\n✓ Total {len(self.reference_poses)} pose referensi berhasil dimuat")
-        print(f"Pose: {', '.join(self.reference_poses.keys())}\n")
-        
-        # Inisialisasi matcher
-        self.matcher = PoseMatcher(self.reference_poses)
+        # Inisialisasi matcher (opsional di process terpisah / dibagi ke beberapa shard)
+        if config.MATCHER_SHARDS > 1:
+            self.matcher = ShardedMatcher(self.reference_poses)
+            print(f"Matcher dibagi ke {len(self.matcher.shards)} shard "
+                  f"(top-{self.matcher.top_k}, deadline {self.matcher.deadline * 1000:.0f} ms)")
+        elif config.MATCHER_PROCESS:
+            self.matcher = MatcherProcess(self.reference_poses)
+            print("Matcher berjalan di process terpisah (shared memory)")
+        elif config.REFERENCE_STORE_PATH:
+            store = ReferenceStore.load(config.REFERENCE_STORE_PATH)
+            self.matcher = PoseMatcher(self.reference_poses, store=store)
+            print(f"Matcher memakai reference store: {len(store)} pose ({store.dtype})")
+        else:
+            self.matcher = PoseMatcher(self.reference_poses)
+
+        self.load_dynamic_gestures()
+        
+        # Jalankan hanya model MediaPipe yang dipakai matching (gesture dinamis memakai pose)
+        if config.AUTO_SELECT_MODELS:
+            required = self.matcher.required_landmarks()
+            if self.dynamic_matcher is not None:
+                required.add('pose')
+            self.detector.select_models(required)
         return True
+
+    def load_dynamic_gestures(self):
+        """Load gesture dinamis (video clip / recorded session) dari folder reference_gestures"""
+        sequences, thumbnails = load_dynamic_gestures(self.detector)
+        if not sequences:
+            return
+
+        self.dynamic_matcher = DynamicMatcher(sequences)
+        for name, thumbnail in thumbnails.items():
+            self.reference_images.setdefault(name, thumbnail)
+        print(f"✓ Total {len(sequences)} gesture dinamis berhasil dimuat")
+        print(f"Gesture: {', '.join(sequences.keys())}\n")
+    
+    def toggle_recording(self):
+        """Mulai atau hentikan rekaman landmark session ke folder output"""
+        if self.recorder is None:
+            self.recorder = LandmarkRecorder()
+            print("Merekam landmark session... (tekan 'r' lagi untuk berhenti)")
+            return
+
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        path = self.recorder.save(Path(config.OUTPUT_PATH) / f"session_{timestamp}.npz")
+        print(f"Session disimpan: {path} ({len(self.recorder)} frame)")
+        self.recorder = None
     
     def smooth_gesture(self, gesture_name):
         """
@@ -103,7 +126,7 @@ class GestureMatchingApp:
         
         # Count occurrences di recent history
         gesture_count = self.gesture_history.count(gesture_name)
-        threshold = self.HISTORY_SIZE * 0.6
+        threshold = self.HISTORY_SIZE * config.STABLE_VOTE_RATIO
         
         # Check apakah gesture stable
         if gesture_name is not None and gesture_count > threshold:
@@ -114,7 +137,7 @@ class GestureMatchingApp:
             self.gesture_hold_frames = max(0, self.gesture_hold_frames - 1)
             if gesture_name is None and self.gesture_hold_frames == 0:
                 none_count = self.gesture_history.count(None)
-                if none_count > self.HISTORY_SIZE * 0.7:
+                if none_count > self.HISTORY_SIZE * config.CLEAR_VOTE_RATIO:
                     self.last_stable_gesture = None
         
         return self.last_stable_gesture
@@ -232,169 +255,265 @@ class GestureMatchingApp:
         
         return combined
     
-    def run(self):
-        """Jalankan aplikasi utama"""
-        # Load reference images
+    def render_views(self, result):
+        """
+        Renderer pipeline: window Camera Feed dan Detected Gesture
+        
+        Args:
+            result: FrameResult dari pipeline
+            
+        Returns:
+            Dictionary {nama_window: image}
+        """
+        camera_display = result.display
+        stable_gesture = result.stable_gesture
+        fps = result.fps
+        
+        # Draw FPS dan info di camera feed
+        h, w = camera_display.shape[:2]
+        
+        # Info box background
+        cv2.rectangle(camera_display, (10, 10), (w - 10, 100), (0, 0, 0), -1)
+        cv2.rectangle(camera_display, (10, 10), (w - 10, 100), config.COLOR_WHITE, 2)
+        
+        # FPS
+        cv2.putText(camera_display, f"FPS: {fps:.1f}", (20, 35),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, config.COLOR_WHITE, 2)
+        
+        # Gesture info
+        if stable_gesture:
+            cv2.putText(camera_display, f"Gesture: {stable_gesture}", (20, 65),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, config.COLOR_GREEN, 2)
+        else:
+            cv2.putText(camera_display, "No Gesture", (20, 65),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, config.COLOR_RED, 2)
+        
+        # Stability progress bar (dari repository referensi)
+        bar_width = w - 40
+        bar_height = 10
+        bar_x = 20
+        bar_y = 80
+        
+        # Background bar
+        cv2.rectangle(camera_display, (bar_x, bar_y), 
+                     (bar_x + bar_width, bar_y + bar_height),
+                     config.COLOR_WHITE, 1)
+        
+        # Progress bar
+        progress = min(self.gesture_hold_frames / self.MIN_HOLD_FRAMES, 1.0)
+        progress_width = int(bar_width * progress)
+        
+        if progress >= 1.0:
+            bar_color = config.COLOR_GREEN  # Stable
+        elif progress > 0.5:
+            bar_color = config.COLOR_BLUE   # Getting stable
+        else:
+            bar_color = config.COLOR_RED    # Not stable
+        
+        if progress_width > 0:
+            cv2.rectangle(camera_display, (bar_x, bar_y),
+                         (bar_x + progress_width, bar_y + bar_height),
+                         bar_color, -1)
+        
+        # Gesture display window (gambar statis, dirender sekali lalu di-cache)
+        if not stable_gesture:
+            stable_gesture = None
+        gesture_display = self.gesture_views.get((stable_gesture, w, h))
+        if gesture_display is None:
+            gesture_display = self.render_gesture_view(stable_gesture, w, h)
+            self.gesture_views[(stable_gesture, w, h)] = gesture_display
+        
+        # Dual windows (pattern dari repository referensi)
+        return {'Camera Feed': camera_display, 'Detected Gesture': gesture_display}
+    
+    def render_gesture_view(self, gesture_name, w, h):
+        """
+        Render window Detected Gesture untuk satu gesture (atau placeholder)
+        
+        Args:
+            gesture_name: Nama gesture (atau None); gesture tanpa gambar referensi
+                (gesture dinamis dari session .npz) ditampilkan sebagai panel berlabel
+            w: Lebar window
+            h: Tinggi window
+            
+        Returns:
+            Image untuk window Detected Gesture
+        """
+        if gesture_name is not None and gesture_name not in self.reference_images:
+            # Gesture tanpa thumbnail (session .npz): panel dengan nama gesture
+            gesture_display = np.zeros((h, w, 3), dtype=np.uint8)
+            cv2.putText(gesture_display, f"DETECTED: {gesture_name.upper()}",
+                       (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 1.0,
+                       config.COLOR_GREEN, 2)
+            cv2.putText(gesture_display, gesture_name,
+                       (20, h//2), cv2.FONT_HERSHEY_SIMPLEX, 1.5,
+                       config.COLOR_WHITE, 3)
+            cv2.putText(gesture_display, "(gesture dinamis)",
+                       (20, h//2 + 50), cv2.FONT_HERSHEY_SIMPLEX, 0.6,
+                       config.COLOR_BLUE, 2)
+        elif gesture_name is not None:
+            # Resize to match camera display
+            gesture_display = cv2.resize(self.reference_images[gesture_name], (w, h))
+            
+            # Add label
+            cv2.rectangle(gesture_display, (0, 0), (w, 60), (0, 0, 0), -1)
+            cv2.putText(gesture_display, f"DETECTED: {gesture_name.upper()}", 
+                       (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 1.0, 
+                       config.COLOR_GREEN, 2)
+        else:
+            # Create placeholder
+            gesture_display = np.zeros((h, w, 3), dtype=np.uint8)
+            cv2.putText(gesture_display, "No Gesture Detected", 
+                       (w//2 - 150, h//2),
+                       cv2.FONT_HERSHEY_SIMPLEX, 1, config.COLOR_WHITE, 2)
+            cv2.putText(gesture_display, "Strike a Pose!", 
+                       (w//2 - 100, h//2 + 50),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.8, config.COLOR_BLUE, 2)
+        return gesture_display
+    
+    def handle_key(self, key, result):
+        """
+        Key handler untuk WindowSink ('q' ditangani oleh sink)
+        
+        Args:
+            key: Kode tombol dari cv2.waitKey
+            result: FrameResult frame saat ini
+        """
+        if key == ord('s'):
+            # Save screenshot (both windows)
+            output_path = Path(config.OUTPUT_PATH)
+            output_path.mkdir(parents=True, exist_ok=True)
+            
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            
+            # Save camera feed
+            filename_camera = output_path / f"camera_{timestamp}.jpg"
+            cv2.imwrite(str(filename_camera), result.views['Camera Feed'])
+            
+            # Save gesture display
+            filename_gesture = output_path / f"gesture_{timestamp}.jpg"
+            cv2.imwrite(str(filename_gesture), result.views['Detected Gesture'])
+            
+            print(f"Screenshots saved:")
+            print(f"  - {filename_camera}")
+            print(f"  - {filename_gesture}")
+        elif key == ord('r'):
+            self.toggle_recording()
+        elif key == ord('m') and self.memory is not None:
+            self.memory.request_dump()
+        elif key == ord('p'):
+            if self.profiler is None:
+                self.start_profiler()
+            self.profiler.toggle()
+    
+    def start_profiler(self):
+        """Pasang StackProfiler untuk pipeline aktif (dipanggil dari thread pipeline)"""
+        self.profiler = StackProfiler(self.pipeline)
+        self.profiler.start()
+    
+    def setup(self) -> bool:
+        """
+        Load referensi (sekali); jika gagal tampilkan petunjuk dan tutup detector
+        
+        Returns:
+            True jika referensi berhasil dimuat
+        """
+        if self.ready:
+            return True
         if not self.load_reference_images():
             print("\nTidak bisa melanjutkan tanpa gambar referensi.")
             print(f"\nCara menggunakan:")
             print(f"1. Tambahkan gambar pose referensi ke folder '{config.REFERENCE_IMAGES_PATH}'")
             print(f"2. Beri nama file sesuai pose (contoh: 'tpose.jpg', 'wave.png')")
             print(f"3. Jalankan ulang program ini")
-            return
-        
-        # Buka webcam
-        cap = cv2.VideoCapture(config.CAMERA_INDEX)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, config.CAMERA_WIDTH)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, config.CAMERA_HEIGHT)
+            self.detector.close()
+            return False
+        self.ready = True
+        return True
+    
+    def record_frame(self, result):
+        """Callback sink: tambahkan landmark frame ke session yang sedang direkam"""
+        if self.recorder is not None:
+            self.recorder.add(result.landmarks, result.timestamp)
+    
+    def run(self, source=None, sinks=None, max_frames=None, metrics=False, memory=False,
+            profile=False):
+        """
+        Jalankan aplikasi utama
         
-        if not cap.isOpened():
-            print("Error: Tidak bisa membuka webcam!")
+        Args:
+            source: FrameSource (default: kamera)
+            sinks: List FrameSink (default: window dengan key handler)
+            max_frames: Jumlah frame maksimum (None = tidak terbatas)
+            metrics: Aktifkan metrics endpoint + log (lihat metrics.py)
+            memory: Aktifkan memory monitor (lihat memory_monitor.py), tombol 'm' untuk dump
+            profile: Langsung capture stack profile saat mulai (lihat stack_profiler.py)
+        """
+        # Load reference images (dilewati jika setup() sudah dipanggil)
+        if not self.setup():
+            if source is not None:
+                source.close()
             return
         
-        print("Webcam terbuka. Mulai deteksi pose + hand tracking...")
-        print("Tekan 'q' untuk keluar, 's' untuk save screenshot")
+        if source is None:
+            source = build_source('camera')
+        if sinks is None:
+            sinks = build_sinks('window', self.handle_key)
+        
+        registry, metrics_services = start_metrics() if metrics else (None, [])
+        if memory:
+            self.memory = MemoryMonitor()
+            self.memory.start()
+            metrics_services.append(self.memory)
+        
+        pipeline = Pipeline(
+            source,
+            self.detector,
+            matcher=self.matcher,
+            dynamic_matcher=self.dynamic_matcher,
+            smoother=self.smooth_gesture,
+            renderer=self.render_views,
+            sinks=sinks + [CallbackSink(self.record_frame), self.events],
+            mirror=True,
+            metrics=registry,
+            memory=self.memory
+        )
+        
+        self.pipeline = pipeline
+        
+        # Profiler on-demand: thread sampler idle sampai tombol 'p' / SIGUSR2
+        if config.PROFILER_ENABLED or profile:
+            self.start_profiler()
+            if profile:
+                self.profiler.request()
+        
+        print("Mulai deteksi pose + hand tracking...")
+        print("Tekan 'q' untuk keluar, 's' untuk save screenshot, 'r' untuk rekam session")
+        if self.memory is not None:
+            print("Tekan 'm' untuk dump diff snapshot memory (atau kill -USR1 <pid>)")
+        if self.profiler is not None:
+            print("Tekan 'p' untuk capture stack profile (atau kill -USR2 <pid>)")
+        else:
+            print("Tekan 'p' untuk capture stack profile")
         print("\nWindow Layout:")
         print("  - Camera Feed: Webcam + Skeleton (Pose + Hand Tracking)")
         print("  - Detected Gesture: Gambar Referensi yang Match")
         
-        # Create dual windows (pattern dari repository referensi)
-        cv2.namedWindow('Camera Feed', cv2.WINDOW_NORMAL)
-        cv2.namedWindow('Detected Gesture', cv2.WINDOW_NORMAL)
-        
-        # Variables untuk FPS
-        prev_time = time.time()
-        fps = 0
-        
         try:
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    print("Error: Tidak bisa membaca frame dari webcam")
-                    break
-                
-                # Flip frame horizontal (mirror)
-                frame = cv2.flip(frame, 1)
-                
-                # Detect pose + hands
-                camera_display, landmarks = self.detector.process_frame(frame)
-                
-                # Match dengan reference poses
-                raw_match_name = None
-                similarity = 0.0
-                
-                if landmarks is not None and self.matcher is not None:
-                    raw_match_name, similarity = self.matcher.find_best_match(landmarks)
-                
-                # Apply gesture smoothing (dari repository referensi)
-                stable_gesture = self.smooth_gesture(raw_match_name)
-                
-                # Calculate FPS
-                current_time = time.time()
-                fps = 1 / (current_time - prev_time)
-                prev_time = current_time
-                
-                # Draw FPS dan info di camera feed
-                h, w = camera_display.shape[:2]
-                
-                # Info box background
-                cv2.rectangle(camera_display, (10, 10), (w - 10, 100), (0, 0, 0), -1)
-                cv2.rectangle(camera_display, (10, 10), (w - 10, 100), config.COLOR_WHITE, 2)
-                
-                # FPS
-                cv2.putText(camera_display, f"FPS: {fps:.1f}", (20, 35),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, config.COLOR_WHITE, 2)
-                
-                # Gesture info
-                if stable_gesture:
-                    cv2.putText(camera_display, f"Gesture: {stable_gesture}", (20, 65),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, config.COLOR_GREEN, 2)
-                else:
-                    cv2.putText(camera_display, "No Gesture", (20, 65),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, config.COLOR_RED, 2)
-                
-                # Stability progress bar (dari repository referensi)
-                bar_width = w - 40
-                bar_height = 10
-                bar_x = 20
-                bar_y = 80
-                
-                # Background bar
-                cv2.rectangle(camera_display, (bar_x, bar_y), 
-                             (bar_x + bar_width, bar_y + bar_height),
-                             config.COLOR_WHITE, 1)
-                
-                # Progress bar
-                progress = min(self.gesture_hold_frames / self.MIN_HOLD_FRAMES, 1.0)
-                progress_width = int(bar_width * progress)
-                
-                if progress >= 1.0:
-                    bar_color = config.COLOR_GREEN  # Stable
-                elif progress > 0.5:
-                    bar_color = config.COLOR_BLUE   # Getting stable
-                else:
-                    bar_color = config.COLOR_RED    # Not stable
-                
-                if progress_width > 0:
-                    cv2.rectangle(camera_display, (bar_x, bar_y),
-                                 (bar_x + progress_width, bar_y + bar_height),
-                                 bar_color, -1)
-                
-                # Gesture display window
-                if stable_gesture and stable_gesture in self.reference_images:
-                    gesture_display = self.reference_images[stable_gesture].copy()
-                    
-                    # Resize to match camera display
-                    gesture_display = cv2.resize(gesture_display, (w, h))
-                    
-                    # Add label
-                    cv2.rectangle(gesture_display, (0, 0), (w, 60), (0, 0, 0), -1)
-                    cv2.putText(gesture_display, f"DETECTED: {stable_gesture.upper()}", 
-                               (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 1.0, 
-                               config.COLOR_GREEN, 2)
-                else:
-                    # Create placeholder
-                    gesture_display = np.zeros((h, w, 3), dtype=np.uint8)
-                    cv2.putText(gesture_display, "No Gesture Detected", 
-                               (w//2 - 150, h//2),
-                               cv2.FONT_HERSHEY_SIMPLEX, 1, config.COLOR_WHITE, 2)
-                    cv2.putText(gesture_display, "Strike a Pose!", 
-                               (w//2 - 100, h//2 + 50),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.8, config.COLOR_BLUE, 2)
-                
-                # Show dual windows (pattern dari repository)
-                cv2.imshow('Camera Feed', camera_display)
-                cv2.imshow('Detected Gesture', gesture_display)
-                
-                # Handle keyboard input
-                key = cv2.waitKey(1) & 0xFF
-                if key == ord('q'):
-                    print("\nKeluar dari aplikasi...")
-                    break
-                elif key == ord('s'):
-                    # Save screenshot (both windows)
-                    output_path = Path(config.OUTPUT_PATH)
-                    output_path.mkdir(parents=True, exist_ok=True)
-                    
-                    timestamp = time.strftime("%Y%m%d_%H%M%S")
-                    
-                    # Save camera feed
-                    filename_camera = output_path / f"camera_{timestamp}.jpg"
-                    cv2.imwrite(str(filename_camera), camera_display)
-                    
-                    # Save gesture display
-                    filename_gesture = output_path / f"gesture_{timestamp}.jpg"
-                    cv2.imwrite(str(filename_gesture), gesture_display)
-                    
-                    print(f"Screenshots saved:")
-                    print(f"  - {filename_camera}")
-                    print(f"  - {filename_gesture}")
-        
+            stats = pipeline.run(max_frames)
+            if stats is not None:
+                print(f"\n{format_stats(stats)}")
         finally:
             # Cleanup
-            cap.release()
-            cv2.destroyAllWindows()
+            if self.recorder is not None:
+                self.toggle_recording()
             self.detector.close()
+            if isinstance(self.matcher, (MatcherProcess, ShardedMatcher)):
+                self.matcher.close()
+            for service in metrics_services:
+                service.close()
+            if self.profiler is not None:
+                self.profiler.close()
             print("Aplikasi ditutup.")
 
 
@@ -406,8 +525,23 @@ def main():
     print("Aplikasi untuk mendeteksi pose dan mencocokkan dengan gambar referensi")
     print()
     
+    parser = argparse.ArgumentParser(description="Gesture Detection - Pose Matching")
+    add_pipeline_arguments(parser)
+    args = parser.parse_args()
+    
     app = GestureMatchingApp()
-    app.run()
+    
+    # Referensi dimuat dulu: jika gagal, source (kamera/video) tidak pernah dibuat
+    if not app.setup():
+        return
+    app.run(
+        source=build_source(args.source),
+        sinks=build_sinks(args.sink, app.handle_key),
+        max_frames=args.max_frames,
+        metrics=args.metrics,
+        memory=args.memory,
+        profile=args.profile
+    )
 
 
 if __name__ == "__main__":
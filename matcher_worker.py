@@ -0,0 +1,217 @@
+"""
+Matcher Worker Module
+Menjalankan PoseMatcher di process terpisah, landmark dan score ditukar lewat shared memory
+"""
+
+import time
+import multiprocessing as mp
+import numpy as np
+from typing import Optional, Tuple
+from pose_matcher import PoseMatcher, required_landmarks
+from landmark_session import (landmarks_to_arrays, arrays_to_landmarks, HAND_LANDMARK_COUNT,
+                              MAX_HANDS)
+from shm_ring import SharedMemoryRing
+import config
+
+POSE_LANDMARK_COUNT = 33
+# Satu request: 33 baris pose lalu 2 x 21 baris tangan, NaN jika tidak ada
+REQUEST_ROWS = POSE_LANDMARK_COUNT + MAX_HANDS * HAND_LANDMARK_COUNT
+
+
+def _request_views(slot: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """View pose (33, 3) dan hands (2, 21, 3) di dalam satu slot request"""
+    return (slot[:POSE_LANDMARK_COUNT],
+            slot[POSE_LANDMARK_COUNT:].reshape(MAX_HANDS, HAND_LANDMARK_COUNT, 3))
+
+
+def _matcher_worker_loop(request_name: str, response_name: str, slots: int,
+                         reference_poses: dict, names: list,
+                         request_event, stop_event):
+    """
+    Loop utama di worker process
+
+    Reference poses hanya di-pickle sekali saat process dibuat, setelah itu
+    setiap frame hanya lewat shared memory ring.
+    """
+    requests = SharedMemoryRing(request_name, (REQUEST_ROWS, 3), np.float32, slots)
+    responses = SharedMemoryRing(response_name, (max(len(names), 1),), np.float32, slots)
+    matcher = PoseMatcher(reference_poses)
+
+    request = np.empty((REQUEST_ROWS, 3), dtype=np.float32)
+    pose, hands = _request_views(request)
+    last_seq = 0
+
+    try:
+        while not stop_event.is_set():
+            if not request_event.wait(timeout=0.1):
+                continue
+            request_event.clear()
+
+            seq, stamp, data = requests.read_latest(out=request, min_seq=last_seq + 1)
+            if data is None:
+                continue
+            last_seq = seq
+
+            # Response memakai sequence number request yang sama
+            _, scores = responses.begin_write(seq)
+            landmarks = arrays_to_landmarks(pose, hands)
+            if landmarks is None:
+                scores[:] = 0.0
+            else:
+                similarities = matcher.get_all_similarities(landmarks)
+                for i, pose_name in enumerate(names):
+                    scores[i] = similarities.get(pose_name, 0.0)
+            responses.end_write(seq, stamp)
+    finally:
+        requests.close()
+        responses.close()
+
+
+class MatcherProcess:
+    """
+    Pengganti PoseMatcher yang menjalankan matching di process terpisah
+
+    find_best_match() mengirim landmark frame saat ini ke worker lalu langsung
+    mengembalikan hasil terbaru yang sudah tersedia (bisa dari frame sebelumnya),
+    sehingga matching berjalan paralel dengan capture dan rendering. Jika worker
+    mati, matching dilanjutkan dengan PoseMatcher di process ini (`fallback`).
+    """
+
+    def __init__(self, reference_poses: dict, slots: Optional[int] = None,
+                 result_timeout: Optional[float] = None):
+        """
+        Inisialisasi worker process
+
+        Args:
+            reference_poses: Dictionary dengan format {nama_pose: landmarks}
+            slots: Jumlah slot ring buffer (default: config.MATCHER_RING_SLOTS)
+            result_timeout: Waktu tunggu maksimum hasil untuk frame saat ini
+                            dalam detik (default: config.MATCHER_RESULT_TIMEOUT)
+        """
+        self.reference_poses = reference_poses
+        self.names = list(reference_poses.keys())
+        self.slots = slots or config.MATCHER_RING_SLOTS
+        self.result_timeout = (config.MATCHER_RESULT_TIMEOUT
+                               if result_timeout is None else result_timeout)
+
+        self._requests = SharedMemoryRing(None, (REQUEST_ROWS, 3), np.float32,
+                                          self.slots, create=True)
+        self._responses = SharedMemoryRing(None, (max(len(self.names), 1),), np.float32,
+                                           self.slots, create=True)
+        self._scores = np.zeros(max(len(self.names), 1), dtype=np.float32)
+        self._last_result = (None, 0.0)
+        self._last_seq = 0
+        self._submitted_seq = 0
+        self._stale_seq = 0  # Response untuk request <= ini diabaikan (sebelum orang hilang)
+        self.fallback = None  # PoseMatcher in-process setelah worker mati
+
+        ctx = mp.get_context('spawn')
+        self._request_event = ctx.Event()
+        self._stop_event = ctx.Event()
+        self._process = ctx.Process(
+            target=_matcher_worker_loop,
+            args=(self._requests.name, self._responses.name, self.slots,
+                  reference_poses, self.names, self._request_event, self._stop_event),
+            daemon=True
+        )
+        self._process.start()
+
+    def required_landmarks(self) -> set:
+        """Landmark yang dibutuhkan matcher ini ('pose' dan/atau 'hands')"""
+        return required_landmarks(self.reference_poses)
+
+    def submit(self, current_landmarks) -> int:
+        """
+        Kirim landmark frame saat ini ke worker (non-blocking)
+
+        Args:
+            current_landmarks: Dict atau List landmarks dari pose saat ini
+
+        Returns:
+            Sequence number request
+        """
+        if not isinstance(current_landmarks, dict):
+            current_landmarks = {'pose_landmarks': current_landmarks, 'hand_landmarks': []}
+
+        seq, slot = self._requests.begin_write()
+        landmarks_to_arrays(current_landmarks, *_request_views(slot))
+        self._requests.end_write(seq)
+        self._request_event.set()
+        self._submitted_seq = seq
+        return seq
+
+    def poll(self) -> Tuple[int, Tuple[Optional[str], float]]:
+        """
+        Ambil hasil matching terbaru dari worker
+
+        Returns:
+            Tuple berisi:
+            - Sequence number request yang hasilnya terbaru
+            - Tuple (nama pose atau None, similarity score)
+        """
+        if not self._process.is_alive():
+            self._start_fallback()
+        seq, _, scores = self._responses.read_latest(out=self._scores,
+                                                     min_seq=self._last_seq + 1)
+        if scores is not None:
+            self._last_seq = seq
+        if scores is not None and seq > self._stale_seq and len(self.names) > 0:
+            best_idx = int(np.argmax(scores[:len(self.names)]))
+            best_score = float(scores[best_idx])
+            if best_score >= config.SIMILARITY_THRESHOLD:
+                self._last_result = (self.names[best_idx], best_score)
+            else:
+                self._last_result = (None, best_score)
+        return self._last_seq, self._last_result
+
+    def find_best_match(self, current_landmarks) -> Tuple[Optional[str], float]:
+        """
+        Interface sama dengan PoseMatcher.find_best_match
+
+        Args:
+            current_landmarks: Dict atau List landmarks dari pose saat ini
+
+        Returns:
+            Tuple berisi:
+            - Nama pose yang paling cocok (atau None)
+            - Similarity score
+        """
+        if current_landmarks is None:
+            # Orang hilang: hasil lama tidak boleh muncul lagi saat orang kembali
+            self._last_result = (None, 0.0)
+            self._stale_seq = self._submitted_seq
+            return None, 0.0
+
+        if self.fallback is None and not self._process.is_alive():
+            self._start_fallback()
+        if self.fallback is not None:
+            return self.fallback.find_best_match(current_landmarks)
+
+        seq = self.submit(current_landmarks)
+
+        deadline = time.perf_counter() + self.result_timeout
+        done_seq, result = self.poll()
+        while done_seq < seq and time.perf_counter() < deadline:
+            time.sleep(0.0005)
+            done_seq, result = self.poll()
+
+        return result
+
+    def _start_fallback(self):
+        """Worker mati: lanjutkan matching dengan PoseMatcher di process ini"""
+        if self.fallback is not None:
+            return
+        print(f"Warning: Matcher process berhenti (exit code {self._process.exitcode}), "
+              f"matching dilanjutkan di process utama")
+        self.fallback = PoseMatcher(self.reference_poses)
+        self._last_result = (None, 0.0)
+
+    def close(self):
+        """Hentikan worker process dan lepas shared memory"""
+        self._stop_event.set()
+        self._request_event.set()
+        self._process.join(timeout=2.0)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._requests.close()
+        self._responses.close()
@@ -0,0 +1,362 @@
+"""
+Memory Monitor Module
+Instrumentasi memory untuk aplikasi yang berjalan berhari-hari: sampling RSS
+dan allocator teratas (tracemalloc) secara periodik, alokasi bersih per stage
+pipeline per frame, dan dump diff snapshot saat diminta atau saat RSS naik
+melewati threshold.
+"""
+
+import json
+import os
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Optional
+import config
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+MB = 1024 * 1024
+
+# Alokasi yang tidak menarik: import, dan alokasi monitor ini sendiri (snapshot, linecache)
+IGNORED_FILES = ('<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>', '<unknown>')
+IGNORED_STACKS = (tracemalloc.__file__, __file__)
+
+
+def current_rss() -> Optional[int]:
+    """
+    Resident set size process saat ini (bytes)
+
+    Memakai psutil jika terinstall (semua OS), fallback /proc/self/statm (Linux).
+
+    Returns:
+        RSS dalam bytes, atau None jika tidak bisa dibaca
+    """
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class StageStats:
+    """Alokasi bersih (bytes dan block) satu stage pipeline"""
+
+    def __init__(self):
+        self.frames = 0
+        self.net_bytes = 0
+        self.net_blocks = 0
+        self.max_bytes = 0
+
+    def add(self, net_bytes: int, net_blocks: int):
+        self.frames += 1
+        self.net_bytes += net_bytes
+        self.net_blocks += net_blocks
+        self.max_bytes = max(self.max_bytes, net_bytes)
+
+    def to_dict(self) -> Dict:
+        frames = max(self.frames, 1)
+        return {
+            'frames': self.frames,
+            'bytes_per_frame': round(self.net_bytes / frames, 1),
+            'blocks_per_frame': round(self.net_blocks / frames, 2),
+            'max_bytes': self.max_bytes
+        }
+
+
+class MemoryMonitor:
+    """
+    Memory monitor untuk Pipeline
+
+    - Hot loop: Pipeline memanggil observe_stage() setiap pergantian stage.
+      Biayanya hanya tracemalloc.get_traced_memory() + sys.getallocatedblocks();
+      selisihnya adalah alokasi bersih (alokasi - free) stage tersebut.
+      Stage yang terus positif dari frame ke frame adalah sumber leak.
+      Counter ini global untuk seluruh process, jadi angka per stage adalah
+      perkiraan: alokasi thread lain (capture thread, metrics server, stack
+      profiler) ikut dihitung ke stage yang sedang berjalan. Interval yang
+      beririsan dengan sample/dump monitor ini sendiri dibuang (`skipped`).
+    - Thread sampler: setiap `interval` detik catat RSS, memory ter-trace,
+      allocator teratas, dan statistik stage ke log JSONL.
+    - Dump diff snapshot (file teks di OUTPUT_PATH) saat request_dump()
+      dipanggil (tombol 'm', SIGUSR1) atau saat RSS naik `growth_mb` sejak
+      dump terakhir. RSS yang naik tanpa kenaikan memory ter-trace berarti
+      leak di native code (MediaPipe, OpenCV, backend window).
+    """
+
+    def __init__(self, interval: Optional[float] = None, top: Optional[int] = None,
+                 growth_mb: Optional[float] = None, log_path: Optional[str] = None,
+                 dump_dir: Optional[str] = None, trace_frames: Optional[int] = None):
+        """
+        Args:
+            interval: Interval sampling dalam detik (default: config.MEMORY_SAMPLE_INTERVAL)
+            top: Jumlah allocator teratas (default: config.MEMORY_TOP_ALLOCATORS)
+            growth_mb: Dump otomatis setiap RSS naik N MB, 0 = hanya manual
+                (default: config.MEMORY_GROWTH_DUMP_MB)
+            log_path: File log JSONL, None = tanpa log (default: config.MEMORY_LOG_PATH)
+            dump_dir: Folder dump diff snapshot (default: config.OUTPUT_PATH)
+            trace_frames: Kedalaman traceback tracemalloc (default: config.MEMORY_TRACE_FRAMES)
+        """
+        self.interval = interval or config.MEMORY_SAMPLE_INTERVAL
+        self.top = top or config.MEMORY_TOP_ALLOCATORS
+        self.growth_mb = config.MEMORY_GROWTH_DUMP_MB if growth_mb is None else growth_mb
+        log_path = config.MEMORY_LOG_PATH if log_path is None else log_path
+        self.log_path = Path(log_path) if log_path else None
+        self.dump_dir = Path(dump_dir or config.OUTPUT_PATH)
+        self.trace_frames = trace_frames or config.MEMORY_TRACE_FRAMES
+
+        self.lock = threading.Lock()
+        self.stages: Dict[str, StageStats] = {}   # Sejak start
+        self.window: Dict[str, StageStats] = {}   # Sejak sample terakhir
+        self.samples = 0
+        self.skipped = 0  # Interval stage yang dibuang karena beririsan dengan sample/dump
+        self.dumps: List[Path] = []
+
+        self._last = (0, 0)
+        self._own_depth = 0  # > 0 saat sample/dump monitor sedang berjalan
+        self._own_runs = 0   # Bertambah setiap sample/dump selesai
+        self._last_runs = 0
+        self._started_tracing = False
+        self._start_time = None
+        self._start_rss = None
+        self._start_traced = 0
+        self._dump_rss = None
+        self._snapshot = None
+        self._dump_requested = threading.Event()
+        self._stop = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Mulai tracemalloc, ambil baseline, dan jalankan thread sampler"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+            self._started_tracing = True
+        self._start_time = time.time()
+        self._start_rss = self._dump_rss = current_rss()
+        self._start_traced = tracemalloc.get_traced_memory()[0]
+        self._snapshot = self._take_snapshot()
+        self._last = (tracemalloc.get_traced_memory()[0], sys.getallocatedblocks())
+
+        # Dump on-demand untuk kiosk tanpa keyboard: kill -USR1 <pid>
+        if hasattr(signal, 'SIGUSR1') and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.request_dump())
+
+        if self.log_path is not None:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._stop.clear()
+        self.thread = threading.Thread(target=self._loop, name='memory-monitor', daemon=True)
+        self.thread.start()
+
+        rss = f"{self._start_rss / MB:.1f} MB" if self._start_rss is not None else "tidak tersedia"
+        print(f"✓ Memory monitor aktif (RSS {rss}, sample setiap {self.interval}s"
+              f"{f', dump otomatis +{self.growth_mb} MB' if self.growth_mb else ''})")
+
+    def observe_stage(self, stage: str):
+        """
+        Catat alokasi bersih sejak panggilan sebelumnya untuk stage yang baru selesai
+
+        Args:
+            stage: Nama stage pipeline (Pipeline.stage)
+        """
+        current = tracemalloc.get_traced_memory()[0]
+        blocks = sys.getallocatedblocks()
+        net_bytes = current - self._last[0]
+        net_blocks = blocks - self._last[1]
+        self._last = (current, blocks)
+
+        # Snapshot monitor sendiri jatuh di interval ini: jangan dibebankan ke stage
+        runs = self._own_runs
+        if self._own_depth or runs != self._last_runs:
+            self._last_runs = runs
+            self.skipped += 1
+            return
+
+        with self.lock:
+            for table in (self.stages, self.window):
+                stats = table.get(stage)
+                if stats is None:
+                    stats = table[stage] = StageStats()
+                stats.add(net_bytes, net_blocks)
+
+    def request_dump(self):
+        """Minta dump diff snapshot (dikerjakan thread sampler, aman dari signal handler)"""
+        self._dump_requested.set()
+
+    def _begin_own(self):
+        """Tandai awal pekerjaan monitor (alokasinya bukan milik stage pipeline)"""
+        self._own_depth += 1
+
+    def _end_own(self):
+        self._own_depth -= 1
+        self._own_runs += 1
+
+    def _take_snapshot(self):
+        """Snapshot tracemalloc tanpa alokasi import dan alokasi monitor sendiri"""
+        snapshot = tracemalloc.take_snapshot()
+        filters = [tracemalloc.Filter(False, name) for name in IGNORED_FILES]
+        filters += [tracemalloc.Filter(False, name, all_frames=True) for name in IGNORED_STACKS]
+        return snapshot.filter_traces(filters)
+
+    def _loop(self):
+        """Loop sampler: sample periodik, dump saat diminta atau RSS naik"""
+        next_sample = time.perf_counter() + self.interval
+        while not self._stop.is_set():
+            requested = self._dump_requested.wait(max(0.0, next_sample - time.perf_counter()))
+            if self._stop.is_set():
+                break
+            if requested:
+                self._dump_requested.clear()
+                self.dump('request')
+                continue
+            next_sample = time.perf_counter() + self.interval
+            self.sample()
+
+    def sample(self) -> Dict:
+        """
+        Ambil satu sample memory, tulis ke log, dan dump jika threshold terlewati
+
+        Returns:
+            Dictionary sample
+        """
+        self._begin_own()
+        try:
+            return self._sample()
+        finally:
+            self._end_own()
+
+    def _sample(self) -> Dict:
+        rss = current_rss()
+        traced, traced_peak = tracemalloc.get_traced_memory()
+        top = self._take_snapshot().statistics('lineno')[:self.top]
+        with self.lock:
+            window = {stage: stats.to_dict() for stage, stats in self.window.items()}
+            self.window = {}
+        self.samples += 1
+
+        record = {
+            'timestamp': round(time.time(), 3),
+            'uptime': round(time.time() - self._start_time, 3),
+            'rss_mb': round(rss / MB, 2) if rss is not None else None,
+            'rss_growth_mb': round((rss - self._start_rss) / MB, 2) if rss is not None else None,
+            'traced_mb': round(traced / MB, 2),
+            'traced_peak_mb': round(traced_peak / MB, 2),
+            'traced_growth_mb': round((traced - self._start_traced) / MB, 2),
+            'stages': window,
+            'top': [{'where': _where(stat.traceback), 'size_kb': round(stat.size / 1024, 1),
+                     'count': stat.count} for stat in top]
+        }
+        if self.log_path is not None:
+            with open(self.log_path, 'a') as f:
+                f.write(json.dumps(record) + "\n")
+
+        if self.growth_mb and rss is not None and self._dump_rss is not None:
+            if rss - self._dump_rss >= self.growth_mb * MB:
+                self.dump(f"RSS naik {(rss - self._dump_rss) / MB:.1f} MB")
+        return record
+
+    def dump(self, reason: str = 'manual') -> Path:
+        """
+        Tulis diff snapshot terhadap snapshot sebelumnya (atau baseline) ke file teks
+
+        Args:
+            reason: Alasan dump (ditulis di header file)
+
+        Returns:
+            Path file dump
+        """
+        self._begin_own()
+        try:
+            return self._dump(reason)
+        finally:
+            self._end_own()
+
+    def _dump(self, reason: str) -> Path:
+        rss = current_rss()
+        traced = tracemalloc.get_traced_memory()[0]
+        snapshot = self._take_snapshot()
+        diff = snapshot.compare_to(self._snapshot, 'traceback')
+        with self.lock:
+            stages = {stage: stats.to_dict() for stage, stats in self.stages.items()}
+
+        lines = [f"Memory dump ({reason}) {time.strftime('%Y-%m-%d %H:%M:%S')}",
+                 f"Uptime: {time.time() - self._start_time:.0f} s"]
+        if rss is not None:
+            rss_growth = (rss - self._start_rss) / MB
+            traced_growth = (traced - self._start_traced) / MB
+            lines.append(f"RSS: {rss / MB:.1f} MB ({rss_growth:+.1f} MB sejak start)")
+            lines.append(f"Traced (Python + NumPy): {traced / MB:.1f} MB ({traced_growth:+.1f} MB)")
+            lines.append(f"Tidak ter-trace (native: MediaPipe, OpenCV, window): "
+                         f"{rss_growth - traced_growth:+.1f} MB")
+        else:
+            lines.append(f"Traced (Python + NumPy): {traced / MB:.1f} MB "
+                         f"({(traced - self._start_traced) / MB:+.1f} MB), RSS tidak tersedia")
+
+        lines.append("")
+        lines.append(f"Alokasi bersih per stage per frame (sejak start, perkiraan; "
+                     f"{self.skipped} interval dibuang karena beririsan dengan snapshot monitor):")
+        lines.append(f"  {'stage':<10} {'frames':>8} {'bytes/frame':>12} {'blocks/frame':>13} {'max bytes':>10}")
+        for stage, stats in sorted(stages.items(), key=lambda item: -item[1]['bytes_per_frame']):
+            lines.append(f"  {stage:<10} {stats['frames']:>8} {stats['bytes_per_frame']:>12.1f} "
+                         f"{stats['blocks_per_frame']:>13.2f} {stats['max_bytes']:>10}")
+
+        lines.append("")
+        lines.append(f"Top {self.top} perubahan sejak snapshot sebelumnya:")
+        for stat in diff[:self.top]:
+            lines.append(f"  {stat.size_diff / 1024:+.1f} KB ({stat.count_diff:+d} block), "
+                         f"total {stat.size / 1024:.1f} KB")
+            for frame in stat.traceback.format():
+                lines.append(f"      {frame.strip()}")
+
+        self.dump_dir.mkdir(parents=True, exist_ok=True)
+        path = self.dump_dir / f"memory_diff_{time.strftime('%Y%m%d_%H%M%S')}_{len(self.dumps)}.txt"
+        path.write_text("\n".join(lines) + "\n")
+        self.dumps.append(path)
+
+        # Dump berikutnya dibandingkan dengan kondisi saat ini
+        self._snapshot = snapshot
+        self._dump_rss = rss
+        print(f"[MEMORY] Dump ({reason}): {path}")
+        return path
+
+    def summary(self) -> str:
+        """Ringkasan alokasi bersih per stage untuk console"""
+        with self.lock:
+            stages = {stage: stats.to_dict() for stage, stats in self.stages.items()}
+        rss = current_rss()
+        text = "Memory:"
+        if rss is not None and self._start_rss is not None:
+            text += f" RSS {rss / MB:.1f} MB ({(rss - self._start_rss) / MB:+.1f} MB),"
+        text += " alokasi bersih/frame " + ", ".join(
+            f"{stage} {stats['bytes_per_frame'] / 1024:+.1f} KB" for stage, stats in stages.items())
+        return text
+
+    def close(self):
+        """Hentikan sampler (sample terakhir ditulis) dan tracemalloc jika dimulai di sini"""
+        if self.thread is None:
+            return
+        pending = self._dump_requested.is_set()
+        self._stop.set()
+        self._dump_requested.set()  # Bangunkan thread sampler
+        self.thread.join()
+        self.thread = None
+        if pending:
+            self.dump('request')
+        self.sample()
+        print(self.summary())
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+
+def _where(traceback) -> str:
+    """Lokasi frame terdalam traceback sebagai 'file:line'"""
+    frame = traceback[0]
+    return f"{Path(frame.filename).name}:{frame.lineno}"
@@ -0,0 +1,435 @@
+"""
+Metrics Module
+Counter dan histogram runtime (frame, deteksi, match, latency per stage),
+diekspor lewat endpoint HTTP format Prometheus dan log CSV/JSONL yang dirotasi
+"""
+
+import csv
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import config
+
+# Bucket histogram (batas atas, detik / skor)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.02, 0.035, 0.05, 0.075, 0.1, 0.15, 0.25, 0.5, 1.0)
+SIMILARITY_BUCKETS = (0.5, 0.6, 0.7, 0.75, 0.8, 0.85, 0.9, 0.925, 0.95, 0.975, 0.99, 1.0)
+OTHER_LABEL = "_other"
+
+# Kolom CSV snapshot: tetap dan urut, supaya setiap baris sejajar dengan header walaupun
+# histogram stage baru muncul di snapshot berikutnya (kolom kosong = belum ada data)
+PIPELINE_STAGES = ('resize', 'presence', 'detect', 'match', 'smooth', 'render', 'sink')
+SNAPSHOT_FIELDS = (
+    'timestamp', 'uptime', 'frames', 'dropped', 'fps', 'pose_rate', 'hands_rate', 'person_rate',
+    'idle', 'idle_frames', 'wakeups', 'matches', 'similarity_mean', 'latency_p50_ms', 'latency_p95_ms'
+) + tuple(f'{stage}_p95_ms' for stage in sorted(PIPELINE_STAGES))
+
+
+class Histogram:
+    """
+    Histogram dengan bucket tetap (memory konstan, tidak menyimpan sampel)
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        """
+        Args:
+            buckets: Batas atas bucket, urut naik (bucket +Inf ditambahkan otomatis)
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """Tambahkan satu sampel"""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """
+        Perkiraan quantile dari bucket (interpolasi linear di dalam bucket)
+
+        Args:
+            q: Quantile 0-1
+
+        Returns:
+            Nilai perkiraan (0.0 jika belum ada sampel)
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def mean(self) -> float:
+        """Rata-rata semua sampel"""
+        return self.total / self.count if self.count else 0.0
+
+
+class MetricsRegistry:
+    """
+    Kumpulan metrics runtime pipeline
+
+    Diisi oleh Pipeline.run() lewat observe_frame() setiap frame, dibaca oleh
+    MetricsServer (thread HTTP) dan MetricsLogger, jadi semua akses memakai lock.
+    Jumlah label referensi dibatasi max_labels supaya memory tetap terbatas
+    untuk library yang sangat besar.
+    """
+
+    def __init__(self, max_labels: Optional[int] = None):
+        """
+        Args:
+            max_labels: Jumlah maksimum label referensi (default: config.METRICS_MAX_LABELS)
+        """
+        self.max_labels = max_labels or config.METRICS_MAX_LABELS
+        self.lock = threading.Lock()
+        self.start_time = time.time()
+
+        self.frames_total = 0
+        self.frames_dropped = 0
+        self.pose_detected_total = 0
+        self.hands_detected_total = 0
+        self.person_detected_total = 0
+        self.idle_frames_total = 0
+        self.wakeups_total = 0
+        self.idle = False
+        self.matches_total = {}       # {nama_referensi: count}
+        self.stable_total = {}        # {nama_referensi: count}
+        self.similarity = Histogram(SIMILARITY_BUCKETS)
+        self.stage_seconds = {}       # {nama_stage: Histogram}
+        self.latency_seconds = Histogram(LATENCY_BUCKETS)
+        self.fps = 0.0
+
+    def _label(self, table: Dict, name: str) -> str:
+        """Nama label yang dipakai (OTHER_LABEL jika batas label tercapai)"""
+        if name in table or len(table) < self.max_labels:
+            return name
+        return OTHER_LABEL
+
+    def observe_frame(self, result, dropped: int = 0):
+        """
+        Catat hasil satu frame dari Pipeline
+
+        Args:
+            result: FrameResult (landmarks, match_name, similarity, timings, latency)
+            dropped: Total frame yang di-drop source sejauh ini
+        """
+        with self.lock:
+            self.frames_total += 1
+            self.frames_dropped = dropped
+            self.fps = result.fps
+            self.idle = result.idle
+            if result.idle:
+                self.idle_frames_total += 1
+            if result.woke:
+                self.wakeups_total += 1
+
+            landmarks = result.landmarks
+            if landmarks is not None:
+                self.person_detected_total += 1
+                if landmarks.get('pose_landmarks') is not None:
+                    self.pose_detected_total += 1
+                if landmarks.get('hand_landmarks'):
+                    self.hands_detected_total += 1
+
+            if result.match_name is not None:
+                label = self._label(self.matches_total, result.match_name)
+                self.matches_total[label] = self.matches_total.get(label, 0) + 1
+                self.similarity.observe(result.similarity)
+            if result.stable_gesture is not None:
+                label = self._label(self.stable_total, result.stable_gesture)
+                self.stable_total[label] = self.stable_total.get(label, 0) + 1
+
+            for stage, seconds in result.timings.items():
+                hist = self.stage_seconds.get(stage)
+                if hist is None:
+                    hist = self.stage_seconds[stage] = Histogram(LATENCY_BUCKETS)
+                hist.observe(seconds)
+            if result.latency is not None:
+                self.latency_seconds.observe(result.latency)
+
+    def snapshot(self) -> Dict:
+        """
+        Ringkasan metrics saat ini (untuk log)
+
+        Returns:
+            Dictionary flat berisi counter, rate deteksi, dan quantile latency
+        """
+        with self.lock:
+            frames = max(self.frames_total, 1)
+            snap = {
+                'timestamp': round(time.time(), 3),
+                'uptime': round(time.time() - self.start_time, 3),
+                'frames': self.frames_total,
+                'dropped': self.frames_dropped,
+                'fps': round(self.fps, 2),
+                'pose_rate': round(self.pose_detected_total / frames, 4),
+                'hands_rate': round(self.hands_detected_total / frames, 4),
+                'person_rate': round(self.person_detected_total / frames, 4),
+                'idle': int(self.idle),
+                'idle_frames': self.idle_frames_total,
+                'wakeups': self.wakeups_total,
+                'matches': sum(self.matches_total.values()),
+                'similarity_mean': round(self.similarity.mean(), 4),
+                'latency_p50_ms': round(self.latency_seconds.quantile(0.5) * 1000, 2),
+                'latency_p95_ms': round(self.latency_seconds.quantile(0.95) * 1000, 2),
+            }
+            for stage, hist in self.stage_seconds.items():
+                snap[f'{stage}_p95_ms'] = round(hist.quantile(0.95) * 1000, 2)
+            return snap
+
+    def render_prometheus(self) -> str:
+        """
+        Render semua metrics dalam format teks Prometheus (exposition format 0.0.4)
+
+        Returns:
+            String untuk response /metrics
+        """
+        lines = []
+        with self.lock:
+            _counter(lines, 'gesture_frames_total', "Frame yang sudah diproses", self.frames_total)
+            _counter(lines, 'gesture_frames_dropped_total', "Frame kamera yang di-drop", self.frames_dropped)
+            _counter(lines, 'gesture_pose_detected_total', "Frame dengan pose terdeteksi",
+                     self.pose_detected_total)
+            _counter(lines, 'gesture_hands_detected_total', "Frame dengan tangan terdeteksi",
+                     self.hands_detected_total)
+            _counter(lines, 'gesture_person_detected_total', "Frame dengan pose atau tangan terdeteksi",
+                     self.person_detected_total)
+
+            _counter(lines, 'gesture_idle_frames_total', "Presence check saat idle mode",
+                     self.idle_frames_total)
+            _counter(lines, 'gesture_wakeups_total', "Keluar dari idle mode", self.wakeups_total)
+
+            lines.append("# HELP gesture_idle Pipeline sedang idle (tidak ada orang)")
+            lines.append("# TYPE gesture_idle gauge")
+            lines.append(f"gesture_idle {int(self.idle)}")
+
+            lines.append("# HELP gesture_fps Frame per detik saat ini")
+            lines.append("# TYPE gesture_fps gauge")
+            lines.append(f"gesture_fps {self.fps:.3f}")
+
+            _labelled_counter(lines, 'gesture_matches_total', "Match mentah per referensi",
+                              self.matches_total)
+            _labelled_counter(lines, 'gesture_stable_total', "Frame gesture stabil per referensi",
+                              self.stable_total)
+
+            lines.append("# HELP gesture_similarity Distribusi similarity match")
+            lines.append("# TYPE gesture_similarity histogram")
+            _histogram(lines, 'gesture_similarity', self.similarity)
+
+            lines.append("# HELP gesture_stage_seconds Durasi per stage pipeline")
+            lines.append("# TYPE gesture_stage_seconds histogram")
+            for stage, hist in self.stage_seconds.items():
+                _histogram(lines, 'gesture_stage_seconds', hist, f'stage="{stage}"')
+
+            lines.append("# HELP gesture_latency_seconds Latency capture-to-display")
+            lines.append("# TYPE gesture_latency_seconds histogram")
+            _histogram(lines, 'gesture_latency_seconds', self.latency_seconds)
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    """Escape nilai label Prometheus"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _counter(lines: List[str], name: str, help_text: str, value):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} counter")
+    lines.append(f"{name} {value}")
+
+
+def _labelled_counter(lines: List[str], name: str, help_text: str, table: Dict):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} counter")
+    for label, value in table.items():
+        lines.append(f'{name}{{reference="{_escape(label)}"}} {value}')
+
+
+def _histogram(lines: List[str], name: str, hist: Histogram, labels: str = ""):
+    prefix = labels + "," if labels else ""
+    cumulative = 0
+    for bound, count in zip(hist.buckets, hist.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {hist.count}')
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {hist.total:.6f}")
+    lines.append(f"{name}_count{suffix} {hist.count}")
+
+
+class MetricsServer:
+    """
+    HTTP server lokal untuk endpoint /metrics (thread daemon)
+    """
+
+    def __init__(self, registry: MetricsRegistry, host: Optional[str] = None,
+                 port: Optional[int] = None):
+        """
+        Args:
+            registry: MetricsRegistry yang diekspor
+            host: Host bind (default: config.METRICS_HOST)
+            port: Port (default: config.METRICS_PORT, 0 = port bebas)
+        """
+        registry_ref = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry_ref.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Jangan spam console setiap scrape
+
+        host = host or config.METRICS_HOST
+        port = config.METRICS_PORT if port is None else port
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self):
+        self.thread.start()
+        print(f"✓ Metrics endpoint: {self.url}")
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class MetricsLogger:
+    """
+    Tulis snapshot metrics secara periodik ke file JSONL atau CSV
+
+    File dirotasi berdasarkan ukuran (metrics.jsonl -> metrics.jsonl.1 -> ...),
+    hanya `backups` file lama yang disimpan.
+    """
+
+    def __init__(self, registry: MetricsRegistry, path: Optional[str] = None,
+                 interval: Optional[float] = None, max_bytes: Optional[int] = None,
+                 backups: Optional[int] = None):
+        """
+        Args:
+            registry: MetricsRegistry yang di-log
+            path: File log, format dari ekstensi .csv atau .jsonl (default: config.METRICS_LOG_PATH)
+            interval: Interval snapshot dalam detik (default: config.METRICS_LOG_INTERVAL)
+            max_bytes: Ukuran file sebelum rotasi (default: config.METRICS_LOG_MAX_BYTES)
+            backups: Jumlah file lama (default: config.METRICS_LOG_BACKUPS)
+        """
+        self.registry = registry
+        self.path = Path(path or config.METRICS_LOG_PATH)
+        self.interval = interval or config.METRICS_LOG_INTERVAL
+        self.max_bytes = max_bytes or config.METRICS_LOG_MAX_BYTES
+        self.backups = config.METRICS_LOG_BACKUPS if backups is None else backups
+        self.csv = self.path.suffix.lower() == '.csv'
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._header = None  # Header CSV file saat ini (dibaca sekali)
+
+        self._stop = threading.Event()
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        print(f"✓ Metrics log: {self.path} (setiap {self.interval}s)")
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def _rotate(self):
+        """Geser file log lama: path.N dihapus, path.i -> path.i+1, path -> path.1"""
+        if self.backups <= 0:
+            self.path.unlink()
+            return
+        for i in range(self.backups - 1, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{i}")
+            if src.exists():
+                os.replace(src, self.path.with_name(f"{self.path.name}.{i + 1}"))
+        os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+
+    def _csv_header(self) -> Optional[List[str]]:
+        """Header file CSV saat ini, atau None jika file belum ada"""
+        if self._header is None and self.path.exists():
+            with open(self.path, newline='') as f:
+                self._header = next(csv.reader(f), None)
+        return self._header
+
+    def write(self):
+        """Tulis satu snapshot ke log (rotasi dulu jika file sudah penuh)"""
+        snap = self.registry.snapshot()
+        fields = list(SNAPSHOT_FIELDS) + sorted(set(snap) - set(SNAPSHOT_FIELDS))
+        if self.path.exists():
+            # Kolom di luar SNAPSHOT_FIELDS (stage baru) = file baru dengan header baru
+            if (self.path.stat().st_size >= self.max_bytes or
+                    (self.csv and self._csv_header() != fields)):
+                self._rotate()
+                self._header = None
+
+        if self.csv:
+            new_file = not self.path.exists()
+            with open(self.path, 'a', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=fields, restval='')
+                if new_file:
+                    writer.writeheader()
+                    self._header = fields
+                writer.writerow(snap)
+        else:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(snap) + "\n")
+
+    def close(self):
+        self._stop.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        self.write()  # Snapshot terakhir
+
+
+def start_metrics(host: Optional[str] = None, port: Optional[int] = None,
+                  log_path: Optional[str] = None):
+    """
+    Buat registry dan jalankan endpoint + logger sesuai config
+
+    Returns:
+        Tuple (registry, list objek yang harus di-close saat selesai)
+    """
+    registry = MetricsRegistry()
+    services = []
+
+    port = config.METRICS_PORT if port is None else port
+    if port:
+        try:
+            server = MetricsServer(registry, host, port)
+            server.start()
+            services.append(server)
+        except OSError as e:
+            print(f"Gagal membuka metrics endpoint di port {port}: {e}")
+
+    log_path = log_path or config.METRICS_LOG_PATH
+    if log_path:
+        logger = MetricsLogger(registry, log_path)
+        logger.start()
+        services.append(logger)
+
+    return registry, services
@@ -0,0 +1,940 @@
+"""
+Pipeline Module
+Satu pipeline engine untuk semua entry point:
+source -> detect -> match -> smooth -> render -> sink
+"""
+
+import argparse
+import cv2
+import time
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from reference_loader import find_reference_files
+from frame_pool import BufferPool
+import config
+
+
+# ============================================================================
+# FRAME SOURCES
+# ============================================================================
+
+class FrameSource:
+    """Base class untuk sumber frame (BGR)"""
+
+    name = 'source'
+    live = False  # True untuk source real-time (kamera): frame yang dilewati tidak perlu diproses
+
+    def open(self) -> bool:
+        """Buka source, return False jika gagal"""
+        return True
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Baca frame berikutnya, return (False, None) jika habis/gagal"""
+        raise NotImplementedError
+
+    def read_into(self, out: Optional[np.ndarray]) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Baca frame berikutnya ke buffer `out` jika source mendukung
+
+        Source yang tidak mendukung mengabaikan `out` dan mengalokasikan frame
+        baru. Caller harus memakai frame yang di-return, bukan `out`.
+        """
+        return self.read()
+
+    def close(self):
+        """Tutup source"""
+        pass
+
+
+class CameraSource(FrameSource):
+    """Frame dari webcam (cv2.VideoCapture)"""
+
+    name = 'camera'
+    live = True
+
+    def __init__(self, index: Optional[int] = None, width: Optional[int] = None,
+                 height: Optional[int] = None):
+        """
+        Args:
+            index: Index kamera (default: config.CAMERA_INDEX)
+            width: Lebar frame yang diminta (default: config.CAMERA_WIDTH)
+            height: Tinggi frame yang diminta (default: config.CAMERA_HEIGHT)
+        """
+        self.index = config.CAMERA_INDEX if index is None else index
+        self.width = width or config.CAMERA_WIDTH
+        self.height = height or config.CAMERA_HEIGHT
+        self.cap = None
+
+    def open(self) -> bool:
+        self.cap = cv2.VideoCapture(self.index)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        # Buffer driver sekecil mungkin supaya frame tidak menumpuk
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+        if not self.cap.isOpened():
+            print("Error: Tidak bisa membuka webcam!")
+            print("Cek:")
+            print("  - Webcam terhubung dengan benar")
+            print("  - Tidak ada aplikasi lain yang menggunakan webcam")
+            print("  - Permission webcam sudah diaktifkan")
+            return False
+        return True
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        return self.read_into(None)
+
+    def read_into(self, out: Optional[np.ndarray]) -> Tuple[bool, Optional[np.ndarray]]:
+        ret, frame = self.cap.read(out)
+        if not ret:
+            print("Error: Tidak bisa membaca frame dari webcam")
+        return ret, frame
+
+    def close(self):
+        if self.cap is not None:
+            self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """Frame dari file video"""
+
+    name = 'video'
+
+    def __init__(self, path: str, loop: bool = False):
+        """
+        Args:
+            path: Path file video
+            loop: Ulangi dari awal saat video habis
+        """
+        self.path = path
+        self.loop = loop
+        self.cap = None
+
+    def open(self) -> bool:
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            print(f"Error: Tidak bisa membuka video {self.path}")
+            return False
+        return True
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        return self.read_into(None)
+
+    def read_into(self, out: Optional[np.ndarray]) -> Tuple[bool, Optional[np.ndarray]]:
+        ret, frame = self.cap.read(out)
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read(out)
+        return ret, frame
+
+    def close(self):
+        if self.cap is not None:
+            self.cap.release()
+
+
+class ImageDirectorySource(FrameSource):
+    """Frame dari semua gambar di satu folder (urut nama file)"""
+
+    name = 'images'
+
+    def __init__(self, path: str, loop: bool = False):
+        """
+        Args:
+            path: Folder gambar
+            loop: Ulangi dari gambar pertama setelah gambar terakhir
+        """
+        self.path = Path(path)
+        self.loop = loop
+        self.files = []
+        self.position = 0
+
+    def open(self) -> bool:
+        if not self.path.is_dir():
+            print(f"Error: Folder {self.path} tidak ditemukan!")
+            return False
+        self.files = find_reference_files(self.path)
+        if not self.files:
+            print(f"Error: Tidak ada gambar di folder {self.path}")
+            return False
+        self.position = 0
+        return True
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        while True:
+            if self.position >= len(self.files):
+                if not self.loop:
+                    return False, None
+                self.position = 0
+
+            image_path = self.files[self.position]
+            self.position += 1
+            image = cv2.imread(str(image_path))
+            if image is not None:
+                return True, image
+            print(f"Warning: Tidak bisa membaca gambar {image_path}")
+
+
+class SyntheticSource(FrameSource):
+    """Frame sintetis (gradient + lingkaran bergerak) untuk test tanpa webcam"""
+
+    name = 'synthetic'
+
+    def __init__(self, width: Optional[int] = None, height: Optional[int] = None,
+                 frames: Optional[int] = None):
+        """
+        Args:
+            width: Lebar frame (default: config.CAMERA_WIDTH)
+            height: Tinggi frame (default: config.CAMERA_HEIGHT)
+            frames: Jumlah frame sebelum selesai (None = tidak terbatas)
+        """
+        self.width = width or config.CAMERA_WIDTH
+        self.height = height or config.CAMERA_HEIGHT
+        self.frames = frames
+        self.count = 0
+        self.background = None
+
+    def open(self) -> bool:
+        gradient = np.linspace(0, 255, self.width, dtype=np.float32)
+        self.background = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        self.background[:] = gradient[None, :, None].astype(np.uint8)
+        self.count = 0
+        return True
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        return self.read_into(None)
+
+    def read_into(self, out: Optional[np.ndarray]) -> Tuple[bool, Optional[np.ndarray]]:
+        if self.frames is not None and self.count >= self.frames:
+            return False, None
+
+        if out is None or out.shape != self.background.shape:
+            out = np.empty_like(self.background)
+        frame = out
+        np.copyto(frame, self.background)
+        t = self.count / 30.0
+        center = (int(self.width / 2 + self.width / 4 * np.cos(t)),
+                  int(self.height / 2 + self.height / 4 * np.sin(t)))
+        cv2.circle(frame, center, 40, config.COLOR_GREEN, -1)
+        self.count += 1
+        return True, frame
+
+
+class SharedMemorySource(FrameSource):
+    """
+    Frame BGR dari shared memory ring yang ditulis process lain (shm_producer.py)
+
+    Producer menulis frame langsung ke slot ring (sequence number +
+    timestamp perf_counter); source ini hanya menyalin slot terbaru ke buffer
+    pipeline, tanpa encode/decode atau pickling. Frame yang terlewat karena
+    producer lebih cepat dihitung di `dropped`, dan `capture_time` diambil
+    dari timestamp producer sehingga latency mencakup transport antar process.
+    Ukuran frame dan jumlah slot dibaca dari header ring saat open().
+    """
+
+    name = 'shm'
+    live = True
+
+    def __init__(self, ring_name: Optional[str] = None, width: Optional[int] = None,
+                 height: Optional[int] = None, slots: Optional[int] = None,
+                 timeout: Optional[float] = None):
+        """
+        Args:
+            ring_name: Nama shared memory ring (default: config.SHM_FRAME_NAME)
+            width: Lebar frame yang diharapkan (None = ikut header ring)
+            height: Tinggi frame yang diharapkan (None = ikut header ring)
+            slots: Jumlah slot yang diharapkan (None = ikut header ring)
+            timeout: Detik tanpa frame baru sebelum source dianggap selesai
+                     (default: config.SHM_FRAME_TIMEOUT)
+        """
+        self.ring_name = ring_name or config.SHM_FRAME_NAME
+        self.width = width
+        self.height = height
+        self.slots = slots
+        self.timeout = config.SHM_FRAME_TIMEOUT if timeout is None else timeout
+        self.ring = None
+        self.last_seq = 0
+        self.captured = 0
+        self.dropped = 0
+        self.capture_time = None
+
+    def open(self) -> bool:
+        from shm_ring import SharedMemoryRing
+
+        shape = None
+        if self.width or self.height:
+            shape = (self.height or config.CAMERA_HEIGHT, self.width or config.CAMERA_WIDTH, 3)
+        try:
+            ring = SharedMemoryRing(self.ring_name, None, None, self.slots,
+                                    create=False, track=False)
+        except FileNotFoundError:
+            print(f"Error: Shared memory '{self.ring_name}' tidak ditemukan (jalankan shm_producer.py dulu)")
+            return False
+        except ValueError as e:
+            print(f"Error: Shared memory '{self.ring_name}' tidak cocok: {e}")
+            return False
+
+        frame_shape = ring.shape[:2] + (3,)
+        if ring.dtype != np.uint8 or ring.shape != frame_shape or (shape and ring.shape != shape):
+            expected = f"{shape[1]}x{shape[0]}" if shape else "frame BGR uint8"
+            print(f"Error: Ukuran shared memory '{self.ring_name}' tidak cocok dengan {expected} "
+                  f"(ring: {ring.shape} {ring.dtype}, {ring.slots} slot)")
+            ring.close()
+            return False
+
+        self.ring = ring
+        self.height, self.width = ring.shape[:2]
+        self.slots = ring.slots
+
+        # Mulai dari frame terbaru, bukan dari awal stream producer
+        self.last_seq = self.ring.head
+        self.captured = 0
+        self.dropped = 0
+        return True
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        return self.read_into(None)
+
+    def read_into(self, out: Optional[np.ndarray]) -> Tuple[bool, Optional[np.ndarray]]:
+        if self.ring is None:
+            return False, None
+
+        if out is not None and out.shape != self.ring.shape:
+            out = None
+        deadline = time.perf_counter() + self.timeout
+        while True:
+            seq, stamp, frame = self.ring.read_latest(out=out, min_seq=self.last_seq + 1)
+            if frame is not None:
+                break
+            # Belum ada frame baru (atau slot sedang ditimpa): poll lagi
+            if time.perf_counter() > deadline:
+                return False, None
+            time.sleep(0.0005)
+
+        self.dropped += seq - self.last_seq - 1
+        self.last_seq = seq
+        self.captured += 1
+        self.capture_time = stamp
+        return True, frame
+
+    def close(self):
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+
+class LatestFrameSource(FrameSource):
+    """
+    Wrapper yang membaca source terus-menerus di thread sendiri
+
+    read() selalu mengembalikan frame terbaru; frame lama yang belum sempat
+    diproses dibuang (dihitung di `dropped`) sehingga hasil yang ditampilkan
+    tidak tertinggal beberapa frame dari kenyataan saat inference lebih lambat
+    dari kamera. `capture_time` berisi waktu (perf_counter) frame terakhir
+    selesai di-grab, untuk mengukur latency capture-to-display.
+
+    Buffer frame memakai triple buffering (back: sedang ditulis thread,
+    ready: frame terbaru, front: sedang diproses consumer) yang hanya
+    ditukar, sehingga di steady state tidak ada alokasi frame baru.
+    """
+
+    def __init__(self, source: FrameSource):
+        """
+        Args:
+            source: FrameSource yang dibaca di background thread
+        """
+        self.source = source
+        self.name = source.name
+        self.live = source.live
+        self.captured = 0
+        self.dropped = 0
+        self.capture_time = None
+
+        self._cond = threading.Condition()
+        self._back = None
+        self._ready = None
+        self._front = None
+        self._frame_time = None
+        self._has_new = False
+        self._ended = False
+        self._running = False
+        self._thread = None
+
+    def open(self) -> bool:
+        if not self.source.open():
+            return False
+        self.captured = 0
+        self.dropped = 0
+        self._ended = False
+        self._has_new = False
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop, name='capture', daemon=True)
+        self._thread.start()
+        return True
+
+    def _capture_loop(self):
+        """Loop background: grab frame terus, simpan hanya yang terbaru"""
+        while self._running:
+            ret, frame = self.source.read_into(self._back)
+            grab_time = time.perf_counter()
+            with self._cond:
+                if not ret:
+                    self._ended = True
+                    self._cond.notify_all()
+                    return
+                if self._has_new:
+                    self.dropped += 1
+                # Publish: frame baru jadi ready, ready lama dipakai ulang sebagai back
+                self._back, self._ready = self._ready, frame
+                self._frame_time = grab_time
+                self._has_new = True
+                self.captured += 1
+                self._cond.notify_all()
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        with self._cond:
+            while not self._has_new and not self._ended:
+                self._cond.wait(timeout=1.0)
+            if not self._has_new:
+                return False, None
+            # Front lama (sudah selesai diproses) jadi cadangan di posisi ready
+            self._front, self._ready = self._ready, self._front
+            self.capture_time = self._frame_time
+            self._has_new = False
+        return True, self._front
+
+    def close(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        self.source.close()
+
+
+# ============================================================================
+# FRAME RESULT
+# ============================================================================
+
+class FrameResult:
+    """Hasil pemrosesan satu frame yang diteruskan ke renderer dan sink"""
+
+    def __init__(self, index: int, timestamp: float, frame: np.ndarray):
+        self.index = index
+        self.timestamp = timestamp
+        self.frame = frame            # Frame input (sudah resize, belum mirror)
+        self.display = frame          # Frame dengan skeleton overlay
+        self.landmarks = None         # Dict landmarks dari GestureDetector (atau None)
+        self.match_name = None        # Hasil matching mentah (sebelum smoothing)
+        self.similarity = 0.0
+        self.stable_gesture = None    # Hasil setelah smoothing
+        self.fps = 0.0
+        self.views = {}               # {nama_window: image} hasil renderer
+        self.capture_time = None      # perf_counter saat frame di-grab
+        self.latency = None           # Latency capture-to-display (detik)
+        self.timings = {}             # {nama_stage: durasi detik}
+        self.idle = False             # Frame idle (presence check saja, tanpa deteksi penuh)
+        self.woke = False             # Frame pertama setelah keluar dari idle
+
+
+# ============================================================================
+# FRAME SINKS
+# ============================================================================
+
+class FrameSink:
+    """Base class untuk tujuan hasil pipeline"""
+
+    def open(self):
+        """Siapkan sink"""
+        pass
+
+    def write(self, result: FrameResult) -> bool:
+        """Terima satu hasil frame, return False untuk menghentikan pipeline"""
+        raise NotImplementedError
+
+    def close(self):
+        """Tutup sink"""
+        pass
+
+
+class WindowSink(FrameSink):
+    """Tampilkan semua view di window OpenCV dan tangani keyboard"""
+
+    def __init__(self, key_handler: Optional[Callable] = None, quit_key: str = 'q'):
+        """
+        Args:
+            key_handler: Fungsi (key, result) untuk tombol selain quit_key,
+                         return False untuk menghentikan pipeline
+            quit_key: Tombol untuk keluar
+        """
+        self.key_handler = key_handler
+        self.quit_key = ord(quit_key)
+        self.windows = set()
+
+    def write(self, result: FrameResult) -> bool:
+        for window_name, image in result.views.items():
+            if window_name not in self.windows:
+                cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
+                self.windows.add(window_name)
+            cv2.imshow(window_name, image)
+
+        key = cv2.waitKey(1) & 0xFF
+        if key == self.quit_key:
+            print("\nKeluar dari aplikasi...")
+            return False
+        if key != 0xFF and self.key_handler is not None:
+            return self.key_handler(key, result) is not False
+        return True
+
+    def close(self):
+        cv2.destroyAllWindows()
+
+
+class FileSink(FrameSink):
+    """Simpan satu view ke file video (.mp4/.avi) atau folder gambar"""
+
+    def __init__(self, path: str, view: Optional[str] = None, fps: float = 30.0):
+        """
+        Args:
+            path: File video (.mp4/.avi) atau folder untuk gambar per frame
+            view: Nama view yang disimpan (default: view pertama)
+            fps: FPS file video
+        """
+        self.path = Path(path)
+        self.view = view
+        self.fps = fps
+        self.writer = None
+
+    def open(self):
+        if self.path.suffix.lower() in ['.mp4', '.avi']:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        else:
+            self.path.mkdir(parents=True, exist_ok=True)
+
+    def write(self, result: FrameResult) -> bool:
+        if not result.views:
+            return True
+        image = result.views[self.view] if self.view else next(iter(result.views.values()))
+
+        if self.path.suffix.lower() in ['.mp4', '.avi']:
+            if self.writer is None:
+                fourcc = cv2.VideoWriter_fourcc(*('mp4v' if self.path.suffix.lower() == '.mp4' else 'XVID'))
+                h, w = image.shape[:2]
+                self.writer = cv2.VideoWriter(str(self.path), fourcc, self.fps, (w, h))
+            self.writer.write(image)
+        else:
+            cv2.imwrite(str(self.path / f"frame_{result.index:06d}.jpg"), image)
+        return True
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+
+
+class NullSink(FrameSink):
+    """Buang semua hasil (untuk benchmark dan headless)"""
+
+    def write(self, result: FrameResult) -> bool:
+        return True
+
+
+class CallbackSink(FrameSink):
+    """Panggil fungsi untuk setiap hasil frame"""
+
+    def __init__(self, callback: Callable[[FrameResult], Optional[bool]]):
+        """
+        Args:
+            callback: Fungsi (result), return False untuk menghentikan pipeline
+        """
+        self.callback = callback
+
+    def write(self, result: FrameResult) -> bool:
+        return self.callback(result) is not False
+
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+
+def default_renderer(result: FrameResult) -> Dict[str, np.ndarray]:
+    """Renderer default: tampilkan frame dengan skeleton saja"""
+    return {'Pipeline': result.display}
+
+
+class Pipeline:
+    """Pipeline engine: source -> detect -> match -> smooth -> render -> sinks"""
+
+    def __init__(self, source: FrameSource, detector, matcher=None, dynamic_matcher=None,
+                 smoother: Optional[Callable] = None, renderer: Optional[Callable] = None,
+                 sinks: Optional[List[FrameSink]] = None, mirror: bool = True,
+                 frame_size: Optional[Tuple[int, int]] = None, metrics=None,
+                 idle_after: Optional[int] = None, memory=None):
+        """
+        Inisialisasi pipeline
+
+        Args:
+            source: FrameSource
+            detector: GestureDetector (atau object lain dengan process_frame(frame, mirror))
+            matcher: PoseMatcher / MatcherProcess (opsional)
+            dynamic_matcher: DynamicMatcher (opsional)
+            smoother: Fungsi (match_name) -> stable_gesture (opsional)
+            renderer: Fungsi (result) -> {nama_window: image} (default: default_renderer)
+            sinks: List FrameSink (default: [NullSink()])
+            mirror: Tampilkan frame dan landmark dalam versi mirror (seperti cermin)
+            frame_size: (width, height) untuk resize frame input (opsional)
+            metrics: MetricsRegistry untuk monitoring (opsional)
+            idle_after: Masuk idle mode setelah N frame tanpa orang
+                (default: config.IDLE_AFTER_FRAMES, 0 = nonaktif)
+            memory: MemoryMonitor untuk alokasi per stage (opsional)
+        """
+        self.source = source
+        self.detector = detector
+        self.matcher = matcher
+        self.dynamic_matcher = dynamic_matcher
+        self.smoother = smoother
+        self.renderer = renderer or default_renderer
+        self.sinks = sinks if sinks is not None else [NullSink()]
+        self.mirror = mirror
+        self.frame_size = frame_size
+        self.metrics = metrics
+        self.memory = memory
+
+        # Idle mode hanya jika detector punya presence check murah
+        self.idle_after = config.IDLE_AFTER_FRAMES if idle_after is None else idle_after
+        if not hasattr(detector, 'detect_presence'):
+            self.idle_after = 0
+        self.idle = False
+        self._empty_frames = 0
+        self._next_presence_check = 0.0
+        self._dynamic_hold = (None, 0.0)  # (gesture dinamis, perf_counter sampai kapan ditahan)
+
+        self.stage = 'capture'  # Stage yang sedang berjalan
+        self.frame_count = 0
+        self._prev_time = None
+        self._input_shape = None
+
+        # Buffer input dan resize dipakai ulang setiap frame
+        self.pool = BufferPool()
+
+    def process(self, frame: np.ndarray, capture_time: Optional[float] = None) -> FrameResult:
+        """
+        Proses satu frame melalui semua stage kecuali sink
+
+        Args:
+            frame: Frame BGR dari source
+            capture_time: perf_counter saat frame di-grab (default: sekarang)
+
+        Returns:
+            FrameResult
+        """
+        now = time.time()
+        stage_start = time.perf_counter()
+        timings = {}
+
+        self._mark_memory()
+        self.stage = 'resize'
+        if self.frame_size is not None and (frame.shape[1], frame.shape[0]) != self.frame_size:
+            width, height = self.frame_size
+            resized = self.pool.get('resized', (height, width) + frame.shape[2:], frame.dtype)
+            frame = cv2.resize(frame, self.frame_size, dst=resized)
+
+        result = FrameResult(self.frame_count, now, frame)
+        result.capture_time = stage_start if capture_time is None else capture_time
+        result.timings = timings
+
+        # Idle: presence check murah dulu, pipeline penuh hanya jika ada orang
+        if self.idle:
+            stage_start = self._end_stage(timings, stage_start, 'presence')
+            self._next_presence_check = time.perf_counter() + config.IDLE_CHECK_INTERVAL
+            if not self.detector.detect_presence(frame):
+                result.idle = True
+                if self.mirror:
+                    result.display = cv2.flip(frame, 1, dst=self.pool.get('idle', frame.shape))
+                if self.smoother is not None:
+                    result.stable_gesture = self.smoother(None)
+                return self._finish(result, timings, stage_start)
+            self._exit_idle()
+            result.woke = True
+
+        # Detect pose + hands (mirror diterapkan ke landmark, pixel di-flip sekali untuk display)
+        stage_start = self._end_stage(timings, stage_start, 'detect')
+        result.display, result.landmarks = self.detector.process_frame(frame, mirror=self.mirror)
+
+        # Match dengan reference poses
+        stage_start = self._end_stage(timings, stage_start, 'match')
+        if result.landmarks is not None and self.matcher is not None:
+            result.match_name, result.similarity = self.matcher.find_best_match(result.landmarks)
+
+        # Gesture dinamis (DTW) dipakai jika tidak ada static match
+        static_name = result.match_name
+        if self.dynamic_matcher is not None:
+            dynamic_name, dynamic_similarity = self.dynamic_matcher.update(result.landmarks)
+            if result.match_name is None and dynamic_name is not None:
+                result.match_name, result.similarity = dynamic_name, dynamic_similarity
+                self._dynamic_hold = (dynamic_name, time.perf_counter() + config.DTW_HOLD_SECONDS)
+
+        # Gesture smoothing (voting per frame hanya untuk static match; match dinamis
+        # hanya muncul satu frame saat gesture selesai, jadi ditahan DTW_HOLD_SECONDS)
+        stage_start = self._end_stage(timings, stage_start, 'smooth')
+        if self.smoother is not None:
+            result.stable_gesture = self.smoother(static_name)
+        else:
+            result.stable_gesture = static_name
+        if self._dynamic_hold[0] is not None:
+            if time.perf_counter() < self._dynamic_hold[1]:
+                result.stable_gesture = self._dynamic_hold[0]
+            else:
+                self._dynamic_hold = (None, 0.0)
+
+        # Hitung frame kosong berturut-turut untuk idle mode
+        if self.idle_after > 0:
+            self._empty_frames = self._empty_frames + 1 if result.landmarks is None else 0
+            if self._empty_frames >= self.idle_after:
+                self._enter_idle()
+
+        return self._finish(result, timings, stage_start)
+
+    def _finish(self, result: FrameResult, timings: Dict, stage_start: float) -> FrameResult:
+        """Hitung FPS dan render views (stage terakhir sebelum sink)"""
+        # Calculate FPS
+        current_time = time.time()
+        if self._prev_time is not None and current_time > self._prev_time:
+            result.fps = 1 / (current_time - self._prev_time)
+        self._prev_time = current_time
+
+        stage_start = self._end_stage(timings, stage_start, 'render')
+        result.views = self.renderer(result)
+        self._end_stage(timings, stage_start, 'sink')
+        self.frame_count += 1
+        return result
+
+    def _enter_idle(self):
+        """Masuk idle mode: deteksi penuh dihentikan sampai ada orang lagi"""
+        self.idle = True
+        self._next_presence_check = time.perf_counter() + config.IDLE_CHECK_INTERVAL
+        if self.dynamic_matcher is not None:
+            self.dynamic_matcher.reset()
+        self._dynamic_hold = (None, 0.0)
+        print(f"[IDLE] Tidak ada orang selama {self._empty_frames} frame, masuk idle mode")
+
+    def _exit_idle(self):
+        """Keluar dari idle mode: frame ini langsung diproses pipeline penuh"""
+        self.idle = False
+        self._empty_frames = 0
+        print("[IDLE] Orang terdeteksi, kembali ke pipeline penuh")
+
+    def _end_stage(self, timings: Dict, stage_start: float, next_stage: str) -> float:
+        """Catat durasi stage saat ini dan pindah ke stage berikutnya"""
+        now = time.perf_counter()
+        timings[self.stage] = now - stage_start
+        self._mark_memory()
+        self.stage = next_stage
+        return now
+
+    def _mark_memory(self):
+        """Catat alokasi bersih stage yang baru selesai (jika memory monitor aktif)"""
+        if self.memory is not None:
+            self.memory.observe_stage(self.stage)
+
+    def run(self, max_frames: Optional[int] = None) -> Optional[Dict]:
+        """
+        Jalankan pipeline sampai source habis, sink minta berhenti, atau max_frames
+
+        Args:
+            max_frames: Jumlah frame maksimum (None = tidak terbatas)
+
+        Returns:
+            Dict statistik ('frames', 'elapsed', 'avg_fps', 'dropped', 'avg_latency',
+            'max_latency', 'buffer_allocations', 'idle_frames', 'idle_time', 'idle_cpu',
+            'active_cpu', 'wakeups', 'avg_wake_latency'), atau None jika source gagal dibuka.
+            idle_cpu/active_cpu adalah CPU process (1.0 = satu core penuh).
+        """
+        if not self.source.open():
+            return None
+
+        for sink in self.sinks:
+            sink.open()
+
+        start_time = time.time()
+        start_count = self.frame_count
+        latency_total = 0.0
+        latency_max = 0.0
+        # Waktu wall dan CPU per mode: [wall, cpu] untuk idle dan aktif
+        mode_time = {True: [0.0, 0.0], False: [0.0, 0.0]}
+        idle_frames = 0
+        wake_latencies = []
+        try:
+            while max_frames is None or self.frame_count - start_count < max_frames:
+                wall_start = time.perf_counter()
+                cpu_start = time.process_time()
+
+                # Idle + source real-time: tidur sampai presence check berikutnya
+                if self.idle and self.source.live:
+                    wait = self._next_presence_check - wall_start
+                    if wait > 0:
+                        time.sleep(wait)
+
+                out = self.pool.get('input', self._input_shape) if self._input_shape else None
+                ret, frame = self.source.read_into(out)
+                if not ret:
+                    break
+                self._input_shape = frame.shape
+
+                result = self.process(frame, getattr(self.source, 'capture_time', None))
+
+                sink_start = time.perf_counter()
+                keep_running = True
+                for sink in self.sinks:
+                    if not sink.write(result):
+                        keep_running = False
+
+                # Latency capture-to-display (setelah semua sink selesai)
+                sink_end = time.perf_counter()
+                result.timings['sink'] = sink_end - sink_start
+                result.latency = sink_end - result.capture_time
+                latency_total += result.latency
+                latency_max = max(latency_max, result.latency)
+                self._mark_memory()
+                self.stage = 'capture'
+
+                if self.metrics is not None:
+                    self.metrics.observe_frame(result, getattr(self.source, 'dropped', 0))
+
+                if result.idle:
+                    idle_frames += 1
+                if result.woke:
+                    wake_latencies.append(result.latency)
+                mode = mode_time[result.idle]
+                mode[0] += time.perf_counter() - wall_start
+                mode[1] += time.process_time() - cpu_start
+
+                if not keep_running:
+                    break
+        finally:
+            self.source.close()
+            for sink in self.sinks:
+                sink.close()
+
+        elapsed = time.time() - start_time
+        frames = self.frame_count - start_count
+        detector_pool = getattr(self.detector, 'pool', None)
+        return {
+            'frames': frames,
+            'elapsed': elapsed,
+            'avg_fps': frames / elapsed if elapsed > 0 else 0.0,
+            'dropped': getattr(self.source, 'dropped', 0),
+            'avg_latency': latency_total / frames if frames > 0 else 0.0,
+            'max_latency': latency_max,
+            'buffer_allocations': self.pool.allocations +
+                                  (detector_pool.allocations if detector_pool is not None else 0),
+            'idle_frames': idle_frames,
+            'idle_time': mode_time[True][0],
+            'idle_cpu': mode_time[True][1] / mode_time[True][0] if mode_time[True][0] > 0 else 0.0,
+            'active_cpu': mode_time[False][1] / mode_time[False][0] if mode_time[False][0] > 0 else 0.0,
+            'wakeups': len(wake_latencies),
+            'avg_wake_latency': sum(wake_latencies) / len(wake_latencies) if wake_latencies else 0.0
+        }
+
+
+# ============================================================================
+# COMMAND LINE HELPERS
+# ============================================================================
+
+def format_stats(stats: Dict) -> str:
+    """
+    Format statistik Pipeline.run() untuk ditampilkan di console
+
+    Args:
+        stats: Dict hasil Pipeline.run()
+
+    Returns:
+        String ringkasan statistik
+    """
+    text = (f"{stats['frames']} frame diproses, rata-rata {stats['avg_fps']:.1f} FPS, "
+            f"latency {stats['avg_latency'] * 1000:.1f} ms (max {stats['max_latency'] * 1000:.1f} ms), "
+            f"{stats['dropped']} frame kamera dibuang, {stats['buffer_allocations']} alokasi buffer frame")
+    if stats.get('idle_frames'):
+        text += (f"\nIdle: {stats['idle_time']:.1f} s ({stats['idle_frames']} presence check), "
+                 f"CPU idle {stats['idle_cpu'] * 100:.0f}% vs aktif {stats['active_cpu'] * 100:.0f}% core, "
+                 f"{stats['wakeups']} wake-up (rata-rata {stats['avg_wake_latency'] * 1000:.1f} ms "
+                 f"+ maks {config.IDLE_CHECK_INTERVAL * 1000:.0f} ms interval check)")
+    return text
+
+
+def add_pipeline_arguments(parser, default_sink: str = 'window'):
+    """
+    Tambahkan argumen --source, --sink, --max-frames, --metrics, --memory, --profile ke argparse parser
+
+    --metrics/--memory/--profile punya pasangan --no-* untuk mematikan fitur
+    yang diaktifkan di config.py.
+
+    Args:
+        parser: argparse.ArgumentParser
+        default_sink: Sink default
+    """
+    parser.add_argument('--source', default='camera',
+                        help="camera[:INDEX] | video:PATH | images:DIR | synthetic[:FRAMES] | shm[:NAME]")
+    parser.add_argument('--sink', default=default_sink,
+                        help="window | null | file:PATH (pisahkan dengan koma untuk beberapa sink)")
+    parser.add_argument('--max-frames', type=int, default=None,
+                        help="Berhenti setelah N frame")
+    parser.add_argument('--metrics', action=argparse.BooleanOptionalAction, default=config.METRICS_ENABLED,
+                        help="Aktifkan metrics (endpoint Prometheus + log, lihat config.METRICS_*)")
+    parser.add_argument('--memory', action=argparse.BooleanOptionalAction, default=config.MEMORY_MONITOR,
+                        help="Aktifkan memory monitor (RSS + tracemalloc, lihat config.MEMORY_*)")
+    parser.add_argument('--profile', action=argparse.BooleanOptionalAction, default=config.PROFILE_ON_START,
+                        help="Langsung capture stack profile saat mulai (lihat config.PROFILE_*)")
+
+
+def build_source(spec: str, width: Optional[int] = None,
+                 height: Optional[int] = None) -> FrameSource:
+    """
+    Buat FrameSource dari string spesifikasi
+
+    Args:
+        spec: camera[:INDEX] | video:PATH | images:DIR | synthetic[:FRAMES] | shm[:NAME]
+        width: Lebar frame untuk camera/synthetic (shm ikut header ring)
+        height: Tinggi frame untuk camera/synthetic (shm ikut header ring)
+
+    Returns:
+        FrameSource
+    """
+    kind, _, arg = spec.partition(':')
+    if kind == 'camera':
+        camera = CameraSource(int(arg) if arg else None, width, height)
+        return LatestFrameSource(camera) if config.CAPTURE_THREAD else camera
+    if kind == 'video':
+        return VideoFileSource(arg)
+    if kind == 'images':
+        return ImageDirectorySource(arg)
+    if kind == 'synthetic':
+        return SyntheticSource(width, height, int(arg) if arg else None)
+    if kind == 'shm':
+        return SharedMemorySource(arg or None)
+    raise ValueError(f"Source tidak dikenal: {spec}")
+
+
+def build_sinks(spec: str, key_handler: Optional[Callable] = None) -> List[FrameSink]:
+    """
+    Buat list FrameSink dari string spesifikasi
+
+    Args:
+        spec: window | null | file:PATH, dipisah koma
+        key_handler: Key handler untuk WindowSink
+
+    Returns:
+        List FrameSink
+    """
+    sinks = []
+    for item in spec.split(','):
+        kind, _, arg = item.strip().partition(':')
+        if kind == 'window':
+            sinks.append(WindowSink(key_handler))
+        elif kind == 'null':
+            sinks.append(NullSink())
+        elif kind == 'file':
+            sinks.append(FileSink(arg or config.OUTPUT_PATH))
+        else:
+            raise ValueError(f"Sink tidak dikenal: {item}")
+    return sinks
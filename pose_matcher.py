@@ -4,22 +4,222 @@ Mencocokkan pose dari webcam dengan pose di gambar referensi
 """
 
 import numpy as np
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 import os
+import kernels
 import config
+from reference_store import StoreNames
+
+POSE_LANDMARK_COUNT = 33
+HAND_LANDMARK_COUNT = 21
+MAX_HANDS = 2
+HAND_VECTOR_DIM = HAND_LANDMARK_COUNT * 2
+
+
+def hand_vector(hand) -> Optional[np.ndarray]:
+    """
+    Bentuk tangan sebagai vector unit-length (42,)
+    
+    Koordinat di-center ke rata-rata landmark tangan lalu dibagi norm-nya,
+    jadi posisi dan ukuran tangan di frame diabaikan, hanya bentuk jari.
+    
+    Args:
+        hand: List atau array (21, 3) hand landmarks
+        
+    Returns:
+        Vector (42,) atau None jika tangan tidak valid
+    """
+    if hand is None or len(hand) != HAND_LANDMARK_COUNT:
+        return None
+    coords = np.array([(lm[0], lm[1]) for lm in hand], dtype=np.float64)
+    vec = (coords - coords.mean(axis=0)).reshape(-1)
+    norm = np.linalg.norm(vec)
+    if norm == 0 or not np.isfinite(norm):
+        return None
+    return vec / norm
+
+
+def hand_vectors(landmarks) -> List[np.ndarray]:
+    """
+    Semua tangan valid di landmarks sebagai vector unit, urut posisi wrist (x kecil dulu)
+    
+    Args:
+        landmarks: Dict landmarks dari GestureDetector (atau list pose saja)
+        
+    Returns:
+        List maksimal MAX_HANDS vector (42,)
+    """
+    if not isinstance(landmarks, dict):
+        return []
+    hands = [hand for hand in landmarks.get('hand_landmarks') or []
+             if hand is not None and len(hand) == HAND_LANDMARK_COUNT]
+    hands.sort(key=lambda hand: hand[0][0])
+    vectors = [hand_vector(hand) for hand in hands[:MAX_HANDS]]
+    return [vec for vec in vectors if vec is not None]
+
+
+def reference_weights(has_pose: np.ndarray, has_hands: np.ndarray,
+                      pose_weight: Optional[float] = None,
+                      hand_weight: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bobot pose dan tangan per referensi (jumlahnya 1 untuk setiap referensi)
+    
+    Referensi pose saja memakai pose penuh, referensi tangan saja (tanpa
+    pose) memakai tangan penuh, referensi dengan keduanya memakai
+    POSE_WEIGHT : HAND_WEIGHT.
+    
+    Args:
+        has_pose: Array bool (N,) referensi punya pose valid
+        has_hands: Array bool (N,) referensi punya minimal satu tangan
+        pose_weight: Bobot pose (default: config.POSE_WEIGHT)
+        hand_weight: Bobot tangan (default: config.HAND_WEIGHT)
+        
+    Returns:
+        Tuple (bobot pose (N,), bobot tangan (N,))
+    """
+    pose_weight = config.POSE_WEIGHT if pose_weight is None else pose_weight
+    hand_weight = config.HAND_WEIGHT if hand_weight is None else hand_weight
+    pose_w = np.where(has_pose, pose_weight, 0.0)
+    hand_w = np.where(has_hands, hand_weight, 0.0)
+    
+    # Referensi yang bobotnya nol semua: pakai landmark yang ada (pose dulu)
+    empty = (pose_w + hand_w) == 0
+    pose_w[empty & has_pose] = 1.0
+    hand_w[empty & ~has_pose & has_hands] = 1.0
+    
+    total = np.maximum(pose_w + hand_w, 1e-12)
+    return pose_w / total, hand_w / total
+
+
+def required_landmarks(reference_poses: dict, pose_weight: Optional[float] = None,
+                       hand_weight: Optional[float] = None) -> set:
+    """
+    Landmark yang benar-benar dipakai matching untuk library referensi ini
+    
+    Args:
+        reference_poses: Dictionary {nama_pose: landmarks}
+        pose_weight: Bobot pose (default: config.POSE_WEIGHT)
+        hand_weight: Bobot tangan (default: config.HAND_WEIGHT)
+        
+    Returns:
+        Set berisi 'pose' dan/atau 'hands'
+    """
+    has_pose = []
+    has_hands = []
+    for landmarks in reference_poses.values():
+        pose = PoseMatcher._get_pose(landmarks)
+        has_pose.append(pose is not None and len(pose) == POSE_LANDMARK_COUNT)
+        has_hands.append(len(hand_vectors(landmarks)) > 0)
+    
+    pose_w, hand_w = reference_weights(np.array(has_pose, dtype=bool), np.array(has_hands, dtype=bool),
+                                       pose_weight, hand_weight)
+    required = set()
+    if (pose_w > 0).any():
+        required.add('pose')
+    if (hand_w > 0).any():
+        required.add('hands')
+    return required
 
 
 class PoseMatcher:
     """Class untuk mencocokkan pose dengan gambar referensi"""
     
-    def __init__(self, reference_poses: dict):
+    def __init__(self, reference_poses: dict, mode: Optional[str] = None, store=None,
+                 pose_weight: Optional[float] = None, hand_weight: Optional[float] = None):
         """
         Inisialisasi PoseMatcher
         
         Args:
             reference_poses: Dictionary dengan format {nama_pose: landmarks}
+            mode: 'cosine' atau 'procrustes' (default: config.MATCHING_MODE)
+            store: ReferenceStore (opsional). Jika diisi, matching memakai store
+                   (cosine, quantized + rescore float32) menggantikan reference_poses
+            pose_weight: Bobot similarity pose (default: config.POSE_WEIGHT)
+            hand_weight: Bobot similarity bentuk tangan (default: config.HAND_WEIGHT)
         """
         self.reference_poses = reference_poses
+        self.mode = mode or config.MATCHING_MODE
+        self.pose_weight = config.POSE_WEIGHT if pose_weight is None else pose_weight
+        self.hand_weight = config.HAND_WEIGHT if hand_weight is None else hand_weight
+        self.max_rotation = np.radians(config.PROCRUSTES_MAX_ANGLE)
+        self.store = store
+        # Kernel Numba (kernels.py) untuk normalisasi + scoring, False = path NumPy
+        self.use_kernels = kernels.ENABLED
+        if self.use_kernels:
+            kernels.warmup()
+        self._build_reference_matrix()
+        if store is not None:
+            self.names = StoreNames(store)  # Nama di-decode per akses, bukan N string saat load
+            self.uses_hands = False  # Store hanya berisi vector pose
+        
+        # Temporal-coherence cache: skor frame terakhir yang benar-benar dihitung
+        self.cache_tolerance = config.MATCH_CACHE_TOLERANCE
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.last_error_bound = 0.0  # Batas error similarity hasil terakhir
+        self.reset_cache()
+    
+    def reset_cache(self):
+        """Buang skor cache (frame berikutnya selalu dihitung ulang)"""
+        self._cache_state = None
+        self._cache_scores = None
+        self._cache_best = None
+    
+    def _build_reference_matrix(self):
+        """
+        Normalisasi semua pose referensi sekali ke satu matrix (N, 33, 2)
+        supaya scoring terhadap semua referensi bisa dilakukan sekaligus
+        """
+        self.names = list(self.reference_poses.keys())
+        count = len(self.names)
+        
+        self._ref_coords = np.zeros((count, POSE_LANDMARK_COUNT, 2))
+        self._ref_valid = np.zeros(count, dtype=bool)
+        
+        for i, pose_name in enumerate(self.names):
+            pose = self._get_pose(self.reference_poses[pose_name])
+            if pose is None or len(pose) != POSE_LANDMARK_COUNT:
+                continue
+            coords = np.array([(lm[0], lm[1]) for lm in pose], dtype=np.float64)
+            self._ref_coords[i] = self._normalize_pose(coords)
+            self._ref_valid[i] = True
+        
+        self._ref_vectors = self._ref_coords.reshape(count, POSE_LANDMARK_COUNT * 2)
+        self._ref_norms = np.linalg.norm(self._ref_vectors, axis=1)
+        self._ref_valid &= self._ref_norms > 0
+        
+        # Bentuk tangan referensi (N, 2, 42), slot kosong bernilai nol
+        self._ref_hands = np.zeros((count, MAX_HANDS, HAND_VECTOR_DIM))
+        self._ref_hand_mask = np.zeros((count, MAX_HANDS), dtype=bool)
+        for i, pose_name in enumerate(self.names):
+            for slot, vec in enumerate(hand_vectors(self.reference_poses[pose_name])):
+                self._ref_hands[i, slot] = vec
+                self._ref_hand_mask[i, slot] = True
+        
+        self._ref_hand_count = self._ref_hand_mask.sum(axis=1)
+        
+        # Bobot pose/tangan per referensi (referensi tanpa pose: tangan saja)
+        self._pose_w, self._hand_w = reference_weights(
+            self._ref_valid, self._ref_hand_count > 0, self.pose_weight, self.hand_weight)
+        self.uses_hands = bool((self._hand_w > 0).any())
+    
+    def required_landmarks(self) -> set:
+        """Landmark yang dibutuhkan matcher ini ('pose' dan/atau 'hands')"""
+        if self.store is not None:
+            return {'pose'}
+        required = set()
+        if (self._pose_w > 0).any():
+            required.add('pose')
+        if self.uses_hands:
+            required.add('hands')
+        return required
+    
+    @staticmethod
+    def _get_pose(landmarks):
+        """Ambil pose landmarks dari dict (pose + hands) atau list (pose saja)"""
+        if landmarks is None:
+            return None
+        return landmarks.get('pose_landmarks') if isinstance(landmarks, dict) else landmarks
         
     def calculate_similarity(self, landmarks1, landmarks2) -> float:
         """
@@ -50,6 +250,9 @@ class PoseMatcher:
         coords1 = np.array([(lm[0], lm[1]) for lm in pose1])
         coords2 = np.array([(lm[0], lm[1]) for lm in pose2])
         
+        if self.use_kernels:
+            return float(kernels.pair_similarity(coords1.astype(np.float64), coords2.astype(np.float64)))
+        
         # Normalisasi koordinat (center dan scale)
         coords1_norm = self._normalize_pose(coords1)
         coords2_norm = self._normalize_pose(coords2)
@@ -95,6 +298,263 @@ class PoseMatcher:
             
         return normalized
     
+    def _live_coords(self, current_landmarks) -> Optional[np.ndarray]:
+        """
+        Koordinat (x, y) pose live sebagai array (33, 2), belum dinormalisasi
+        
+        Returns:
+            Array koordinat, atau None jika pose tidak valid
+        """
+        pose = self._get_pose(current_landmarks)
+        if pose is None or len(pose) != POSE_LANDMARK_COUNT:
+            return None
+        return np.array([(lm[0], lm[1]) for lm in pose], dtype=np.float64)
+    
+    def _live_unit(self, current_landmarks) -> Optional[np.ndarray]:
+        """
+        Pose live ter-normalisasi sebagai vector unit-length (66,)
+        
+        Returns:
+            Vector unit, atau None jika pose tidak valid
+        """
+        coords = self._live_coords(current_landmarks)
+        if coords is None:
+            return None
+        if self.use_kernels:
+            unit, valid = kernels.unit_vector(coords)
+            return unit if valid else None
+        vec = self._normalize_pose(coords).reshape(-1)
+        norm = np.linalg.norm(vec)
+        if norm == 0:
+            return None
+        return vec / norm
+    
+    def _live_state(self, current_landmarks) -> Tuple[Optional[np.ndarray], np.ndarray]:
+        """
+        Semua vector unit live yang dipakai scoring
+        
+        Returns:
+            Tuple berisi:
+            - Vector unit pose (66,) atau None
+            - Array (jumlah_tangan, 42) vector unit tangan, urut posisi wrist
+              (kosong jika library tidak memakai tangan)
+        """
+        unit = self._live_unit(current_landmarks)
+        if self.uses_hands:
+            vectors = hand_vectors(current_landmarks)
+            if vectors:
+                return unit, np.stack(vectors)
+        return unit, np.zeros((0, HAND_VECTOR_DIM))
+    
+    def _cache_hit(self, unit: Optional[np.ndarray], hands: np.ndarray) -> bool:
+        """
+        Cek apakah skor cache masih bisa dipakai untuk pose live ini
+        
+        Semua skor adalah (1 + r . u) / 2 dengan r dan u unit-length (mode
+        procrustes: maksimum atas rotasi R(theta) u, juga unit-length). Jika
+        u bergeser menjadi u', |r . u' - r . u| <= ||u' - u|| (Cauchy-Schwarz),
+        jadi setiap similarity berubah paling banyak delta / 2 dengan
+        delta = ||u' - u||. Skor tangan (rata-rata pasangan tangan terbaik)
+        berubah paling banyak delta tangan terbesar / 2, dan skor gabungan
+        adalah kombinasi konveks keduanya, jadi batasnya delta terbesar / 2.
+        Cache dipakai selama batas ini <= cache_tolerance. Delta selalu diukur
+        terhadap frame terakhir yang dihitung ulang, jadi error tidak terakumulasi.
+        
+        Args:
+            unit: Vector unit pose live (66,) atau None
+            hands: Array vector unit tangan live (jumlah_tangan, 42)
+            
+        Returns:
+            True jika cache dipakai (last_error_bound berisi batas error-nya)
+        """
+        if self._cache_state is None or self.cache_tolerance <= 0:
+            return False
+        cached_unit, cached_hands = self._cache_state
+        if (unit is None) != (cached_unit is None) or len(hands) != len(cached_hands):
+            return False
+        
+        bound = 0.0
+        if unit is not None:
+            bound = float(np.linalg.norm(unit - cached_unit)) / 2
+        if len(hands):
+            bound = max(bound, float(np.linalg.norm(hands - cached_hands, axis=1).max()) / 2)
+        if bound > self.cache_tolerance:
+            return False
+        self.last_error_bound = bound
+        self.cache_hits += 1
+        return True
+    
+    def _cache_store(self, state: Tuple, scores: Optional[np.ndarray], best: Tuple[int, float]):
+        """Simpan hasil scoring frame ini sebagai acuan cache"""
+        self._cache_state = state
+        self._cache_scores = scores
+        self._cache_best = best
+        self.last_error_bound = 0.0
+        self.cache_misses += 1
+    
+    def _cosine_scores(self, live: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarity batch pose live (unit-length) terhadap semua referensi
+        
+        Args:
+            live: Vector unit pose live (B, 66)
+            
+        Returns:
+            Array cosine (B, N) dalam range -1..1
+        """
+        return (live @ self._ref_vectors.T) / (self._ref_norms + 1e-12)
+    
+    def _procrustes_scores(self, live: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarity setelah pose live di-align (rotasi + skala) ke
+        masing-masing referensi, untuk semua referensi sekaligus
+        
+        Untuk 2D, solusi Procrustes (SVD dari X^T Y tanpa refleksi) punya
+        bentuk tertutup: korelasi setelah rotasi theta adalah
+        a*cos(theta) + b*sin(theta), dengan a = sum(x . y) dan b = sum(x cross y).
+        Rotasi optimal theta* = atan2(b, a), dibatasi PROCRUSTES_MAX_ANGLE supaya
+        pose terbalik tidak ikut cocok. Semua dihitung dengan einsum batch.
+        
+        Args:
+            live: Vector unit pose live (B, 66)
+            
+        Returns:
+            Array cosine (B, N) dalam range -1..1
+        """
+        live = live.reshape(len(live), POSE_LANDMARK_COUNT, 2)
+        ref = self._ref_coords
+        a = np.einsum('kpi,bpi->bk', ref, live)
+        b = (np.einsum('kp,bp->bk', ref[:, :, 1], live[:, :, 0]) -
+             np.einsum('kp,bp->bk', ref[:, :, 0], live[:, :, 1]))
+        
+        theta = np.clip(np.arctan2(b, a), -self.max_rotation, self.max_rotation)
+        aligned = a * np.cos(theta) + b * np.sin(theta)
+        return aligned / (self._ref_norms + 1e-12)
+    
+    def score_all(self, current_landmarks) -> np.ndarray:
+        """
+        Hitung similarity pose live dengan semua referensi dalam satu batch
+        
+        Args:
+            current_landmarks: Dict atau List landmarks dari pose saat ini
+            
+        Returns:
+            Array similarity (N,) sesuai urutan self.names (0-1, 0 untuk referensi tidak valid)
+        """
+        if len(self.names) == 0:
+            return np.zeros(0)
+        unit, hands = self._live_state(current_landmarks)
+        if unit is None and len(hands) == 0:
+            return np.zeros(len(self.names))
+        
+        if self.store is not None:
+            if unit is None:
+                return np.zeros(len(self.names))
+            return (self.store.coarse_scores(unit).astype(np.float64) + 1) / 2
+        
+        if self._cache_hit(unit, hands) and self._cache_scores is not None:
+            return self._cache_scores.copy()
+        
+        scores = self._compute_scores(unit, hands)
+        best_idx = int(np.argmax(scores))
+        self._cache_store((unit, hands), scores, (best_idx, float(scores[best_idx])))
+        return scores.copy()
+    
+    def _compute_scores(self, unit: Optional[np.ndarray], hands: np.ndarray) -> np.ndarray:
+        """
+        Similarity (0-1) pose dan tangan live terhadap semua referensi matrix
+        
+        Args:
+            unit: Vector unit pose live (66,) atau None
+            hands: Array vector unit tangan live (jumlah_tangan, 42)
+            
+        Returns:
+            Array similarity (N,), 0 untuk referensi tidak valid
+        """
+        # Kasus paling umum (cosine, pose saja): satu kernel fused tanpa array sementara
+        if self.use_kernels and self.mode == 'cosine' and not self.uses_hands and unit is not None:
+            return kernels.cosine_similarities(unit, self._ref_vectors, self._ref_norms, self._ref_valid)
+        units = np.zeros((1, POSE_LANDMARK_COUNT * 2))
+        if unit is not None:
+            units[0] = unit
+        live_hands = np.zeros((1, MAX_HANDS, HAND_VECTOR_DIM))
+        live_hands[0, :len(hands)] = hands
+        return self._score_batch(units, np.array([unit is not None]),
+                                 live_hands, np.array([len(hands)]))[0]
+    
+    def _score_batch(self, units: np.ndarray, pose_mask: np.ndarray,
+                     hands: np.ndarray, hand_counts: np.ndarray) -> np.ndarray:
+        """
+        Similarity (0-1) sekumpulan pose/tangan live terhadap semua referensi matrix
+        
+        Args:
+            units: Vector unit pose (B, 66), baris tanpa pose boleh berisi nol
+            pose_mask: Array bool (B,) baris yang punya pose
+            hands: Vector unit tangan (B, 2, 42), tangan di slot awal
+            hand_counts: Jumlah tangan per baris (B,)
+            
+        Returns:
+            Array similarity (B, N)
+        """
+        if self.mode == 'procrustes':
+            cosine = self._procrustes_scores(units)
+        else:
+            cosine = self._cosine_scores(units)
+        
+        # Convert ke range 0-1
+        scores = (cosine + 1) / 2
+        scores *= self._ref_valid
+        scores *= pose_mask[:, None]
+        
+        if not self.uses_hands:
+            return scores
+        
+        # Gabungkan dengan skor tangan: score = w_pose * pose + w_hand * tangan
+        return self._pose_w * scores + self._hand_w * self._hand_scores(hands, hand_counts)
+    
+    def _hand_scores(self, hands: np.ndarray, hand_counts: np.ndarray) -> np.ndarray:
+        """
+        Similarity bentuk tangan live terhadap tangan semua referensi sekaligus
+        
+        Similarity per pasangan tangan (live x referensi) dihitung dalam satu
+        einsum (B, N, 2, 2). Untuk dua tangan, kedua assignment kiri/kanan
+        (lurus dan ditukar) dievaluasi dan diambil yang terbaik, jadi urutan
+        tangan dari MediaPipe atau tangan yang bersilangan tidak berpengaruh.
+        Jumlahnya dibagi jumlah tangan referensi: tangan referensi yang tidak
+        ada di frame menurunkan skor, tangan live tambahan (misalnya tangan
+        yang sedang diam) diabaikan.
+        
+        Args:
+            hands: Vector unit tangan live (B, 2, 42)
+            hand_counts: Jumlah tangan per baris (B,)
+            
+        Returns:
+            Array similarity tangan (B, N) dalam range 0-1
+        """
+        pair = (np.einsum('nsd,bld->bnsl', self._ref_hands, hands) + 1) / 2
+        pair *= self._ref_hand_mask[None, :, :, None]
+        pair *= (np.arange(MAX_HANDS) < hand_counts[:, None])[:, None, None, :]
+        
+        straight = pair[:, :, 0, 0] + pair[:, :, 1, 1]
+        crossed = pair[:, :, 0, 1] + pair[:, :, 1, 0]
+        return np.maximum(straight, crossed) / np.maximum(self._ref_hand_count, 1)
+    
+    def reference_similarity(self, start: int, end: int) -> np.ndarray:
+        """
+        Similarity referensi [start, end) terhadap semua referensi, seolah-olah
+        referensi tersebut adalah pose live (satu blok baris matrix N x N)
+        
+        Args:
+            start: Index baris awal
+            end: Index baris akhir (eksklusif)
+            
+        Returns:
+            Array similarity (end - start, N)
+        """
+        units = self._ref_vectors[start:end] / np.maximum(self._ref_norms[start:end, None], 1e-12)
+        return self._score_batch(units, self._ref_valid[start:end],
+                                 self._ref_hands[start:end], self._ref_hand_count[start:end])
+    
     def find_best_match(self, current_landmarks) -> Tuple[Optional[str], float]:
         """
         Temukan pose referensi yang paling cocok dengan pose saat ini
@@ -107,28 +567,183 @@ class PoseMatcher:
             - Nama pose yang paling cocok (atau None)
             - Similarity score
         """
-        if current_landmarks is None:
+        if current_landmarks is None or len(self.names) == 0:
             return None, 0.0
         
-        best_match = None
-        best_score = 0.0
+        unit, hands = self._live_state(current_landmarks)
+        if unit is None and (len(hands) == 0 or self.store is not None):
+            return None, 0.0
         
-        for pose_name, ref_landmarks in self.reference_poses.items():
-            if ref_landmarks is None:
-                continue
-                
-            score = self.calculate_similarity(current_landmarks, ref_landmarks)
-            
-            if score > best_score:
-                best_score = score
-                best_match = pose_name
+        # Pose hampir tidak bergerak (hold): pakai hasil terakhir, error <= last_error_bound
+        if self._cache_hit(unit, hands):
+            best_idx, best_score = self._cache_best
+        elif self.store is not None:
+            best_idx, best_score = self._store_best_match(unit)
+            self._cache_store((unit, hands), None, (best_idx, best_score))
+        else:
+            scores = self._compute_scores(unit, hands)
+            best_idx = int(np.argmax(scores))
+            best_score = float(scores[best_idx])
+            self._cache_store((unit, hands), scores, (best_idx, best_score))
         
         # Hanya return match jika score lebih dari threshold
-        if best_score >= config.SIMILARITY_THRESHOLD:
-            return best_match, best_score
+        if best_score > 0 and best_score >= config.SIMILARITY_THRESHOLD:
+            return self.names[best_idx], best_score
         else:
             return None, best_score
     
+    def _store_best_match(self, unit: np.ndarray) -> Tuple[int, float]:
+        """
+        Best match dari ReferenceStore: coarse pass quantized lalu rescore float32
+        
+        Args:
+            unit: Vector unit pose live (66,)
+            
+        Returns:
+            Tuple (index referensi, similarity 0-1)
+        """
+        indices, cosine = self.store.top_k(unit, k=1)
+        if len(indices) == 0:
+            return 0, 0.0
+        return int(indices[0]), float((cosine[0] + 1) / 2)
+    
+    def _batch_units(self, poses: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Normalisasi banyak pose live sekaligus (sama dengan _live_unit per baris)
+        
+        Args:
+            poses: Array (B, 33, 2|3) atau (B, 66), baris NaN = tidak ada pose
+            
+        Returns:
+            Tuple berisi:
+            - Vector unit pose (B, 66), nol untuk baris tidak valid
+            - Array bool (B,) baris dengan pose valid
+        """
+        poses = np.asarray(poses, dtype=np.float64)
+        count = len(poses)
+        # Ukuran dari dimensi trailing, reshape(-1) gagal jika B = 0
+        width = int(np.prod(poses.shape[1:])) // POSE_LANDMARK_COUNT
+        coords = poses.reshape(count, POSE_LANDMARK_COUNT, width)[:, :, :2]
+        vectors = (coords - coords.mean(axis=1, keepdims=True)).reshape(count, coords.shape[1] * coords.shape[2])
+        norms = np.linalg.norm(vectors, axis=1)
+        valid = np.isfinite(norms) & (norms > 0)
+        units = np.zeros_like(vectors)
+        units[valid] = vectors[valid] / norms[valid, None]
+        return units, valid
+    
+    def _batch_hands(self, hands: Optional[np.ndarray], count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vector unit tangan untuk banyak frame sekaligus (sama dengan hand_vectors per baris)
+        
+        Args:
+            hands: Array (B, 2, 21, 3), NaN untuk tangan yang tidak ada (atau None)
+            count: Jumlah baris B
+            
+        Returns:
+            Tuple berisi:
+            - Vector unit tangan (B, 2, 42), tangan valid di slot awal urut posisi wrist
+            - Jumlah tangan valid per baris (B,)
+        """
+        units = np.zeros((count, MAX_HANDS, HAND_VECTOR_DIM))
+        if hands is None or not self.uses_hands or count == 0:
+            return units, np.zeros(count, dtype=np.int64)
+        
+        coords = np.asarray(hands, dtype=np.float64)[:, :MAX_HANDS, :, :2]
+        vectors = (coords - coords.mean(axis=2, keepdims=True)).reshape(count, coords.shape[1], -1)
+        norms = np.linalg.norm(vectors, axis=2)
+        valid = np.isfinite(norms) & (norms > 0)
+        
+        # Urut posisi wrist (x kecil dulu), tangan tidak valid di belakang
+        order = np.argsort(np.where(valid, coords[:, :, 0, 0], np.inf), axis=1, kind='stable')
+        rows = np.arange(count)[:, None]
+        vectors = vectors[rows, order]
+        norms = norms[rows, order]
+        valid = valid[rows, order]
+        units[:, :vectors.shape[1]] = np.where(valid[:, :, None],
+                                                vectors / np.where(valid, norms, 1.0)[:, :, None], 0.0)
+        return units, valid.sum(axis=1)
+    
+    def match_batch(self, poses: np.ndarray, hands: Optional[np.ndarray] = None,
+                    top_k: int = 0, chunk_rows: Optional[int] = None) -> Dict:
+        """
+        Best match (dan opsional top-k) untuk banyak pose live sekaligus
+        
+        Hasil sama dengan find_best_match per baris (tanpa cache temporal),
+        tetapi semua baris dinormalisasi sekaligus dan di-score per chunk
+        sebagai satu perkalian matrix (chunk, 66) x (66, N) lewat _score_batch.
+        Ukuran chunk dibatasi config.MATCH_BATCH_ELEMENTS supaya matrix skor
+        sementara tetap kecil. Dengan ReferenceStore, setiap baris di-query
+        ke store satu per satu.
+        
+        Args:
+            poses: Array pose (B, 33, 2|3) atau (B, 66), baris NaN = tidak ada pose
+                   (format 'pose' dari load_session)
+            hands: Array tangan (B, 2, 21, 3), NaN = tidak ada (opsional, hanya
+                   dipakai jika library memakai tangan)
+            top_k: Jumlah kandidat teratas per baris (0 = tidak perlu)
+            chunk_rows: Baris per chunk (default: dari config.MATCH_BATCH_ELEMENTS)
+            
+        Returns:
+            Dictionary berisi:
+            - 'names': List nama pose per baris (None jika di bawah threshold)
+            - 'best': Index referensi terbaik (B,), -1 jika tidak ada landmark
+            - 'scores': Similarity referensi terbaik (B,)
+            - 'top_indices', 'top_scores': Array (B, k) urut dari paling mirip
+              (hanya jika top_k > 0; index -1 jika tidak ada landmark)
+        """
+        count = len(poses)
+        units, pose_mask = self._batch_units(poses)
+        live_hands, hand_counts = self._batch_hands(hands, count)
+        present = pose_mask | (hand_counts > 0) if self.store is None else pose_mask
+        k = min(top_k, len(self.names))
+        
+        best = np.full(count, -1, dtype=np.int64)
+        scores = np.zeros(count)
+        top_indices = np.full((count, k), -1, dtype=np.int64)
+        top_scores = np.zeros((count, k))
+        
+        if self.store is not None:
+            for i in np.flatnonzero(present):
+                indices, cosine = self.store.top_k(units[i], k=max(k, 1))
+                if len(indices):
+                    best[i], scores[i] = indices[0], (cosine[0] + 1) / 2
+                    top_indices[i, :len(indices[:k])] = indices[:k]
+                    top_scores[i, :len(indices[:k])] = (cosine[:k] + 1) / 2
+        elif len(self.names) > 0:
+            if chunk_rows is None:
+                per_row = len(self.names) * (4 if self.uses_hands else 1)
+                chunk_rows = max(1, config.MATCH_BATCH_ELEMENTS // per_row)
+            for start in range(0, count, chunk_rows):
+                end = min(start + chunk_rows, count)
+                block = self._score_batch(units[start:end], pose_mask[start:end],
+                                          live_hands[start:end], hand_counts[start:end])
+                rows = np.arange(end - start)
+                best[start:end] = block.argmax(axis=1)
+                scores[start:end] = block[rows, best[start:end]]
+                if k > 0:
+                    top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+                    top_block = block[rows[:, None], top]
+                    order = np.argsort(-top_block, axis=1, kind='stable')
+                    top_indices[start:end] = top[rows[:, None], order]
+                    top_scores[start:end] = top_block[rows[:, None], order]
+        
+        # Baris tanpa landmark: sama dengan find_best_match (None, 0.0)
+        best[~present] = -1
+        scores[~present] = 0.0
+        top_indices[~present] = -1
+        top_scores[~present] = 0.0
+        
+        matched = present & (scores > 0) & (scores >= config.SIMILARITY_THRESHOLD)
+        result = {
+            'names': [self.names[i] if ok else None for i, ok in zip(best.tolist(), matched.tolist())],
+            'best': best,
+            'scores': scores
+        }
+        if top_k > 0:
+            result['top_indices'] = top_indices
+            result['top_scores'] = top_scores
+        return result
+    
     def get_all_similarities(self, current_landmarks) -> dict:
         """
         Hitung similarity dengan semua pose referensi
@@ -142,12 +757,5 @@ class PoseMatcher:
         if current_landmarks is None:
             return {}
         
-        similarities = {}
-        for pose_name, ref_landmarks in self.reference_poses.items():
-            if ref_landmarks is None:
-                similarities[pose_name] = 0.0
-            else:
-                score = self.calculate_similarity(current_landmarks, ref_landmarks)
-                similarities[pose_name] = score
-        
-        return similarities
+        scores = self.score_all(current_landmarks)
+        return {pose_name: float(score) for pose_name, score in zip(self.names, scores)}
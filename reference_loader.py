@@ -0,0 +1,278 @@
+"""
+Reference Loader Module
+Memuat gambar referensi dan landmark-nya untuk semua entry point.
+Setiap file dibaca dan di-decode sekali; buffer yang sama dipakai untuk
+deteksi dan gambar display. Gambar besar di-decode langsung di resolusi
+1/2, 1/4 atau 1/8 (IMREAD_REDUCED_*) selama masih >= ukuran display.
+"""
+
+import argparse
+import struct
+import time
+import cv2
+import numpy as np
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import config
+
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.bmp']
+
+REDUCED_DECODE_FLAGS = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                        (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+# Marker JPEG Start Of Frame (berisi ukuran gambar), kecuali DHT/JPG/DAC
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def find_reference_files(ref_path: Path) -> list:
+    """
+    Cari semua file gambar referensi di folder (urut nama file)
+
+    Args:
+        ref_path: Folder gambar referensi
+
+    Returns:
+        List Path file gambar
+    """
+    return sorted(p for p in ref_path.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+
+
+def image_size(data: np.ndarray) -> Optional[Tuple[int, int]]:
+    """
+    Baca ukuran gambar dari header file (tanpa decode pixel)
+
+    Args:
+        data: Isi file (uint8)
+
+    Returns:
+        (width, height) untuk JPEG, PNG dan BMP, atau None jika format tidak dikenal
+    """
+    header = data[:32].tobytes()
+    if header.startswith(b'\x89PNG\r\n\x1a\n') and len(header) >= 24:
+        return struct.unpack('>II', header[16:24])
+    if header.startswith(b'BM') and len(header) >= 26:
+        width, height = struct.unpack('<ii', header[18:26])
+        return width, abs(height)
+    if not header.startswith(b'\xff\xd8'):
+        return None
+
+    # JPEG: lompati segment sampai marker SOF
+    i = 2
+    size = len(data)
+    while i + 9 < size:
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = int(data[i + 1])
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack('>HH', data[i + 5:i + 9].tobytes())
+            return width, height
+        if marker == 0xFF or marker == 0x01 or 0xD0 <= marker <= 0xD9:
+            i += 1 if marker == 0xFF else 2  # Padding / marker tanpa panjang
+            continue
+        i += 2 + int(data[i + 2]) * 256 + int(data[i + 3])
+    return None
+
+
+def reduction_factor(size: Optional[Tuple[int, int]], target: Tuple[int, int]) -> int:
+    """
+    Faktor decode terbesar (1, 2, 4, 8) yang hasilnya masih >= target
+
+    Sisi pendek dibandingkan dengan sisi pendek target (dan sisi panjang
+    dengan sisi panjang), jadi gambar portrait dan rotasi EXIF tetap aman.
+
+    Args:
+        size: (width, height) dari header, atau None
+        target: (width, height) minimum setelah decode
+
+    Returns:
+        Faktor reduksi (1 = resolusi penuh)
+    """
+    if size is None:
+        return 1
+    short_side, long_side = sorted(size)
+    target_short, target_long = sorted(target)
+    for factor, _ in REDUCED_DECODE_FLAGS:
+        if short_side // factor >= target_short and long_side // factor >= target_long:
+            return factor
+    return 1
+
+
+def read_image(path, target: Optional[Tuple[int, int]] = None) -> Tuple[Optional[np.ndarray], Dict]:
+    """
+    Baca file sekali lalu decode, di resolusi tereduksi jika cukup
+
+    Args:
+        path: Path file gambar
+        target: (width, height) minimum hasil decode
+            (default: CAMERA_WIDTH x CAMERA_HEIGHT, None jika REFERENCE_REDUCED_DECODE = False)
+
+    Returns:
+        Tuple berisi:
+        - Gambar BGR (atau None jika gagal dibaca)
+        - Dict statistik: 'file_bytes', 'size' (dari header), 'factor',
+          'decoded_bytes', 'saved_bytes' (dibanding decode penuh) dan 'decode_time'
+    """
+    if target is None and config.REFERENCE_REDUCED_DECODE:
+        target = (config.CAMERA_WIDTH, config.CAMERA_HEIGHT)
+
+    start = time.perf_counter()
+    data = np.fromfile(str(path), dtype=np.uint8)
+    size = image_size(data)
+    factor = reduction_factor(size, target) if target is not None else 1
+    flag = dict(REDUCED_DECODE_FLAGS).get(factor, cv2.IMREAD_COLOR)
+    image = cv2.imdecode(data, flag) if len(data) else None
+    elapsed = time.perf_counter() - start
+
+    decoded_bytes = image.nbytes if image is not None else 0
+    full_bytes = size[0] * size[1] * 3 if size is not None else decoded_bytes
+    return image, {
+        'file_bytes': len(data),
+        'size': size,
+        'factor': factor,
+        'decoded_bytes': decoded_bytes,
+        'saved_bytes': max(0, full_bytes - decoded_bytes) if image is not None else 0,
+        'decode_time': elapsed
+    }
+
+
+def load_reference_images(detector, path: Optional[str] = None,
+                          failures: Optional[Dict] = None) -> Tuple[Dict, Dict]:
+    """
+    Load semua gambar referensi dan deteksi pose/hand di masing-masing gambar
+
+    Args:
+        detector: GestureDetector untuk deteksi landmark
+        path: Folder gambar referensi (default: config.REFERENCE_IMAGES_PATH)
+        failures: Dictionary (opsional) yang diisi {nama_file: alasan} untuk
+                  gambar yang gagal dibaca ('unreadable') atau tidak terdeteksi ('no_detection')
+
+    Returns:
+        Tuple berisi:
+        - Dictionary {nama_pose: landmarks} untuk gambar yang berhasil dideteksi
+        - Dictionary {nama_pose: gambar asli} untuk display
+    """
+    ref_path = Path(path or config.REFERENCE_IMAGES_PATH)
+    reference_poses = {}
+    reference_images = {}
+
+    if not ref_path.exists():
+        print(f"Folder {ref_path} tidak ditemukan!")
+        print("Membuat folder...")
+        ref_path.mkdir(parents=True, exist_ok=True)
+        print(f"Silakan tambahkan gambar referensi ke folder {ref_path}")
+        return reference_poses, reference_images
+
+    image_files = find_reference_files(ref_path)
+    if len(image_files) == 0:
+        print(f"Tidak ada gambar referensi di folder {ref_path}!")
+        print("Silakan tambahkan gambar referensi dengan format: .jpg, .jpeg, .png, atau .bmp")
+        return reference_poses, reference_images
+
+    print(f"\nMemuat {len(image_files)} gambar referensi...")
+    saved_bytes = 0
+    decode_time = 0.0
+
+    for img_path in image_files:
+        pose_name = img_path.stem  # Nama file tanpa ekstensi
+        print(f"  Processing: {img_path.name}...")
+
+        # Decode sekali, buffer yang sama untuk deteksi dan display
+        original_img, stats = read_image(img_path)
+        if original_img is None:
+            print(f"    ✗ Gagal membaca: {img_path.name}")
+            if failures is not None:
+                failures[img_path.name] = 'unreadable'
+            continue
+        saved_bytes += stats['saved_bytes']
+        decode_time += stats['decode_time']
+        if stats['factor'] > 1:
+            height, width = original_img.shape[:2]
+            print(f"    Decode 1/{stats['factor']} ({width}x{height}), "
+                  f"hemat {stats['saved_bytes'] / 1e6:.1f} MB, {stats['decode_time'] * 1000:.1f} ms")
+
+        _, landmarks = detector.process_image(str(img_path), image=original_img)
+
+        if landmarks is not None:
+            reference_poses[pose_name] = landmarks
+            reference_images[pose_name] = original_img
+            print(f"    ✓ Pose '{pose_name}' berhasil dimuat")
+        else:
+            print(f"    ✗ Gagal mendeteksi pose di '{pose_name}'")
+            if failures is not None:
+                failures[img_path.name] = 'no_detection'
+
+    if len(reference_poses) == 0:
+        print("\nTidak ada pose yang berhasil dimuat!")
+        print("Pastikan gambar referensi menunjukkan pose tubuh yang jelas.")
+        return reference_poses, reference_images
+
+    print(f"\n✓ Total {len(reference_poses)} pose referensi berhasil dimuat "
+          f"(decode {decode_time:.2f}s, hemat {saved_bytes / 1e6:.1f} MB)")
+    print(f"Pose: {', '.join(reference_poses.keys())}\n")
+    return reference_poses, reference_images
+
+
+def compare_ingestion(path, repeat: int = 3) -> Dict:
+    """
+    Bandingkan path lama (cv2.imread dua kali, resolusi penuh) dengan read_image
+
+    Args:
+        path: Path file gambar
+        repeat: Jumlah pengulangan (diambil waktu tercepat)
+
+    Returns:
+        Dict 'old_time', 'new_time', 'old_bytes', 'new_bytes', 'factor'
+    """
+    old_time = new_time = float('inf')
+    old_bytes = 0
+    image, stats = None, {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        display = cv2.imread(str(path))
+        detect = cv2.imread(str(path))
+        old_time = min(old_time, time.perf_counter() - start)
+        if display is not None:
+            old_bytes = display.nbytes + detect.nbytes
+
+        start = time.perf_counter()
+        image, stats = read_image(path)
+        new_time = min(new_time, time.perf_counter() - start)
+    return {
+        'old_time': old_time,
+        'new_time': new_time,
+        'old_bytes': old_bytes,
+        'new_bytes': image.nbytes if image is not None else 0,
+        'factor': stats.get('factor', 1)
+    }
+
+
+def main():
+    """Bandingkan waktu dan memory decode gambar referensi (lama vs sekali decode)"""
+    parser = argparse.ArgumentParser(description="Bandingkan ingestion gambar referensi")
+    parser.add_argument('--images', default=config.REFERENCE_IMAGES_PATH,
+                        help="Folder gambar referensi")
+    parser.add_argument('--repeat', type=int, default=3, help="Pengulangan per gambar")
+    args = parser.parse_args()
+
+    ref_path = Path(args.images)
+    if not ref_path.exists():
+        print(f"Folder {ref_path} tidak ditemukan!")
+        return
+
+    total_old = total_new = 0.0
+    total_saved = 0
+    for img_path in find_reference_files(ref_path):
+        result = compare_ingestion(img_path, args.repeat)
+        saved = result['old_bytes'] - result['new_bytes']
+        total_old += result['old_time']
+        total_new += result['new_time']
+        total_saved += saved
+        print(f"  {img_path.name:30s} 1/{result['factor']}  "
+              f"{result['old_time'] * 1000:7.1f} ms -> {result['new_time'] * 1000:6.1f} ms  "
+              f"hemat {saved / 1e6:6.1f} MB")
+    print(f"\n✓ Total {total_old:.2f}s -> {total_new:.2f}s, hemat {total_saved / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+Reference Store Module
+Penyimpanan referensi pose yang ringkas: vector ter-normalisasi dalam
+float16 atau int8 (quantized) di satu array contiguous yang bisa di-mmap,
+plus tabel nama dan offset
+"""
+
+import json
+import argparse
+import numpy as np
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import config
+
+POSE_LANDMARK_COUNT = 33
+VECTOR_DIM = POSE_LANDMARK_COUNT * 2
+
+
+def pose_vector(pose) -> Optional[np.ndarray]:
+    """
+    Ubah pose landmarks menjadi vector unit-length (66,) float32
+
+    Normalisasi sama dengan PoseMatcher (center dan scale), lalu dibagi
+    norm-nya sehingga cosine similarity = dot product.
+
+    Args:
+        pose: List atau array (33, 3) landmarks
+
+    Returns:
+        Vector (66,) atau None jika pose tidak valid
+    """
+    if pose is None or len(pose) != POSE_LANDMARK_COUNT:
+        return None
+    coords = np.array([(lm[0], lm[1]) for lm in pose], dtype=np.float32)
+    vec = (coords - coords.mean(axis=0)).reshape(-1)
+    norm = np.linalg.norm(vec)
+    if norm == 0 or not np.isfinite(norm):
+        return None
+    return vec / norm
+
+
+class ReferenceStore:
+    """
+    Library referensi pose dalam format packed
+
+    File di folder store:
+    - vectors.npy: (N, 66) float16 atau int8, vector unit-length (quantized)
+    - scales.npy: (N,) float32, skala dequantize per vector (int8 saja)
+    - norms.npy: (N,) float32, norm vector setelah dequantize
+    - names.bin + name_offsets.npy: nama pose UTF-8 berurutan + offset (N + 1,)
+    - meta.json: dtype dan dimensi
+
+    Semua array dibaca dengan np.load(mmap_mode='r'), jadi load instan dan
+    hanya halaman yang disentuh saat scoring yang masuk RAM.
+    """
+
+    def __init__(self, vectors: np.ndarray, scales: np.ndarray, norms: np.ndarray,
+                 names_blob: bytes, name_offsets: np.ndarray):
+        self.vectors = vectors
+        self.scales = scales
+        self.norms = norms
+        self.names_blob = names_blob
+        self.name_offsets = name_offsets
+        self.dtype = vectors.dtype
+
+    def __len__(self):
+        return len(self.vectors)
+
+    @classmethod
+    def from_vectors(cls, names: List[str], vectors: np.ndarray, dtype: str = 'int8') -> 'ReferenceStore':
+        """
+        Buat store dari vector float unit-length
+
+        Args:
+            names: Nama pose, urut sesuai vectors
+            vectors: Array (N, 66) vector unit-length
+            dtype: 'int8' atau 'float16'
+
+        Returns:
+            ReferenceStore
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if dtype == 'int8':
+            max_abs = np.abs(vectors).max(axis=1)
+            scales = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+            packed = np.round(vectors / scales[:, None]).astype(np.int8)
+            dequantized = packed.astype(np.float32) * scales[:, None]
+        elif dtype == 'float16':
+            scales = np.ones(len(vectors), dtype=np.float32)
+            packed = vectors.astype(np.float16)
+            dequantized = packed.astype(np.float32)
+        else:
+            raise ValueError(f"dtype tidak didukung: {dtype}")
+
+        norms = np.linalg.norm(dequantized, axis=1).astype(np.float32)
+
+        encoded = [name.encode('utf-8') for name in names]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(e) for e in encoded])
+        return cls(packed, scales, norms, b''.join(encoded), offsets)
+
+    @classmethod
+    def from_reference_poses(cls, reference_poses: Dict, dtype: str = 'int8') -> 'ReferenceStore':
+        """
+        Buat store dari dictionary {nama_pose: landmarks} (format PoseMatcher)
+
+        Referensi tanpa pose tubuh (hand-only) dilewati.
+        """
+        names = []
+        vectors = []
+        for pose_name, landmarks in reference_poses.items():
+            pose = landmarks.get('pose_landmarks') if isinstance(landmarks, dict) else landmarks
+            vec = pose_vector(pose)
+            if vec is not None:
+                names.append(pose_name)
+                vectors.append(vec)
+        vectors = np.stack(vectors) if vectors else np.zeros((0, VECTOR_DIM), dtype=np.float32)
+        return cls.from_vectors(names, vectors, dtype)
+
+    def save(self, path) -> Path:
+        """
+        Simpan store ke folder
+
+        Args:
+            path: Folder tujuan
+
+        Returns:
+            Path folder store
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        np.save(path / 'vectors.npy', np.ascontiguousarray(self.vectors))
+        np.save(path / 'scales.npy', self.scales)
+        np.save(path / 'norms.npy', self.norms)
+        np.save(path / 'name_offsets.npy', self.name_offsets)
+        (path / 'names.bin').write_bytes(self.names_blob)
+        (path / 'meta.json').write_text(json.dumps({
+            'dtype': str(self.dtype),
+            'dim': int(self.vectors.shape[1]) if self.vectors.ndim == 2 else VECTOR_DIM,
+            'count': len(self)
+        }))
+        return path
+
+    @classmethod
+    def load(cls, path, mmap: bool = True) -> 'ReferenceStore':
+        """
+        Load store dari folder (default memory-mapped)
+
+        Args:
+            path: Folder store
+            mmap: Pakai memory map (tanpa membaca semua data ke RAM)
+
+        Returns:
+            ReferenceStore
+        """
+        path = Path(path)
+        mode = 'r' if mmap else None
+        return cls(
+            np.load(path / 'vectors.npy', mmap_mode=mode),
+            np.load(path / 'scales.npy', mmap_mode=mode),
+            np.load(path / 'norms.npy', mmap_mode=mode),
+            (path / 'names.bin').read_bytes(),
+            np.load(path / 'name_offsets.npy')
+        )
+
+    def name(self, index: int) -> str:
+        """Nama pose pada index tertentu"""
+        start, end = self.name_offsets[index], self.name_offsets[index + 1]
+        return self.names_blob[start:end].decode('utf-8')
+
+    def names(self) -> List[str]:
+        """Semua nama pose (urut index), lihat StoreNames untuk akses tanpa materialisasi"""
+        return [self.name(i) for i in range(len(self))]
+
+    def nbytes(self) -> int:
+        """Ukuran data store (bytes)"""
+        return (self.vectors.nbytes + self.scales.nbytes + self.norms.nbytes +
+                len(self.names_blob) + self.name_offsets.nbytes)
+
+    def _quantize_query(self, query: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Quantize query ke dtype yang sama dengan store (dalam float32)"""
+        if self.dtype == np.int8:
+            max_abs = float(np.abs(query).max())
+            scale = max_abs / 127.0 if max_abs > 0 else 1.0
+            return np.round(query / scale).astype(np.float32), scale
+        return query.astype(np.float16).astype(np.float32), 1.0
+
+    def coarse_scores(self, query: np.ndarray, chunk_rows: Optional[int] = None) -> np.ndarray:
+        """
+        Cosine similarity kasar (vector dan query quantized) untuk semua referensi
+
+        Dihitung per chunk sehingga memory sementara terbatas. Untuk int8,
+        dot product integer dihitung dengan BLAS float32 (exact karena
+        127 * 127 * 66 < 2^24), lalu dikali skala per vector.
+
+        Args:
+            query: Vector (66,) unit-length
+            chunk_rows: Jumlah baris per chunk (default: config.STORE_CHUNK_ROWS)
+
+        Returns:
+            Array cosine (N,) float32
+        """
+        chunk_rows = chunk_rows or config.STORE_CHUNK_ROWS
+        q, q_scale = self._quantize_query(np.asarray(query, dtype=np.float32))
+        scores = np.empty(len(self), dtype=np.float32)
+
+        for start in range(0, len(self), chunk_rows):
+            end = min(start + chunk_rows, len(self))
+            block = self.vectors[start:end].astype(np.float32)
+            scores[start:end] = block @ q
+        scores *= self.scales * (q_scale / np.maximum(self.norms, 1e-12))
+        return scores
+
+    def rescore(self, query: np.ndarray, indices: np.ndarray) -> np.ndarray:
+        """
+        Hitung ulang cosine kandidat dengan query float32 penuh
+
+        Args:
+            query: Vector (66,) unit-length
+            indices: Index kandidat
+
+        Returns:
+            Array cosine (len(indices),) float32
+        """
+        query = np.asarray(query, dtype=np.float32)
+        block = self.vectors[indices].astype(np.float32) * self.scales[indices, None]
+        return (block @ query) / np.maximum(self.norms[indices], 1e-12)
+
+    def top_k(self, query: np.ndarray, k: int = 1,
+              candidates: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Cari k referensi paling mirip: coarse pass quantized + rescore float32
+
+        Args:
+            query: Vector (66,) unit-length
+            k: Jumlah hasil
+            candidates: Jumlah kandidat yang di-rescore (default: config.STORE_RESCORE_CANDIDATES)
+
+        Returns:
+            Tuple berisi:
+            - Index referensi (k,), urut dari yang paling mirip
+            - Cosine similarity (k,) hasil rescore float32
+        """
+        if len(self) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        candidates = max(k, candidates or config.STORE_RESCORE_CANDIDATES)
+        coarse = self.coarse_scores(query)
+        if candidates < len(coarse):
+            indices = np.argpartition(coarse, -candidates)[-candidates:]
+        else:
+            indices = np.arange(len(coarse))
+
+        indices = np.sort(indices)  # Akses mmap berurutan
+        exact = self.rescore(query, indices)
+        order = np.argsort(-exact)[:k]
+        return indices[order], exact[order]
+
+
+class StoreNames(Sequence):
+    """
+    Daftar nama pose ReferenceStore yang di-decode saat diakses
+
+    Pengganti store.names() untuk PoseMatcher: dengan jutaan referensi,
+    membuat list semua nama saat load jauh lebih mahal daripada decode satu
+    nama untuk match terbaik per frame.
+    """
+
+    def __init__(self, store: ReferenceStore):
+        self.store = store
+
+    def __len__(self):
+        return len(self.store)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.store.name(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self.store.name(index)
+
+
+def main():
+    """Build reference store dari folder gambar referensi"""
+    parser = argparse.ArgumentParser(description="Build packed reference store")
+    parser.add_argument('--images', default=config.REFERENCE_IMAGES_PATH,
+                        help="Folder gambar referensi")
+    parser.add_argument('--out', default='reference_store', help="Folder output store")
+    parser.add_argument('--dtype', default='int8', choices=['int8', 'float16'])
+    args = parser.parse_args()
+
+    from gesture_detector import GestureDetector
+    from reference_loader import load_reference_images
+
+    detector = GestureDetector()
+    try:
+        reference_poses, _ = load_reference_images(detector, args.images)
+    finally:
+        detector.close()
+
+    store = ReferenceStore.from_reference_poses(reference_poses, args.dtype)
+    path = store.save(args.out)
+    print(f"✓ Store {len(store)} pose ({args.dtype}, {store.nbytes() / 1024:.1f} KB) disimpan di {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Sharded Matcher Module
+Library referensi dibagi ke beberapa process matcher (shard). Setiap frame
+dikirim ke semua shard lewat satu shared memory ring, setiap shard membalas
+top-k miliknya, lalu hasilnya digabung dengan batas waktu per frame: shard
+yang terlambat dilewati dan hasil parsial tetap dikembalikan.
+"""
+
+import time
+import multiprocessing as mp
+import numpy as np
+from typing import List, Optional, Tuple
+from pose_matcher import PoseMatcher, required_landmarks
+from matcher_worker import REQUEST_ROWS, _request_views
+from landmark_session import landmarks_to_arrays, arrays_to_landmarks
+from shm_ring import SharedMemoryRing
+import config
+
+
+def _shard_worker_loop(request_name: str, response_name: str, slots: int,
+                       reference_poses: dict, indices: np.ndarray, top_k: int,
+                       wakeup, stop_flag):
+    """
+    Loop utama satu shard: score_all untuk bagian library-nya, balas top-k
+
+    Response berisi (top_k, 2): index global referensi (-1 jika kosong) dan
+    similarity, urut dari yang paling mirip. Sinyal memakai semaphore dan flag
+    tanpa lock (bukan mp.Event), supaya shard yang macet tidak pernah
+    memblokir process utama.
+    """
+    requests = SharedMemoryRing(request_name, (REQUEST_ROWS, 3), np.float32, slots)
+    responses = SharedMemoryRing(response_name, (top_k, 2), np.float64, slots)
+    matcher = PoseMatcher(reference_poses)
+    k = min(top_k, len(indices))
+
+    request = np.empty((REQUEST_ROWS, 3), dtype=np.float32)
+    pose, hands = _request_views(request)
+    last_seq = 0
+
+    try:
+        while not stop_flag.value:
+            if not wakeup.acquire(timeout=0.1):
+                continue
+            while wakeup.acquire(False):
+                pass  # Beberapa notify saat shard sibuk cukup dikerjakan sekali
+
+            # Selalu ambil request terbaru, request lama yang terlewat tidak dikerjakan
+            seq, stamp, data = requests.read_latest(out=request, min_seq=last_seq + 1)
+            if data is None:
+                continue
+            last_seq = seq
+
+            _, top = responses.begin_write(seq)
+            top[:, 0] = -1
+            top[:, 1] = 0.0
+            landmarks = arrays_to_landmarks(pose, hands)
+            if landmarks is not None and k > 0:
+                scores = matcher.score_all(landmarks)
+                best = np.argpartition(-scores, k - 1)[:k]
+                best = best[np.argsort(-scores[best])]
+                top[:k, 0] = indices[best]
+                top[:k, 1] = scores[best]
+            responses.end_write(seq, stamp)
+    finally:
+        requests.close()
+        responses.close()
+
+
+class LocalShard:
+    """
+    Satu shard di process lokal (pengganti node matcher untuk development/test)
+
+    Interface yang dipakai ShardedMatcher: notify(), poll(seq), close().
+    Shard di node lain cukup mengimplementasikan interface yang sama.
+    """
+
+    def __init__(self, ctx, request_name: str, slots: int, reference_poses: dict,
+                 indices: np.ndarray, top_k: int, stop_flag):
+        """
+        Args:
+            ctx: Multiprocessing context
+            request_name: Nama ring request (dibagi semua shard)
+            slots: Jumlah slot ring
+            reference_poses: Bagian library milik shard ini
+            indices: Index global referensi shard ini (urut sama dengan reference_poses)
+            top_k: Jumlah kandidat yang dibalas per frame
+            stop_flag: RawValue bersama, bukan 0 = worker berhenti
+        """
+        self.indices = indices
+        self._responses = SharedMemoryRing(None, (top_k, 2), np.float64, slots, create=True)
+        self._top = np.empty((top_k, 2), dtype=np.float64)
+        self._wakeup = ctx.Semaphore(0)
+        self._process = ctx.Process(
+            target=_shard_worker_loop,
+            args=(request_name, self._responses.name, slots, reference_poses, indices,
+                  top_k, self._wakeup, stop_flag),
+            daemon=True
+        )
+        self._process.start()
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self._process.pid
+
+    def notify(self):
+        """Beri tahu worker ada request baru (tidak pernah blocking)"""
+        self._wakeup.release()
+
+    def poll(self, seq: int) -> Optional[np.ndarray]:
+        """
+        Ambil top-k shard untuk request `seq` jika sudah selesai
+
+        Returns:
+            Array (top_k, 2) [index global, similarity], atau None jika belum ada
+        """
+        done_seq, _, top = self._responses.read_latest(out=self._top, min_seq=seq)
+        if top is None or done_seq != seq:
+            return None
+        return top
+
+    def close(self):
+        self._wakeup.release()
+        self._process.join(timeout=2.0)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._responses.close()
+
+
+class ShardedMatcher:
+    """
+    Pengganti PoseMatcher dengan library referensi yang dibagi ke beberapa shard
+
+    find_best_match() mengirim landmark ke semua shard, menunggu sampai semua
+    membalas atau `deadline` habis, lalu menggabungkan top-k dari shard yang
+    sudah membalas. Karena setiap shard membalas top-k miliknya, top-k gabungan
+    exact untuk shard yang ikut; shard yang terlambat dihitung di
+    `partial_frames` dan `shard_misses`.
+    """
+
+    def __init__(self, reference_poses: dict, shards: Optional[int] = None,
+                 top_k: Optional[int] = None, deadline: Optional[float] = None,
+                 slots: Optional[int] = None):
+        """
+        Inisialisasi shard process
+
+        Args:
+            reference_poses: Dictionary dengan format {nama_pose: landmarks}
+            shards: Jumlah shard (default: config.MATCHER_SHARDS)
+            top_k: Kandidat per shard (default: config.SHARD_TOP_K)
+            deadline: Waktu tunggu maksimum per frame dalam detik (default: config.SHARD_DEADLINE)
+            slots: Jumlah slot ring buffer (default: config.MATCHER_RING_SLOTS)
+        """
+        self.reference_poses = reference_poses
+        self.names = list(reference_poses.keys())
+        self.top_k = top_k or config.SHARD_TOP_K
+        self.deadline = config.SHARD_DEADLINE if deadline is None else deadline
+        self.slots = slots or config.MATCHER_RING_SLOTS
+        shard_count = max(1, min(shards or config.MATCHER_SHARDS, len(self.names)))
+
+        self.frames = 0
+        self.partial_frames = 0
+        self.shard_misses = [0] * shard_count
+        self.last_answered = 0
+
+        self._requests = SharedMemoryRing(None, (REQUEST_ROWS, 3), np.float32,
+                                          self.slots, create=True)
+        ctx = mp.get_context('spawn')
+        self._stop_flag = ctx.RawValue('b', 0)
+        self.shards: List[LocalShard] = []
+        for indices in np.array_split(np.arange(len(self.names)), shard_count):
+            subset = {self.names[i]: reference_poses[self.names[i]] for i in indices}
+            self.shards.append(LocalShard(ctx, self._requests.name, self.slots, subset,
+                                          indices, self.top_k, self._stop_flag))
+
+    def required_landmarks(self) -> set:
+        """Landmark yang dibutuhkan matcher ini ('pose' dan/atau 'hands')"""
+        return required_landmarks(self.reference_poses)
+
+    def submit(self, current_landmarks) -> int:
+        """
+        Kirim landmark frame saat ini ke semua shard (satu kali tulis ke ring)
+
+        Returns:
+            Sequence number request
+        """
+        if not isinstance(current_landmarks, dict):
+            current_landmarks = {'pose_landmarks': current_landmarks, 'hand_landmarks': []}
+
+        seq, slot = self._requests.begin_write()
+        landmarks_to_arrays(current_landmarks, *_request_views(slot))
+        self._requests.end_write(seq)
+        for shard in self.shards:
+            shard.notify()
+        return seq
+
+    def collect(self, seq: int, deadline: Optional[float] = None) -> List[np.ndarray]:
+        """
+        Tunggu top-k semua shard untuk request `seq` sampai deadline
+
+        Args:
+            seq: Sequence number dari submit()
+            deadline: Batas waktu dalam detik (default: self.deadline)
+
+        Returns:
+            List array top-k dari shard yang membalas tepat waktu
+        """
+        deadline = self.deadline if deadline is None else deadline
+        end = time.perf_counter() + deadline
+        results = [None] * len(self.shards)
+        pending = len(self.shards)
+        while True:
+            for i, shard in enumerate(self.shards):
+                if results[i] is None:
+                    top = shard.poll(seq)
+                    if top is not None:
+                        results[i] = top.copy()
+                        pending -= 1
+            if pending == 0 or time.perf_counter() >= end:
+                break
+            time.sleep(0.0002)
+
+        self.frames += 1
+        self.last_answered = len(self.shards) - pending
+        if pending:
+            self.partial_frames += 1
+            for i, top in enumerate(results):
+                if top is None:
+                    self.shard_misses[i] += 1
+        return [top for top in results if top is not None]
+
+    def top_matches(self, current_landmarks, k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Top-k referensi paling mirip dari semua shard yang membalas tepat waktu
+
+        Args:
+            current_landmarks: Dict atau List landmarks dari pose saat ini
+            k: Jumlah hasil (default: self.top_k)
+
+        Returns:
+            List (nama pose, similarity), urut dari yang paling mirip
+        """
+        if current_landmarks is None or len(self.names) == 0:
+            return []
+        k = k or self.top_k
+
+        answered = self.collect(self.submit(current_landmarks))
+        if not answered:
+            return []
+        merged = np.concatenate(answered)
+        merged = merged[merged[:, 0] >= 0]
+        order = np.argsort(-merged[:, 1], kind='stable')[:k]
+        return [(self.names[int(merged[i, 0])], float(merged[i, 1])) for i in order]
+
+    def find_best_match(self, current_landmarks) -> Tuple[Optional[str], float]:
+        """
+        Interface sama dengan PoseMatcher.find_best_match
+
+        Returns:
+            Tuple berisi:
+            - Nama pose yang paling cocok (atau None)
+            - Similarity score (0.0 jika tidak ada shard yang membalas)
+        """
+        matches = self.top_matches(current_landmarks, 1)
+        if not matches:
+            return None, 0.0
+        name, score = matches[0]
+        if score > 0 and score >= config.SIMILARITY_THRESHOLD:
+            return name, score
+        return None, score
+
+    def close(self):
+        """Hentikan semua shard dan lepas shared memory"""
+        self._stop_flag.value = 1
+        for shard in self.shards:
+            shard.close()
+        self._requests.close()
+        if self.frames:
+            print(f"Sharded matcher: {len(self.shards)} shard, {self.partial_frames}/{self.frames} "
+                  f"frame parsial, miss per shard {self.shard_misses}")
@@ -0,0 +1,132 @@
+"""
+Shared Memory Frame Producer
+Producer lokal untuk development dan benchmark source `shm`: membuat ring
+frame BGR di shared memory lalu menulis frame dari camera/video/synthetic
+langsung ke slot ring. Consumer: python main.py --source shm[:NAME]
+"""
+
+import argparse
+import time
+from multiprocessing import shared_memory
+import cv2
+import numpy as np
+from pipeline import build_source
+from shm_ring import SharedMemoryRing
+import config
+
+
+def create_ring(name: str, width: int, height: int, slots: int) -> SharedMemoryRing:
+    """
+    Buat ring frame baru, hapus dulu sisa ring lama dengan nama yang sama
+
+    Args:
+        name: Nama shared memory
+        width: Lebar frame
+        height: Tinggi frame
+        slots: Jumlah slot ring
+
+    Returns:
+        SharedMemoryRing (owner)
+    """
+    try:
+        return SharedMemoryRing(name, (height, width, 3), np.uint8, slots, create=True)
+    except FileExistsError:
+        # Sisa producer sebelumnya yang tidak keluar dengan bersih
+        stale = shared_memory.SharedMemory(name=name)
+        stale.close()
+        stale.unlink()
+        return SharedMemoryRing(name, (height, width, 3), np.uint8, slots, create=True)
+
+
+def produce(ring: SharedMemoryRing, source, fps: float = 0,
+            max_frames: int = None, duration: float = None) -> dict:
+    """
+    Tulis frame dari source ke ring sampai source habis atau batas tercapai
+
+    Source membaca langsung ke slot ring (read_into) jika ukurannya cocok;
+    jika tidak, frame di-resize langsung ke slot. Tidak ada array sementara
+    per frame.
+
+    Args:
+        ring: SharedMemoryRing tujuan
+        source: FrameSource yang sudah di-open
+        fps: Batas frame per detik (0 = secepat mungkin)
+        max_frames: Berhenti setelah N frame (None = tidak terbatas)
+        duration: Berhenti setelah N detik (None = tidak terbatas)
+
+    Returns:
+        Dict statistik ('frames', 'elapsed', 'fps', 'resized')
+    """
+    height, width = ring.shape[:2]
+    interval = 1.0 / fps if fps > 0 else 0.0
+    frames = 0
+    resized = 0
+    start = time.perf_counter()
+    next_time = start
+
+    while max_frames is None or frames < max_frames:
+        if duration is not None and time.perf_counter() - start >= duration:
+            break
+        if interval:
+            wait = next_time - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            next_time += interval
+
+        seq, slot = ring.begin_write()
+        ret, frame = source.read_into(slot)
+        if not ret:
+            break
+        if frame is not slot:
+            if frame.shape == slot.shape:
+                np.copyto(slot, frame)
+            else:
+                cv2.resize(frame, (width, height), dst=slot)
+                resized += 1
+        ring.end_write(seq)
+        frames += 1
+
+    elapsed = time.perf_counter() - start
+    return {
+        'frames': frames,
+        'elapsed': elapsed,
+        'fps': frames / elapsed if elapsed > 0 else 0.0,
+        'resized': resized
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Producer frame ke shared memory ring")
+    parser.add_argument('--name', default=config.SHM_FRAME_NAME, help="Nama shared memory ring")
+    parser.add_argument('--source', default='synthetic',
+                        help="camera[:INDEX] | video:PATH | images:DIR | synthetic[:FRAMES]")
+    parser.add_argument('--width', type=int, default=config.CAMERA_WIDTH)
+    parser.add_argument('--height', type=int, default=config.CAMERA_HEIGHT)
+    parser.add_argument('--slots', type=int, default=config.SHM_FRAME_SLOTS)
+    parser.add_argument('--fps', type=float, default=30.0, help="Batas FPS (0 = secepat mungkin)")
+    parser.add_argument('--max-frames', type=int, default=None, help="Berhenti setelah N frame")
+    parser.add_argument('--duration', type=float, default=None, help="Berhenti setelah N detik")
+    args = parser.parse_args()
+
+    source = build_source(args.source, args.width, args.height)
+    if not source.open():
+        return
+
+    ring = create_ring(args.name, args.width, args.height, args.slots)
+    print(f"✓ Ring '{ring.name}' {args.width}x{args.height} x {args.slots} slot, "
+          f"source {args.source} @ {args.fps or 'max'} FPS (Ctrl+C untuk berhenti)")
+    print(f"  Consumer: python main.py --source shm:{ring.name}")
+
+    try:
+        stats = produce(ring, source, args.fps, args.max_frames, args.duration)
+        print(f"\n✓ {stats['frames']} frame dalam {stats['elapsed']:.1f}s ({stats['fps']:.1f} FPS), "
+              f"{stats['resized']} frame di-resize")
+    except KeyboardInterrupt:
+        print("\nDihentikan")
+    finally:
+        source.close()
+        ring.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Shared Memory Ring Module
+Ring buffer di shared memory untuk bertukar array antar process tanpa pickling
+"""
+
+import os
+import time
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional, Tuple
+
+
+RING_MAGIC = 0x474E495253454731  # Penanda ring valid, ditulis paling akhir saat create
+RING_MAX_DIMS = 4
+RING_META_SIZE = 8 * (4 + RING_MAX_DIMS)  # magic, slots, dtype, ndim, shape[RING_MAX_DIMS]
+
+
+class SharedMemoryRing:
+    """
+    Ring buffer berisi slot array dengan ukuran tetap di shared memory
+
+    Layout buffer:
+    - meta: magic, jumlah slot, dtype, ndim dan shape slot (RING_META_SIZE byte),
+      dibaca saat attach untuk validasi/mengambil geometri ring
+    - head: uint64, sequence number terakhir yang sudah dipublish
+    - seqs: uint64 per slot, sequence number isi slot (0 = sedang ditulis)
+    - stamps: float64 per slot, timestamp saat slot ditulis
+    - data: array (slots, *shape) dengan dtype yang ditentukan
+
+    Writer menulis data dulu lalu mem-publish sequence number (pola seqlock),
+    reader mengecek sequence sebelum dan sesudah copy untuk mendeteksi slot
+    yang tertimpa saat sedang dibaca.
+    """
+
+    def __init__(self, name: Optional[str], shape: Optional[Tuple[int, ...]] = None,
+                 dtype=np.float32, slots: Optional[int] = 4, create: bool = False,
+                 track: bool = True):
+        """
+        Inisialisasi ring buffer
+
+        Saat attach, geometri ring (shape, dtype, slots) dibaca dari header.
+        Argumen yang diberikan dicek terhadap header; shape/dtype/slots None
+        berarti ikut header.
+
+        Args:
+            name: Nama shared memory (None untuk nama otomatis saat create)
+            shape: Shape satu slot data (wajib saat create)
+            dtype: Dtype data
+            slots: Jumlah slot di ring
+            create: True untuk membuat shared memory baru, False untuk attach
+            track: False jika attach ke ring milik process lain yang tidak
+                   berhubungan, supaya resource_tracker tidak meng-unlink ring
+                   tersebut saat process ini keluar
+
+        Raises:
+            ValueError: Shared memory bukan ring atau geometrinya tidak cocok
+        """
+        self._owner = create
+
+        if create:
+            if shape is None or len(shape) > RING_MAX_DIMS:
+                raise ValueError(f"Shape ring harus 0-{RING_MAX_DIMS} dimensi: {shape}")
+            self.shape = tuple(int(dim) for dim in shape)
+            self.dtype = np.dtype(dtype)
+            self.slots = int(slots or 4)
+            self.shm = shared_memory.SharedMemory(name=name, create=True,
+                                                  size=self._total_size())
+            self._write_meta()
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            if not track and os.name == 'posix':
+                resource_tracker.unregister(self.shm._name, 'shared_memory')
+            try:
+                self._read_meta(shape, dtype, slots)
+            except ValueError:
+                self.shm.close()
+                raise
+
+        slots = self.slots
+        buf = self.shm.buf
+        offset = RING_META_SIZE
+        self._head = np.ndarray((1,), dtype=np.uint64, buffer=buf, offset=offset)
+        self._seqs = np.ndarray((slots,), dtype=np.uint64, buffer=buf, offset=offset + 8)
+        self._stamps = np.ndarray((slots,), dtype=np.float64, buffer=buf,
+                                  offset=offset + 8 + slots * 8)
+        self._data = np.ndarray((slots,) + self.shape, dtype=self.dtype,
+                                buffer=buf, offset=self._header_size())
+
+        if create:
+            self._head[0] = 0
+            self._seqs[:] = 0
+            self._stamps[:] = 0.0
+            # Magic terakhir: reader yang attach lebih awal melihat ring belum siap
+            np.ndarray((1,), dtype=np.uint64, buffer=buf)[0] = RING_MAGIC
+
+    def _header_size(self) -> int:
+        """Ukuran meta + head + seqs + stamps dalam byte"""
+        return RING_META_SIZE + 8 + self.slots * 8 + self.slots * 8
+
+    def _total_size(self) -> int:
+        """Ukuran total shared memory untuk geometri ring ini"""
+        slot_size = int(np.prod(self.shape)) * self.dtype.itemsize
+        return self._header_size() + self.slots * slot_size
+
+    def _write_meta(self):
+        """Tulis geometri ring ke header (magic ditulis terpisah setelah inisialisasi)"""
+        meta = np.ndarray((RING_META_SIZE // 8,), dtype=np.uint64, buffer=self.shm.buf)
+        meta[:] = 0
+        meta[1] = self.slots
+        meta[2] = int.from_bytes(self.dtype.str.encode('ascii').ljust(8, b'\0'), 'little')
+        meta[3] = len(self.shape)
+        meta[4:4 + len(self.shape)] = self.shape
+
+    def _read_meta(self, shape: Optional[Tuple[int, ...]], dtype, slots: Optional[int]):
+        """
+        Baca geometri ring dari header dan cek terhadap argumen yang diberikan
+
+        Raises:
+            ValueError: Magic tidak ada, geometri tidak cocok, atau shared memory
+                        lebih kecil dari yang dibutuhkan header
+        """
+        if self.shm.size < RING_META_SIZE:
+            raise ValueError(f"Shared memory '{self.shm.name}' bukan SharedMemoryRing")
+        meta = np.ndarray((RING_META_SIZE // 8,), dtype=np.uint64,
+                          buffer=self.shm.buf).copy()
+        if int(meta[0]) != RING_MAGIC:
+            raise ValueError(f"Shared memory '{self.shm.name}' bukan SharedMemoryRing "
+                             f"(atau belum selesai dibuat)")
+
+        ndim = int(meta[3])
+        if ndim > RING_MAX_DIMS:
+            raise ValueError(f"Header ring '{self.shm.name}' rusak (ndim={ndim})")
+        self.slots = int(meta[1])
+        self.dtype = np.dtype(int(meta[2]).to_bytes(8, 'little').rstrip(b'\0').decode('ascii'))
+        self.shape = tuple(int(dim) for dim in meta[4:4 + ndim])
+
+        expected = (None if shape is None else tuple(shape),
+                    None if dtype is None else np.dtype(dtype),
+                    slots)
+        actual = (self.shape, self.dtype, self.slots)
+        for want, have, label in zip(expected, actual, ('shape', 'dtype', 'slots')):
+            if want is not None and want != have:
+                raise ValueError(f"Ring '{self.shm.name}' {label}={have}, bukan {want}")
+        if self.shm.size < self._total_size():
+            raise ValueError(f"Shared memory '{self.shm.name}' lebih kecil dari geometri header")
+
+    @property
+    def name(self) -> str:
+        """Nama shared memory (untuk attach dari process lain)"""
+        return self.shm.name
+
+    @property
+    def head(self) -> int:
+        """Sequence number terakhir yang sudah dipublish (0 jika belum ada)"""
+        return int(self._head[0])
+
+    def begin_write(self, seq: Optional[int] = None) -> Tuple[int, np.ndarray]:
+        """
+        Ambil slot berikutnya untuk ditulis langsung (tanpa array sementara)
+
+        Args:
+            seq: Sequence number eksplisit (default: head + 1)
+
+        Returns:
+            Tuple berisi:
+            - Sequence number yang akan dipublish
+            - View ke data slot yang bisa ditulis in-place
+        """
+        if seq is None:
+            seq = self.head + 1
+        idx = (seq - 1) % self.slots
+        self._seqs[idx] = 0
+        return seq, self._data[idx]
+
+    def end_write(self, seq: int, timestamp: Optional[float] = None):
+        """
+        Publish slot yang sudah ditulis lewat begin_write
+
+        Args:
+            seq: Sequence number dari begin_write
+            timestamp: Timestamp slot (default: time.perf_counter())
+        """
+        idx = (seq - 1) % self.slots
+        self._stamps[idx] = time.perf_counter() if timestamp is None else timestamp
+        self._seqs[idx] = seq
+        self._head[0] = seq
+
+    def write(self, array: np.ndarray, timestamp: Optional[float] = None,
+              seq: Optional[int] = None) -> int:
+        """
+        Tulis satu array ke slot berikutnya
+
+        Args:
+            array: Data dengan shape sesuai slot
+            timestamp: Timestamp slot (default: time.perf_counter())
+            seq: Sequence number eksplisit (default: head + 1)
+
+        Returns:
+            Sequence number yang dipublish
+        """
+        seq, slot = self.begin_write(seq)
+        np.copyto(slot, array, casting='unsafe')
+        self.end_write(seq, timestamp)
+        return seq
+
+    def read_latest(self, out: Optional[np.ndarray] = None,
+                    min_seq: int = 1) -> Tuple[int, float, Optional[np.ndarray]]:
+        """
+        Baca slot terbaru yang sudah dipublish
+
+        Args:
+            out: Array tujuan untuk copy (dialokasikan jika None)
+            min_seq: Hanya return data dengan sequence >= min_seq
+
+        Returns:
+            Tuple berisi:
+            - Sequence number (0 jika tidak ada data baru)
+            - Timestamp slot
+            - Array data (atau None jika tidak ada data baru)
+        """
+        seq = self.head
+        if seq < min_seq or seq == 0:
+            return 0, 0.0, None
+
+        idx = (seq - 1) % self.slots
+        if out is None:
+            out = np.empty(self.shape, dtype=self.dtype)
+
+        before = int(self._seqs[idx])
+        np.copyto(out, self._data[idx])
+        stamp = float(self._stamps[idx])
+        after = int(self._seqs[idx])
+
+        # Slot tertimpa writer saat dibaca
+        if before != seq or after != seq:
+            return 0, 0.0, None
+
+        return seq, stamp, out
+
+    def close(self):
+        """Lepas shared memory (unlink jika process ini pembuatnya)"""
+        # Lepas view numpy dulu supaya buffer bisa ditutup
+        self._head = self._seqs = self._stamps = self._data = None
+        self.shm.close()
+        if self._owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
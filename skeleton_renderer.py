@@ -0,0 +1,183 @@
+"""
+Skeleton Renderer Module
+Pengganti mp_drawing.draw_landmarks untuk overlay skeleton pose dan tangan.
+Connection dan style disiapkan sekali sebagai index array per warna;
+setiap frame semua landmark dikonversi ke pixel dalam satu operasi NumPy
+lalu digambar dengan satu cv2.polylines per grup warna (titik landmark
+digambar sebagai segmen panjang nol dengan ujung bulat). Warna mengikuti
+style default MediaPipe.
+"""
+
+import cv2
+import numpy as np
+from typing import List, Sequence, Tuple
+
+VISIBILITY_THRESHOLD = 0.5  # Sama dengan mp_drawing: landmark pose di bawah ini tidak digambar
+
+# Warna (BGR) dari mediapipe drawing_styles
+WHITE = (224, 224, 224)
+RED = (48, 48, 255)
+GREEN = (48, 255, 48)
+BLUE = (192, 101, 21)
+YELLOW = (0, 204, 255)
+GRAY = (128, 128, 128)
+PURPLE = (128, 64, 128)
+PEACH = (180, 229, 255)
+ORANGE = (0, 138, 255)
+CYAN = (231, 217, 0)
+
+POSE_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 7), (0, 4), (4, 5), (5, 6), (6, 8), (9, 10),
+    (11, 12), (11, 13), (13, 15), (15, 17), (15, 19), (15, 21), (17, 19),
+    (12, 14), (14, 16), (16, 18), (16, 20), (16, 22), (18, 20), (11, 23),
+    (12, 24), (23, 24), (23, 25), (24, 26), (25, 27), (26, 28), (27, 29),
+    (28, 30), (29, 31), (30, 32), (27, 31), (28, 32)
+)
+POSE_LEFT = (1, 2, 3, 7, 9, 11, 13, 15, 17, 19, 21, 23, 25, 27, 29, 31)
+POSE_RIGHT = (4, 5, 6, 8, 10, 12, 14, 16, 18, 20, 22, 24, 26, 28, 30, 32)
+
+# Tangan: (connection, warna garis, tebal garis, landmark, warna titik) per bagian
+HAND_PARTS = (
+    (((0, 1), (0, 5), (9, 13), (13, 17), (5, 9), (0, 17)), GRAY, 3, (0, 1, 5, 9, 13, 17), RED),
+    (((1, 2), (2, 3), (3, 4)), PEACH, 2, (2, 3, 4), PEACH),
+    (((5, 6), (6, 7), (7, 8)), PURPLE, 2, (6, 7, 8), PURPLE),
+    (((9, 10), (10, 11), (11, 12)), YELLOW, 2, (10, 11, 12), YELLOW),
+    (((13, 14), (14, 15), (15, 16)), GREEN, 2, (14, 15, 16), GREEN),
+    (((17, 18), (18, 19), (19, 20)), BLUE, 2, (18, 19, 20), BLUE),
+)
+
+LineGroup = Tuple[Sequence[Tuple[int, int]], Tuple[int, int, int], int]
+DotGroup = Tuple[Sequence[int], Tuple[int, int, int], int]
+
+
+class SkeletonStyle:
+    """
+    Connection dan style satu jenis skeleton (pose atau tangan), disiapkan sekali
+
+    Semua ujung garis dan semua titik disimpan sebagai satu index array
+    (urut per grup warna), jadi per frame cukup satu gather NumPy; setiap
+    grup hanya slice dari hasil gather tersebut.
+    """
+
+    def __init__(self, lines: List[LineGroup], dots: List[DotGroup], use_visibility: bool):
+        """
+        Args:
+            lines: List (connections, warna, tebal) per grup garis
+            dots: List (index landmark, warna, radius) per grup titik
+            use_visibility: Lewati landmark dengan visibility < VISIBILITY_THRESHOLD
+                (hanya pose; landmark tangan tidak punya visibility)
+        """
+        self.use_visibility = use_visibility
+
+        # Ujung garis berurutan (awal, akhir) per connection: reshape (K, 2, 2) = segmen polylines
+        self.line_index = np.asarray([i for connections, _, _ in lines
+                                      for pair in connections for i in pair], dtype=np.intp)
+        self.line_groups = []  # (awal, akhir, warna, tebal), slice segmen
+        start = 0
+        for connections, color, thickness in lines:
+            self.line_groups.append((start, start + len(connections), color, thickness))
+            start += len(connections)
+
+        # Titik diurutkan per radius supaya border putih satu radius = satu slice
+        dots = sorted(dots, key=lambda group: group[2])
+        self.dot_index = np.asarray([i for indices, _, _ in dots for i in indices], dtype=np.intp)
+        self.dot_groups = []  # (awal, akhir, warna, radius)
+        self.border_groups = []  # (awal, akhir, radius border), seperti mp_drawing
+        start = 0
+        for indices, color, radius in dots:
+            self.dot_groups.append((start, start + len(indices), color, radius))
+            border = max(radius + 1, int(radius * 1.2))
+            if self.border_groups and self.border_groups[-1][2] == border:
+                self.border_groups[-1] = (self.border_groups[-1][0], start + len(indices), border)
+            else:
+                self.border_groups.append((start, start + len(indices), border))
+            start += len(indices)
+
+
+def pose_style() -> SkeletonStyle:
+    """Style default pose: garis putih, titik oranye (kiri) / cyan (kanan) / putih (hidung)"""
+    return SkeletonStyle(
+        lines=[(POSE_CONNECTIONS, WHITE, 2)],
+        dots=[(POSE_LEFT, ORANGE, 2), (POSE_RIGHT, CYAN, 2), ((0,), WHITE, 2)],
+        use_visibility=True
+    )
+
+
+def hand_style() -> SkeletonStyle:
+    """Style default tangan: warna per jari, telapak abu-abu"""
+    return SkeletonStyle(
+        lines=[(connections, color, thickness) for connections, color, thickness, _, _ in HAND_PARTS],
+        dots=[(indices, color, 5) for _, _, _, indices, color in HAND_PARTS],
+        use_visibility=False
+    )
+
+
+class SkeletonRenderer:
+    """Renderer skeleton batched (satu cv2.polylines per grup warna)"""
+
+    def __init__(self):
+        """Siapkan style pose dan tangan sekali"""
+        self.pose = pose_style()
+        self.hand = hand_style()
+
+    @staticmethod
+    def to_pixels(landmarks: np.ndarray, width: int, height: int,
+                  use_visibility: bool) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Konversi landmark normalized ke pixel dalam satu operasi
+
+        Args:
+            landmarks: Array (N, 3) berisi (x, y, visibility) normalized
+            width: Lebar frame
+            height: Tinggi frame
+            use_visibility: Tandai landmark dengan visibility rendah sebagai tidak terlihat
+
+        Returns:
+            Tuple berisi:
+            - Koordinat pixel (N, 2) int32
+            - Mask bool (N,) landmark yang digambar (di dalam frame dan terlihat)
+        """
+        x = landmarks[:, 0]
+        y = landmarks[:, 1]
+        visible = (x >= 0) & (x <= 1) & (y >= 0) & (y <= 1)
+        if use_visibility:
+            visible &= landmarks[:, 2] >= VISIBILITY_THRESHOLD
+        pixels = np.empty((len(landmarks), 2), dtype=np.int32)
+        np.minimum(x * width, width - 1, out=pixels[:, 0], casting='unsafe')
+        np.minimum(y * height, height - 1, out=pixels[:, 1], casting='unsafe')
+        return pixels, visible
+
+    @staticmethod
+    def _polylines(frame: np.ndarray, segments: np.ndarray, keep: np.ndarray, color, thickness: int):
+        """Satu cv2.polylines untuk semua segmen yang kedua ujungnya terlihat"""
+        if not keep.all():
+            if not keep.any():
+                return
+            segments = segments[keep]
+        cv2.polylines(frame, segments, False, color, thickness)
+
+    def draw(self, frame: np.ndarray, landmarks: np.ndarray, style: SkeletonStyle):
+        """
+        Gambar satu skeleton (in-place)
+
+        Args:
+            frame: Frame BGR tujuan
+            landmarks: Array (N, 3) berisi (x, y, visibility) normalized
+            style: SkeletonStyle (self.pose atau self.hand)
+        """
+        height, width = frame.shape[:2]
+        pixels, visible = self.to_pixels(landmarks, width, height, style.use_visibility)
+
+        segments = pixels[style.line_index].reshape(-1, 2, 2)
+        keep = visible[style.line_index].reshape(-1, 2).all(axis=1)
+        for start, end, color, thickness in style.line_groups:
+            self._polylines(frame, segments[start:end], keep[start:end], color, thickness)
+
+        # Titik = segmen panjang nol; garis tebal OpenCV berujung bulat sehingga menjadi lingkaran
+        points = pixels[style.dot_index]
+        points = np.stack([points, points], axis=1)
+        shown = visible[style.dot_index]
+        for start, end, border in style.border_groups:
+            self._polylines(frame, points[start:end], shown[start:end], WHITE, 2 * border + 1)
+        for start, end, color, radius in style.dot_groups:
+            self._polylines(frame, points[start:end], shown[start:end], color, 2 * radius + 1)
@@ -0,0 +1,215 @@
+"""
+Stack Profiler Module
+Sampling profiler on-demand untuk aplikasi yang sudah berjalan (kiosk):
+thread sampler membaca stack semua thread (sys._current_frames) setiap
+interval selama N detik, memberi label stage pipeline yang sedang aktif,
+lalu menulis collapsed stack (format flamegraph.pl / speedscope). Di luar
+capture biayanya hanya satu thread yang menunggu Event.
+"""
+
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import config
+
+
+class StackProfiler:
+    """
+    Sampling profiler untuk Pipeline
+
+    - Capture dimulai dengan request()/toggle() (tombol 'p', SIGUSR2, atau
+      PROFILE_ON_START) dan berhenti setelah `duration` detik atau saat
+      toggle() dipanggil lagi. Hasil parsial tetap ditulis.
+    - Stack thread pipeline diberi root 'stage:<Pipeline.stage>' sehingga
+      flamegraph langsung terbagi per stage; thread lain diberi root
+      'thread:<nama thread>'.
+    - Hanya kode Python yang terlihat: waktu di native code (MediaPipe,
+      OpenCV) tercatat pada fungsi Python yang memanggilnya. Process lain
+      (MatcherProcess, shard) tidak ikut di-sample.
+    """
+
+    def __init__(self, pipeline=None, duration: Optional[float] = None,
+                 interval: Optional[float] = None, max_depth: Optional[int] = None,
+                 dump_dir: Optional[str] = None):
+        """
+        Args:
+            pipeline: Pipeline yang diberi label stage (opsional, None = semua thread tanpa stage)
+            duration: Lama capture dalam detik (default: config.PROFILE_DURATION)
+            interval: Interval sampling dalam detik (default: config.PROFILE_INTERVAL)
+            max_depth: Kedalaman stack maksimum, frame terluar dibuang
+                (default: config.PROFILE_MAX_DEPTH)
+            dump_dir: Folder file profile (default: config.OUTPUT_PATH)
+        """
+        self.pipeline = pipeline
+        self.duration = duration or config.PROFILE_DURATION
+        self.interval = interval or config.PROFILE_INTERVAL
+        self.max_depth = max_depth or config.PROFILE_MAX_DEPTH
+        self.dump_dir = Path(dump_dir or config.OUTPUT_PATH)
+
+        self.active = False
+        self.profiles: List[Path] = []
+        self.pipeline_thread = threading.get_ident()  # Thread yang menjalankan pipeline.run()
+        self._labels: Dict = {}  # Cache code object -> 'file.py:fungsi'
+        self._duration = self.duration
+        self._requested = threading.Event()
+        self._cancel = threading.Event()
+        self._stop = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """
+        Jalankan thread sampler (menunggu request) dan pasang handler SIGUSR2
+
+        Dipanggil dari thread yang nanti menjalankan pipeline.run().
+        """
+        self.pipeline_thread = threading.get_ident()
+
+        # Profile on-demand untuk kiosk tanpa keyboard: kill -USR2 <pid>
+        if hasattr(signal, 'SIGUSR2') and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGUSR2, lambda signum, frame: self.toggle())
+
+        self._stop.clear()
+        self.thread = threading.Thread(target=self._loop, name='stack-profiler', daemon=True)
+        self.thread.start()
+        print(f"✓ Stack profiler siap ({self.duration:g}s per capture, "
+              f"sample setiap {self.interval * 1000:g} ms)")
+
+    def request(self, duration: Optional[float] = None):
+        """
+        Minta capture (dikerjakan thread sampler, aman dari signal handler)
+
+        Args:
+            duration: Lama capture dalam detik (default: self.duration)
+        """
+        self._duration = duration or self.duration
+        self._requested.set()
+
+    def toggle(self):
+        """Mulai capture, atau hentikan lebih awal jika sedang berjalan"""
+        if self.active:
+            self._cancel.set()
+        else:
+            self.request()
+
+    def _loop(self):
+        """Loop sampler: tunggu request, lalu capture"""
+        while True:
+            self._requested.wait()
+            if self._stop.is_set():
+                break
+            self._requested.clear()
+            self._cancel.clear()
+            self.capture(self._duration)
+
+    def capture(self, duration: float) -> Path:
+        """
+        Sample semua thread selama `duration` detik lalu tulis collapsed stack
+
+        Args:
+            duration: Lama capture dalam detik
+
+        Returns:
+            Path file profile
+        """
+        self.active = True
+        print(f"[PROFILE] Sampling {duration:g}s... (tekan 'p' lagi untuk berhenti lebih awal)")
+        stacks = Counter()
+        stages = Counter()
+        samples = 0
+        cost = 0.0
+        start = time.perf_counter()
+        end = start + duration
+
+        # Thread sampler hanya dapat GIL saat thread lain melepasnya; dengan switch
+        # interval default (5 ms) sample selalu jatuh di call yang melepas GIL
+        # (cv2, I/O). Interval pendek selama capture membuat titik sample acak.
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(switch_interval, config.PROFILE_SWITCH_INTERVAL))
+        try:
+            while not self._cancel.is_set() and not self._stop.is_set():
+                sample_start = time.perf_counter()
+                if sample_start >= end:
+                    break
+                self.sample(stacks, stages)
+                samples += 1
+                cost += time.perf_counter() - sample_start
+                self._cancel.wait(self.interval)
+        finally:
+            sys.setswitchinterval(switch_interval)
+            self.active = False
+        return self._write(stacks, stages, samples, time.perf_counter() - start, cost)
+
+    def sample(self, stacks: Counter, stages: Counter):
+        """
+        Ambil satu sample stack dari semua thread kecuali thread sampler
+
+        Args:
+            stacks: Counter {(root, frame, ...): jumlah sample}, diupdate in-place
+            stages: Counter {stage: jumlah sample thread pipeline}, diupdate in-place
+        """
+        own = threading.get_ident()
+        stage = getattr(self.pipeline, 'stage', None) or 'main'
+        names = None
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            if ident == self.pipeline_thread:
+                root = f"stage:{stage}"
+                stages[stage] += 1
+            else:
+                if names is None:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                root = f"thread:{names.get(ident, ident)}"
+            stacks[(root,) + self._stack(frame)] += 1
+
+    def _stack(self, frame) -> Tuple[str, ...]:
+        """Stack satu thread dari frame terluar ke terdalam, maksimum max_depth frame"""
+        labels = []
+        while frame is not None and len(labels) < self.max_depth:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = f"{Path(code.co_filename).name}:{code.co_name}"
+            labels.append(label)
+            frame = frame.f_back
+        labels.reverse()
+        return tuple(labels)
+
+    def _write(self, stacks: Counter, stages: Counter, samples: int,
+               elapsed: float, cost: float) -> Path:
+        """Tulis collapsed stack (satu baris 'root;frame;...;frame jumlah') dan ringkasan"""
+        self.dump_dir.mkdir(parents=True, exist_ok=True)
+        path = self.dump_dir / f"profile_{time.strftime('%Y%m%d_%H%M%S')}_{len(self.profiles)}.folded"
+        with open(path, 'w') as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{';'.join(stack)} {count}\n")
+        self.profiles.append(path)
+
+        # Fungsi terdalam thread pipeline paling sering = hotspot
+        leaves = Counter()
+        for stack, count in stacks.items():
+            if stack[0].startswith('stage:') and len(stack) > 1:
+                leaves[stack[-1]] += count
+        total = max(sum(stages.values()), 1)
+
+        print(f"[PROFILE] {samples} sample dalam {elapsed:.1f}s "
+              f"(overhead sampler {cost / max(elapsed, 1e-9):.1%}): {path}")
+        print("  Stage: " + ", ".join(f"{stage} {count / total:.0%}"
+                                      for stage, count in stages.most_common()))
+        print("  Hotspot: " + ", ".join(f"{leaf} {count / total:.0%}"
+                                        for leaf, count in leaves.most_common(5)))
+        return path
+
+    def close(self):
+        """Hentikan thread sampler (capture yang sedang berjalan tetap ditulis)"""
+        if self.thread is None:
+            return
+        self._stop.set()
+        self._cancel.set()
+        self._requested.set()  # Bangunkan thread sampler
+        self.thread.join()
+        self.thread = None
@@ -0,0 +1,369 @@
+"""
+Parameter Sweep Tool
+Tuning SIMILARITY_THRESHOLD dan smoothing gesture (HISTORY_SIZE,
+MIN_HOLD_FRAMES, STABLE_VOTE_RATIO, CLEAR_VOTE_RATIO) dari recorded session
+(.npz, tombol 'r' di main.py) tanpa berdiri di depan webcam. Setiap session
+di-score terhadap referensi sekali saja; semua kombinasi parameter lalu
+disimulasikan sekaligus (satu vector state per konfigurasi) dan dibagi ke
+beberapa process. Hasil: latency sampai gesture stabil, jumlah flicker dan
+false-match rate per konfigurasi.
+"""
+
+import argparse
+import csv
+import multiprocessing as mp
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from landmark_session import load_session
+from pose_matcher import PoseMatcher
+import config
+
+PARAMETERS = ('threshold', 'history_size', 'min_hold_frames', 'stable_ratio', 'clear_ratio')
+METRICS = ('missed', 'false_match_rate', 'flicker', 'latency')
+
+
+def parse_session_arg(text: str) -> Tuple[Optional[str], str]:
+    """
+    Parse argumen session 'GESTURE=PATH' atau 'PATH'
+
+    Session tanpa label adalah session negatif: tidak ada gesture yang
+    diharapkan, setiap gesture stabil dihitung false match.
+
+    Returns:
+        Tuple (nama gesture atau None, path)
+    """
+    label, sep, path = text.partition('=')
+    if not sep:
+        return None, text
+    return label, path
+
+
+def score_session(matcher: PoseMatcher, session: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Score setiap frame session terhadap semua referensi (sekali saja)
+
+    Hanya referensi terbaik per frame yang disimpan: match mentah untuk semua
+    threshold bisa diturunkan dari (best, score). Semua frame di-score
+    sekaligus dengan PoseMatcher.match_batch.
+
+    Args:
+        matcher: PoseMatcher berisi library referensi
+        session: Dict dari load_session()
+
+    Returns:
+        Dict dengan 'best' (T,) index referensi terbaik, 'score' (T,) similarity-nya,
+        'present' (T,) frame dengan landmark, dan 'timestamps' (T,)
+    """
+    result = matcher.match_batch(session['pose'], session['hands'])
+    present = (~np.isnan(session['pose'][:, 0, 0])) | (~np.isnan(session['hands'][:, :, 0, 0])).any(axis=1)
+
+    return {'best': result['best'].astype(np.int32), 'score': result['scores'], 'present': present,
+            'timestamps': np.asarray(session['timestamps'], dtype=np.float64)}
+
+
+def build_grid(thresholds, history_sizes, min_hold_frames, stable_ratios,
+               clear_ratios) -> Dict[str, np.ndarray]:
+    """
+    Semua kombinasi parameter sebagai array per parameter (C,)
+
+    Konfigurasi config.py saat ini selalu ditambahkan sebagai baris terakhir
+    supaya bisa dibandingkan.
+    """
+    axes = np.meshgrid(np.asarray(thresholds, dtype=np.float64),
+                       np.asarray(history_sizes, dtype=np.int64),
+                       np.asarray(min_hold_frames, dtype=np.int64),
+                       np.asarray(stable_ratios, dtype=np.float64),
+                       np.asarray(clear_ratios, dtype=np.float64), indexing='ij')
+    current = (config.SIMILARITY_THRESHOLD, config.HISTORY_SIZE, config.MIN_HOLD_FRAMES,
+               config.STABLE_VOTE_RATIO, config.CLEAR_VOTE_RATIO)
+    return {name: np.append(axis.ravel(), value).astype(axis.dtype)
+            for name, axis, value in zip(PARAMETERS, axes, current)}
+
+
+def simulate_smoothing(best: np.ndarray, score: np.ndarray,
+                       grid: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Simulasi find_best_match + smooth_gesture untuk semua konfigurasi sekaligus
+
+    Voting window dihitung vectorized per jarak frame; hanya counter hold dan
+    gesture stabil yang berurutan per frame, dengan state (C,) untuk semua
+    konfigurasi. Hasilnya sama dengan smooth_gesture di main.py.
+
+    Args:
+        best: Index referensi terbaik per frame (T,), -1 jika tidak ada landmark
+        score: Similarity referensi terbaik (T,)
+        grid: Array parameter (C,) dari build_grid()
+
+    Returns:
+        Tuple berisi:
+        - Match mentah (T, C), -1 = None
+        - Gesture stabil (T, C), -1 = None
+    """
+    history = grid['history_size']
+    frames = len(best)
+    # Voting hanya bergantung pada (threshold, history): dihitung per pasangan unik
+    pairs, inverse = np.unique(np.stack([grid['threshold'], history.astype(np.float64)], axis=1),
+                               axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    pair_history = pairs[:, 1].astype(np.int64)
+
+    # Layout (T, pasangan): setiap langkah loop membaca satu baris contiguous
+    passed = (score[:, None] > 0) & (score[:, None] >= pairs[None, :, 0])
+    pair_raw = np.where(passed, best[:, None], -1).astype(np.int32)
+
+    # History awalnya kosong, jadi window frame t adalah [max(0, t - H + 1), t]
+    same = np.ones(pair_raw.shape, dtype=np.int32)
+    none = (pair_raw < 0).astype(np.int32)
+    for d in range(1, min(int(pair_history.max()), frames)):
+        active = d < pair_history
+        same[d:] += (pair_raw[d:] == pair_raw[:-d]) & active
+        none[d:] += (pair_raw[:-d] < 0) & active
+
+    raw = pair_raw[:, inverse]
+    voted = (raw >= 0) & (same[:, inverse] > history * grid['stable_ratio'])
+    cleared = (raw < 0) & (none[:, inverse] > history * grid['clear_ratio'])
+    min_hold = grid['min_hold_frames']
+
+    # hold + 1 saat vote, max(hold - 1, 0) jika tidak (hold tidak pernah negatif)
+    step = voted.astype(np.int64) * 2 - 1
+    hold = np.zeros(len(history), dtype=np.int64)
+    last = np.full(len(history), -1, dtype=np.int32)
+    stable = np.empty(raw.shape, dtype=np.int32)
+    for t in range(frames):
+        hold += step[t]
+        np.maximum(hold, 0, out=hold)
+        np.copyto(last, raw[t], where=voted[t] & (hold >= min_hold))
+        np.copyto(last, -1, where=cleared[t] & (hold == 0))
+        stable[t] = last
+    return raw, stable
+
+
+def session_metrics(stable: np.ndarray, label: int, scored: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Metrik satu session untuk semua konfigurasi
+
+    Args:
+        stable: Gesture stabil (T, C) dari simulate_smoothing()
+        label: Index referensi yang diharapkan, -1 untuk session negatif
+        scored: Dict dari score_session()
+
+    Returns:
+        Dict array (C,): 'detected', 'latency' (detik sejak orang muncul,
+        NaN jika tidak terdeteksi), 'entries' (berapa kali masuk gesture stabil)
+        dan 'false_frames' (frame dengan gesture stabil yang salah)
+    """
+    count = stable.shape[1]
+    previous = np.concatenate([np.full((1, count), -1, dtype=stable.dtype), stable[:-1]])
+    entries = ((stable >= 0) & (stable != previous)).sum(axis=0)
+    false_frames = ((stable >= 0) & (stable != label)).sum(axis=0)
+
+    if label < 0:
+        detected = np.zeros(count, dtype=bool)
+        latency = np.full(count, np.nan)
+    else:
+        hit = stable == label
+        detected = hit.any(axis=0)
+        timestamps = scored['timestamps']
+        onset = int(np.argmax(scored['present'])) if scored['present'].any() else 0
+        latency = np.where(detected, timestamps[hit.argmax(axis=0)] - timestamps[onset], np.nan)
+
+    return {'detected': detected, 'latency': latency, 'entries': entries,
+            'false_frames': false_frames}
+
+
+def evaluate(sessions: List[Tuple[int, Dict[str, np.ndarray]]],
+             grid: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Metrik gabungan semua session untuk satu blok konfigurasi
+
+    Args:
+        sessions: List (label index, hasil score_session())
+        grid: Array parameter (C,)
+
+    Returns:
+        Dict array (C,) untuk setiap nama di METRICS:
+        - missed: session berlabel yang gesture-nya tidak pernah stabil
+        - false_match_rate: frame dengan gesture stabil yang salah / total frame
+        - flicker: masuk gesture stabil selain satu kali masuk gesture yang benar
+        - latency: rata-rata latency sampai gesture stabil (detik, NaN jika tidak ada)
+    """
+    count = len(grid['threshold'])
+    missed = np.zeros(count, dtype=np.int64)
+    false_frames = np.zeros(count, dtype=np.int64)
+    flicker = np.zeros(count, dtype=np.int64)
+    latency_sum = np.zeros(count)
+    latency_count = np.zeros(count, dtype=np.int64)
+    total_frames = 0
+
+    for label, scored in sessions:
+        total_frames += len(scored['best'])
+        if len(scored['best']) == 0:
+            missed += label >= 0
+            continue
+        _, stable = simulate_smoothing(scored['best'], scored['score'], grid)
+        result = session_metrics(stable, label, scored)
+        false_frames += result['false_frames']
+        flicker += result['entries'] - result['detected']
+        if label >= 0:
+            missed += ~result['detected']
+            latency_sum += np.where(result['detected'], result['latency'], 0.0)
+            latency_count += result['detected']
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        latency = latency_sum / latency_count
+    return {
+        'missed': missed,
+        'false_match_rate': false_frames / max(total_frames, 1),
+        'flicker': flicker,
+        'latency': latency
+    }
+
+
+def _evaluate_block(args) -> Dict[str, np.ndarray]:
+    """Entry point worker process (argumen di-pickle sebagai satu tuple)"""
+    return evaluate(*args)
+
+
+def run_sweep(sessions: List[Tuple[int, Dict[str, np.ndarray]]], grid: Dict[str, np.ndarray],
+              workers: Optional[int] = None, max_elements: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    Evaluasi semua konfigurasi, dibagi per blok ke beberapa process
+
+    Blok dibatasi max_elements (konfigurasi x frame session terpanjang) supaya
+    memory simulasi tetap terbatas.
+
+    Args:
+        sessions: List (label index, hasil score_session())
+        grid: Array parameter (C,) dari build_grid()
+        workers: Jumlah process (default: config.SWEEP_WORKERS, 0 = jumlah core)
+        max_elements: Elemen maksimum per blok (default: config.SWEEP_BLOCK_ELEMENTS)
+
+    Returns:
+        Dict array (C,) berisi parameter dan metrik
+    """
+    workers = config.SWEEP_WORKERS if workers is None else workers
+    workers = workers or os.cpu_count() or 1
+    max_elements = max_elements or config.SWEEP_BLOCK_ELEMENTS
+    count = len(grid['threshold'])
+    longest = max((len(scored['best']) for _, scored in sessions), default=1)
+    rows = max(1, min(max_elements // max(longest, 1), -(-count // workers)))
+
+    blocks = [{name: values[start:start + rows] for name, values in grid.items()}
+              for start in range(0, count, rows)]
+    if workers <= 1 or len(blocks) == 1:
+        results = [evaluate(sessions, block) for block in blocks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn')) as pool:
+            results = list(pool.map(_evaluate_block, [(sessions, block) for block in blocks]))
+
+    report = dict(grid)
+    for name in METRICS:
+        report[name] = np.concatenate([result[name] for result in results])
+    return report
+
+
+def rank(report: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Urutan konfigurasi terbaik: session terlewat, false-match rate, flicker,
+    lalu latency (semua makin kecil makin baik)
+    """
+    latency = np.where(np.isnan(report['latency']), np.inf, report['latency'])
+    return np.lexsort((latency, report['flicker'], report['false_match_rate'], report['missed']))
+
+
+def format_row(report: Dict[str, np.ndarray], i: int) -> str:
+    """Satu baris tabel hasil"""
+    latency = report['latency'][i]
+    latency_text = f"{latency:6.2f}s" if np.isfinite(latency) else "     - "
+    return (f"thr {report['threshold'][i]:.2f}  hist {report['history_size'][i]:>2}  "
+            f"hold {report['min_hold_frames'][i]:>2}  vote {report['stable_ratio'][i]:.2f}/"
+            f"{report['clear_ratio'][i]:.2f}  | missed {report['missed'][i]:>2}  "
+            f"false {report['false_match_rate'][i]:6.2%}  flicker {report['flicker'][i]:>3}  "
+            f"latency {latency_text}")
+
+
+def write_csv(report: Dict[str, np.ndarray], order: np.ndarray, path) -> Path:
+    """Tulis semua konfigurasi (urut ranking) ke CSV"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    columns = PARAMETERS + METRICS
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for i in order:
+            writer.writerow([report[name][i].item() for name in columns])
+    return path
+
+
+def main():
+    """Score recorded session sekali lalu sweep parameter threshold + smoothing"""
+    parser = argparse.ArgumentParser(description="Sweep threshold dan smoothing gesture dari recorded session")
+    parser.add_argument('sessions', nargs='+',
+                        help="Session .npz sebagai GESTURE=PATH (gesture yang diharapkan) "
+                             "atau PATH (session negatif, tidak ada gesture)")
+    parser.add_argument('--images', default=config.REFERENCE_IMAGES_PATH,
+                        help="Folder gambar referensi")
+    parser.add_argument('--thresholds', type=float, nargs='+',
+                        default=np.round(np.arange(0.70, 0.96, 0.02), 2).tolist())
+    parser.add_argument('--history', type=int, nargs='+', default=[4, 6, 8, 10, 12, 16])
+    parser.add_argument('--min-hold', type=int, nargs='+', default=[3, 5, 8, 10, 15, 20])
+    parser.add_argument('--stable-ratio', type=float, nargs='+', default=[0.5, 0.6, 0.7])
+    parser.add_argument('--clear-ratio', type=float, nargs='+', default=[0.6, 0.7, 0.8])
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Jumlah process (default: config.SWEEP_WORKERS)")
+    parser.add_argument('--top', type=int, default=10, help="Jumlah konfigurasi terbaik yang ditampilkan")
+    parser.add_argument('--out', default=str(Path(config.OUTPUT_PATH) / 'sweep_results.csv'),
+                        help="File CSV semua konfigurasi")
+    args = parser.parse_args()
+
+    from gesture_detector import GestureDetector
+    from reference_loader import load_reference_images
+
+    detector = GestureDetector()
+    try:
+        reference_poses, _ = load_reference_images(detector, args.images)
+    finally:
+        detector.close()
+    if not reference_poses:
+        return
+
+    matcher = PoseMatcher(reference_poses)
+    start = time.perf_counter()
+    sessions = []
+    for text in args.sessions:
+        label, path = parse_session_arg(text)
+        if label is not None and label not in matcher.names:
+            print(f"✗ Gesture '{label}' tidak ada di referensi ({path})")
+            return
+        matcher.reset_cache()
+        scored = score_session(matcher, load_session(path))
+        sessions.append((matcher.names.index(label) if label is not None else -1, scored))
+        print(f"  {Path(path).name}: {len(scored['best'])} frame, "
+              f"{'gesture ' + label if label else 'negatif'}")
+    score_time = time.perf_counter() - start
+
+    grid = build_grid(args.thresholds, args.history, args.min_hold,
+                      args.stable_ratio, args.clear_ratio)
+    start = time.perf_counter()
+    report = run_sweep(sessions, grid, args.workers)
+    sweep_time = time.perf_counter() - start
+
+    order = rank(report)
+    current = len(order) - 1  # Baris terakhir = config.py saat ini
+    print(f"\n{len(order)} konfigurasi x {len(sessions)} session "
+          f"(scoring {score_time:.1f}s, sweep {sweep_time:.1f}s)\n")
+    for position, i in enumerate(order[:args.top], 1):
+        print(f"{position:>3}. {format_row(report, i)}")
+    print(f"\nconfig.py (peringkat {int(np.nonzero(order == current)[0][0]) + 1}):")
+    print(f"     {format_row(report, current)}")
+
+    out = write_csv(report, order, args.out)
+    print(f"\n✓ Hasil lengkap disimpan di {out}")
+
+
+if __name__ == "__main__":
+    main()